@@ -0,0 +1,77 @@
+"""
+Benchmark do cache GeoParquet das camadas: carga fria (leitura do shapefile, normalização e
+gravação do Parquet, como na primeira execução do painel) contra carga quente (leitura do
+Parquet já gravado). Usa os arquivos do repositório e um diretório de cache temporário por
+repetição; cache/geoparquet nunca é tocado:
+
+    python -m benchmarks.benchmark_cache_geoparquet --repeticoes 3 --camadas cnuc sigef
+"""
+
+import argparse
+import tempfile
+import geopandas as gpd
+import streamlit as st
+from geopandas.testing import assert_geodataframe_equal
+from benchmarks.medicao import medir
+from utilitarios import cache_geoparquet
+from utilitarios.cache_geoparquet import carregadores_camadas
+
+def _limpar_caches_streamlit() -> None:
+    # Os carregadores ficam atrás de cache_data/cache_resource: cada medida começa sem eles
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+def _iguais(frio: gpd.GeoDataFrame, quente: gpd.GeoDataFrame) -> bool:
+    try:
+        assert_geodataframe_equal(frio, quente, check_less_precise=False)
+    except AssertionError:
+        return False
+    return frio.attrs == quente.attrs
+
+def executar(repeticoes: int, camadas=None) -> None:
+    diretorio_original = cache_geoparquet.DIRETORIO_CACHE_GEOPARQUET
+    print(f"{repeticoes} repetições, melhor tempo de cada forma")
+    total_frio = total_quente = 0.0
+    try:
+        for nome, carregar in carregadores_camadas().items():
+            if camadas and nome not in camadas:
+                continue
+
+            tempos_frio, tempos_quente, iguais = [], [], True
+            for _ in range(repeticoes):
+                with tempfile.TemporaryDirectory() as diretorio:
+                    cache_geoparquet.DIRETORIO_CACHE_GEOPARQUET = diretorio
+                    _limpar_caches_streamlit()
+                    frio, segundos_frio, _ = medir(carregar)
+                    _limpar_caches_streamlit()
+                    quente, segundos_quente, _ = medir(carregar)
+
+                if frio is None or frio.empty:
+                    break
+                tempos_frio.append(segundos_frio)
+                tempos_quente.append(segundos_quente)
+                iguais &= _iguais(frio, quente)
+
+            if not tempos_frio:
+                # Arquivo ausente ou ponteiro do LFS: a camada passa direto pelo cache
+                print(f"{nome:>17}: sem dados no checkout")
+                continue
+            total_frio += min(tempos_frio)
+            total_quente += min(tempos_quente)
+            print(f"{nome:>17}: {len(frio):>7,} linhas  shapefile {min(tempos_frio):6.2f} s  "
+                  f"geoparquet {min(tempos_quente):6.2f} s  ({min(tempos_frio) / min(tempos_quente):4.1f}x)  "
+                  f"{'quadros iguais' if iguais else 'QUADROS DIFERENTES'}")
+    finally:
+        cache_geoparquet.DIRETORIO_CACHE_GEOPARQUET = diretorio_original
+        _limpar_caches_streamlit()
+
+    if total_quente:
+        print(f"{'total':>17}: shapefile {total_frio:.2f} s, geoparquet {total_quente:.2f} s")
+
+if __name__ == '__main__':
+    argumentos = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argumentos.add_argument('--repeticoes', type=int, default=3)
+    argumentos.add_argument('--camadas', nargs='*', default=None,
+                            help='nomes de carregadores_camadas(); todas por padrão')
+    opcoes = argumentos.parse_args()
+    executar(opcoes.repeticoes, opcoes.camadas)
@@ -0,0 +1,114 @@
+"""
+Benchmark da carga dos focos do INPE: cursor (pd.read_sql em chunks) contra COPY + Arrow
+Usa um Postgres local como substituto do servidor: cria o esquema benchmark_inpe com uma
+tabela queimadas de linhas sintéticas (o esquema "CPT" nunca é tocado) e mede as duas
+formas de ProcessadorDados.carregar_dados_inpe sobre ela:
+
+    python -m benchmarks.benchmark_carga_inpe --dsn postgresql+psycopg2://postgres@localhost/postgres --linhas 3000000
+"""
+
+import argparse
+import os
+from sqlalchemy import create_engine, text
+from benchmarks.medicao import medir
+from processadores import processador_dados
+from processadores.processador_dados import ProcessadorDados
+
+ESQUEMA = 'benchmark_inpe'
+
+class _GerenciadorFixo:
+    def __init__(self, engine):
+        self._engine = engine
+
+    def obter_engine(self):
+        return self._engine
+
+class ProcessadorBenchmark(ProcessadorDados):
+    def __init__(self, engine):
+        super().__init__()
+        self.gerenciador_bd = _GerenciadorFixo(engine)
+
+    def _construir_consulta_base(self) -> str:
+        return f"""
+            SELECT
+                datahora,
+                riscofogo,
+                precipitacao,
+                municipio,
+                diasemchuva,
+                latitude,
+                longitude
+            FROM {ESQUEMA}.queimadas
+        """
+
+def preparar_tabela(engine, linhas: int) -> None:
+    with engine.begin() as conn:
+        existentes = conn.execute(text(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:tabela)"
+        ), {'tabela': f'{ESQUEMA}.queimadas'}).scalar()
+        if existentes is not None and abs(existentes - linhas) <= linhas * 0.01:
+            return
+
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {ESQUEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {ESQUEMA}"))
+        conn.execute(text(f"""
+            CREATE TABLE {ESQUEMA}.queimadas (
+                datahora timestamp,
+                riscofogo double precision,
+                precipitacao double precision,
+                municipio text,
+                diasemchuva integer,
+                latitude double precision,
+                longitude double precision
+            )
+        """))
+        # 144 municípios, 5 anos de focos e ~0,1% de municípios nulos, como na base real
+        conn.execute(text(f"""
+            INSERT INTO {ESQUEMA}.queimadas
+            SELECT
+                timestamp '2020-01-01' + random() * interval '5 years',
+                round(random()::numeric, 3),
+                round((random() * 50)::numeric, 2),
+                CASE WHEN random() < 0.001 THEN NULL ELSE 'MUNICIPIO ' || (random() * 143)::int END,
+                (random() * 120)::int,
+                -15 + random() * 20,
+                -60 + random() * 15
+            FROM generate_series(1, :linhas)
+            ORDER BY 1
+        """), {'linhas': linhas})
+        conn.execute(text(f"CREATE INDEX ON {ESQUEMA}.queimadas (datahora)"))
+        conn.execute(text(f"ANALYZE {ESQUEMA}.queimadas"))
+
+def executar(dsn: str, linhas: int, repeticoes: int, ano=None) -> None:
+    # O espelho DuckDB atenderia as duas formas: o benchmark mede só o caminho do Postgres
+    processador_dados.USAR_ESPELHO_DUCKDB = False
+    engine = create_engine(dsn)
+    preparar_tabela(engine, linhas)
+    processador = ProcessadorBenchmark(engine)
+
+    print(f"{linhas:,} linhas sintéticas, ano={ano or 'todos'}, {repeticoes} repetições")
+    resultados = {}
+    for modo in ('cursor', 'copy'):
+        for repeticao in range(repeticoes):
+            df, segundos, pico_mb = medir(lambda: processador.carregar_dados_inpe(ano, modo=modo))
+            resultados.setdefault(modo, []).append(segundos)
+            print(f"{modo:>6} #{repeticao + 1}: {segundos:7.2f} s  pico RSS +{pico_mb:8.1f} MB  "
+                  f"{len(df):,} linhas  {df.memory_usage(deep=True).sum() / 1e6:7.1f} MB no frame")
+            if repeticao == 0:
+                print('        ' + ', '.join(f"{col}={tipo}" for col, tipo in df.dtypes.astype(str).items()))
+            del df
+
+    melhor = {modo: min(tempos) for modo, tempos in resultados.items()}
+    print(f"melhor cursor {melhor['cursor']:.2f} s, melhor copy {melhor['copy']:.2f} s "
+          f"({melhor['cursor'] / melhor['copy']:.1f}x)")
+    engine.dispose()
+
+if __name__ == '__main__':
+    argumentos = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argumentos.add_argument('--dsn', default=os.environ.get('DSN_BENCHMARK',
+                                                            'postgresql+psycopg2://postgres@localhost:5432/postgres'))
+    argumentos.add_argument('--linhas', type=int, default=3_000_000)
+    argumentos.add_argument('--repeticoes', type=int, default=3)
+    argumentos.add_argument('--ano', type=int, default=None)
+    opcoes = argumentos.parse_args()
+    executar(opcoes.dsn, opcoes.linhas, opcoes.repeticoes, opcoes.ano)
@@ -0,0 +1,68 @@
+"""
+Benchmark do mapa de UCs da aba Sobreposições (criar_figura, com todas as UCs e todos os
+CARs/SIGEF): montagem da figura, serialização com to_json e tamanho do que vai ao navegador.
+Três formas do GeoJSON dos polígonos:
+
+- exata, __geo_interface__: geometria completa com todas as propriedades, como antes da pirâmide
+- exata, compacto: geojson_compacto sem pirâmide (coordenadas arredondadas, sem propriedades)
+- pirâmide, compacto: o que o painel usa, no nível da pirâmide escolhido pelo zoom
+
+    python -m benchmarks.benchmark_mapa_ucs --repeticoes 3
+"""
+
+import argparse
+import streamlit as st
+from unittest import mock
+from benchmarks.medicao import medir
+from componentes import mapas
+from componentes.mapas import ZOOM_MAPA_UCS, criar_figura
+from processadores.registro_dados import obter_registro
+from utilitarios.geojson_compacto import geojson_compacto
+from utilitarios.geometria_dupla import somente_geografica
+
+def _geojson_antigo(gdf, camada, zoom, piramide=None, propriedades=None):
+    return somente_geografica(gdf).__geo_interface__
+
+def _montar(gdf_cnuc, gdf_sigef, centro, piramide_ucs, piramide_sigef):
+    return criar_figura(gdf_cnuc, gdf_sigef, None, centro, [], "todos", piramide_ucs, piramide_sigef)
+
+def executar(repeticoes: int) -> None:
+    registro = obter_registro()
+    gdf_cnuc = registro.obter('cnuc_combinado')
+    gdf_sigef = registro.obter('sigef_combinado')
+    centro = registro.obter('centro')
+    piramide_ucs = registro.obter('piramide_ucs')
+    piramide_sigef = registro.obter('piramide_sigef')
+
+    print(f"{len(gdf_cnuc):,} UCs e {len(gdf_sigef):,} CARs/SIGEF, zoom {ZOOM_MAPA_UCS} "
+          f"(nível {piramide_ucs.tolerancia(ZOOM_MAPA_UCS)}), {repeticoes} repetições")
+    for nome, piramide in (('UCs', piramide_ucs), ('CARs', piramide_sigef)):
+        vertices = piramide.vertices()
+        print(f"vértices {nome}: " + ', '.join(f"{nivel} {total:,}" for nivel, total in vertices.itertuples(index=False)))
+
+    formas = {
+        'exata, __geo_interface__': (_geojson_antigo, None, None),
+        'exata, compacto': (geojson_compacto, None, None),
+        'pirâmide, compacto': (geojson_compacto, piramide_ucs, piramide_sigef)
+    }
+    for forma, (codificar, piramide_u, piramide_s) in formas.items():
+        montagens, serializacoes, em_cache = [], [], []
+        with mock.patch.object(mapas, 'geojson_compacto', codificar):
+            for _ in range(repeticoes):
+                # Sem o cache do GeoJSON, como na primeira abertura do mapa com o filtro
+                st.cache_resource.clear()
+                fig, segundos, _ = medir(lambda: _montar(gdf_cnuc, gdf_sigef, centro, piramide_u, piramide_s))
+                montagens.append(segundos)
+                carga, segundos, _ = medir(fig.to_json)
+                serializacoes.append(segundos)
+                _, segundos, _ = medir(lambda: _montar(gdf_cnuc, gdf_sigef, centro, piramide_u, piramide_s))
+                em_cache.append(segundos)
+
+        print(f"{forma:>25}: figura {min(montagens):5.2f} s (repetida {min(em_cache):5.2f} s)  "
+              f"to_json {min(serializacoes):5.2f} s  {len(carga) / 1e6:6.2f} MB")
+
+if __name__ == '__main__':
+    argumentos = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argumentos.add_argument('--repeticoes', type=int, default=3)
+    opcoes = argumentos.parse_args()
+    executar(opcoes.repeticoes)
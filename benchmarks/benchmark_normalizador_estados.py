@@ -0,0 +1,90 @@
+"""
+Benchmark do normalizador de estados: Series.apply com as funções linha a linha que ele
+substituiu contra normalizar_serie_estados, estrito e tolerante, sobre uma coluna sintética
+com siglas, nomes com e sem acento, caixa misturada, marcadores e nulos:
+
+    python -m benchmarks.benchmark_normalizador_estados --linhas 1000000
+"""
+
+import argparse
+import numpy as np
+import pandas as pd
+from benchmarks.medicao import medir
+from processadores.normalizador_estados import SIGLAS_ESTADOS, normalizar_serie_estados
+
+# Referências: normalizar_estado (processador_alertas) e clean_state_data (aba CPT) como eram
+_SIGLAS_ANTIGAS = dict(SIGLAS_ESTADOS)
+
+_CORRECOES_ANTIGAS = {
+    'PARA': 'Pará', 'CEARA': 'Ceará', 'ESPIRITO SANTO': 'Espírito Santo',
+    'GOIAS': 'Goiás', 'MARANHAO': 'Maranhão', 'PARAIBA': 'Paraíba',
+    'PARANA': 'Paraná', 'PIAUI': 'Piauí', 'RONDONIA': 'Rondônia',
+    'SAO PAULO': 'São Paulo'
+}
+
+def _normalizar_estado_antigo(sigla):
+    mapa_estados = {**_SIGLAS_ANTIGAS, **{nome.upper(): nome for nome in _SIGLAS_ANTIGAS.values()}}
+    if pd.isna(sigla):
+        return None
+    return mapa_estados.get(str(sigla).strip().upper(), None)
+
+def _clean_state_data_antigo(estado_value):
+    if pd.isna(estado_value):
+        return None
+    estado_str = str(estado_value).strip().upper()
+    if estado_str in ['UF', 'NAN', 'NONE', 'NULL', '']:
+        return None
+    if estado_str.isdigit():
+        return None
+    if any(char.isdigit() for char in estado_str):
+        return None
+    if not all(char.isalpha() or char.isspace() for char in estado_str):
+        return None
+    if len(estado_str.replace(' ', '')) < 2:
+        return None
+    if estado_str in _SIGLAS_ANTIGAS:
+        return _SIGLAS_ANTIGAS[estado_str]
+    for nome_completo in _SIGLAS_ANTIGAS.values():
+        if estado_str == nome_completo.upper():
+            return nome_completo
+    if estado_str in _CORRECOES_ANTIGAS:
+        return _CORRECOES_ANTIGAS[estado_str]
+    for nome_valido in _SIGLAS_ANTIGAS.values():
+        if estado_str == nome_valido.upper() or estado_str.replace(' ', '') == nome_valido.upper().replace(' ', ''):
+            return nome_valido
+    return None
+
+def coluna_estados(linhas: int, semente: int = 0) -> pd.Series:
+    rng = np.random.default_rng(semente)
+    nomes = list(SIGLAS_ESTADOS.values())
+    base = (list(SIGLAS_ESTADOS) + nomes + [nome.upper() for nome in nomes] + [nome.lower() for nome in nomes]
+            + list(_CORRECOES_ANTIGAS) + [' PA ', 'pa', 'UF', 'NULL', '', 'P1', None])
+    return pd.Series(rng.choice(np.array(base, dtype=object), linhas), name='ESTADO')
+
+def executar(linhas: int, repeticoes: int) -> None:
+    serie = coluna_estados(linhas)
+    print(f"{linhas:,} linhas, {serie.nunique(dropna=False)} valores distintos, {repeticoes} repetições")
+
+    for regra, referencia, tolerante in (('estrita', _normalizar_estado_antigo, False),
+                                        ('tolerante', _clean_state_data_antigo, True)):
+        antigo = novo = None
+        tempos_antigos, tempos_novos = [], []
+        for _ in range(repeticoes):
+            antigo, segundos, _ = medir(lambda: serie.apply(referencia))
+            tempos_antigos.append(segundos)
+            novo, segundos, _ = medir(lambda: normalizar_serie_estados(serie, tolerante=tolerante))
+            tempos_novos.append(segundos)
+        iguais = novo.equals(antigo.astype(object))
+        print(f"{regra:>9}: apply {min(tempos_antigos):6.2f} s  normalizar_serie_estados {min(tempos_novos):6.3f} s  "
+              f"({min(tempos_antigos) / min(tempos_novos):5.0f}x)  {'resultados iguais' if iguais else 'RESULTADOS DIFERENTES'}")
+
+        categorica = serie.astype('category')
+        _, segundos, _ = medir(lambda: normalizar_serie_estados(categorica, tolerante=tolerante))
+        print(f"{'':>9}  entrada categórica {segundos:6.3f} s")
+
+if __name__ == '__main__':
+    argumentos = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argumentos.add_argument('--linhas', type=int, default=1_000_000)
+    argumentos.add_argument('--repeticoes', type=int, default=3)
+    opcoes = argumentos.parse_args()
+    executar(opcoes.linhas, opcoes.repeticoes)
@@ -0,0 +1,96 @@
+"""
+Benchmark da reexecução por widget do painel: para cada seletor de cada aba, o tempo da
+execução completa do script (o que qualquer widget disparava antes dos fragmentos) e o
+tempo do fragmento que contém o widget (o que o navegador espera agora). Roda o painel
+com streamlit.testing.AppTest; st.fragment e os widgets são instrumentados para saber em
+qual fragmento cada widget foi criado e quanto cada fragmento levou:
+
+    python -m benchmarks.benchmark_reexecucao --abas Sobreposições Desmatamento
+
+AppTest não reexecuta fragmentos isoladamente: o tempo do fragmento é medido dentro da
+execução completa, com as camadas do registro e os caches já quentes
+"""
+
+import argparse
+import functools
+import os
+import time
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+SCRIPT_PAINEL = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dash_modular.py')
+NOMES_ABAS = ["Sobreposições", "CPT", "Justiça", "Queimadas", "Desmatamento"]
+WIDGETS_INSTRUMENTADOS = ['selectbox', 'radio', 'multiselect', 'select_slider', 'slider', 'checkbox', 'toggle']
+
+_pilha_fragmentos = []
+_tempos_fragmentos = {}
+_fragmento_do_widget = {}
+
+def _instrumentar() -> None:
+    fragmento_original = streamlit.fragment
+
+    def fragmento_cronometrado(func=None, **opcoes):
+        if func is None:
+            return lambda funcao: fragmento_cronometrado(funcao, **opcoes)
+
+        @functools.wraps(func)
+        def cronometrado(*args, **kwargs):
+            _pilha_fragmentos.append(func.__name__)
+            inicio = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _pilha_fragmentos.pop()
+                _tempos_fragmentos[func.__name__] = time.perf_counter() - inicio
+        return fragmento_original(cronometrado, **opcoes)
+
+    def widget_mapeado(criar_original):
+        @functools.wraps(criar_original)
+        def criar(label, *args, **kwargs):
+            # Um widget reexecuta o fragmento mais interno em que foi criado
+            _fragmento_do_widget[kwargs.get('key') or label] = _pilha_fragmentos[-1] if _pilha_fragmentos else None
+            return criar_original(label, *args, **kwargs)
+        return criar
+
+    streamlit.fragment = fragmento_cronometrado
+    for nome in WIDGETS_INSTRUMENTADOS:
+        setattr(streamlit, nome, widget_mapeado(getattr(streamlit, nome)))
+
+def _executar_cronometrado(app: AppTest, aba: str = NOMES_ABAS[0]) -> float:
+    # O AppTest não guarda a aba escolhida entre execuções: ela é reposta a cada uma
+    app.session_state['aba_ativa'] = aba
+    _tempos_fragmentos.clear()
+    inicio = time.perf_counter()
+    app.run()
+    segundos = time.perf_counter() - inicio
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return segundos
+
+def executar(abas, tempo_limite: int) -> None:
+    _instrumentar()
+    app = AppTest.from_file(SCRIPT_PAINEL, default_timeout=tempo_limite)
+    print(f"primeira execução (carga das camadas): {_executar_cronometrado(app):7.2f} s")
+
+    print(f"{'aba':<14} {'widget':<32} {'script inteiro':>14} {'fragmento':>10}  fragmento reexecutado")
+    for aba in abas:
+        _executar_cronometrado(app, aba)
+        # Segunda execução da aba: os caches de dados dela ficam quentes antes das medidas
+        print(f"{aba:<14} {'(execução completa)':<32} {_executar_cronometrado(app, aba):13.2f}s")
+
+        seletores = [widget for widget in list(app.selectbox) + list(app.radio) if len(widget.options) > 1]
+        for widget in seletores:
+            chave = widget.key or widget.label
+            fragmento = _fragmento_do_widget.get(chave)
+            widget.set_value(widget.options[1])
+            completo = _executar_cronometrado(app, aba)
+            parcial = _tempos_fragmentos.get(fragmento)
+            print(f"{aba:<14} {chave[:32]:<32} {completo:13.2f}s "
+                  + (f"{parcial:9.2f}s  {fragmento}" if parcial is not None else f"{'-':>10}  sem fragmento"))
+
+if __name__ == '__main__':
+    argumentos = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argumentos.add_argument('--abas', nargs='*', default=NOMES_ABAS, choices=NOMES_ABAS)
+    argumentos.add_argument('--tempo-limite', type=int, default=900, help='segundos por execução do AppTest')
+    opcoes = argumentos.parse_args()
+    executar(opcoes.abas, opcoes.tempo_limite)
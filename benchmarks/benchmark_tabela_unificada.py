@@ -0,0 +1,116 @@
+"""
+Benchmark da tabela unificada de sobreposições (aba Sobreposições): o laço antigo por UC,
+que reprojetava as camadas inteiras e rodava um gpd.overlay por UC, contra o motor de
+sobreposição de processador_espacial, frio e já em cache. Usa as camadas do registro
+(alertas, sigef_combinado e cnuc_combinado, as mesmas que o painel passa à tabela):
+
+    python -m benchmarks.benchmark_tabela_unificada --repeticoes 3
+"""
+
+import argparse
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import streamlit as st
+from benchmarks.medicao import medir
+from componentes.cards import _tabela_unificada_vetorizada
+from processadores.registro_dados import obter_registro
+from utilitarios.geometria_dupla import somente_geografica
+
+def _tabela_antiga(gdf_alertas, gdf_sigef, gdf_cnuc) -> pd.DataFrame:
+    # Referência: o laço de mostrar_tabela_unificada antes do motor, sem a formatação final
+    dados_tabela = []
+    for idx, uc in gdf_cnuc.iterrows():
+        nome_uc = uc.get('nome_uc', 'N/A')
+        area_uc_ha = uc.get('area_ha', 0) if 'area_ha' in gdf_cnuc.columns else uc.get('ha_total', 0)
+
+        area_alertas_ha = 0
+        qtd_alertas = 0
+        if not gdf_alertas.empty and uc.geometry is not None:
+            try:
+                alertas_proj = gdf_alertas.to_crs(epsg=31983)
+                uc_geom = gpd.GeoSeries([uc.geometry], crs=gdf_cnuc.crs).to_crs(epsg=31983).iloc[0]
+                alertas_intersect = alertas_proj[alertas_proj.intersects(uc_geom)]
+                if not alertas_intersect.empty:
+                    intersecao = gpd.overlay(
+                        gpd.GeoDataFrame([{'geometry': uc_geom}], crs='EPSG:31983'),
+                        alertas_intersect,
+                        how='intersection'
+                    )
+                    area_alertas_ha = intersecao.geometry.area.sum() / 10000
+                    qtd_alertas = len(alertas_intersect)
+            except Exception:
+                area_alertas_ha = uc.get('alerta_ha', 0)
+                qtd_alertas = uc.get('c_alertas', 0)
+
+        area_car_ha = 0
+        qtd_car = 0
+        if not gdf_sigef.empty and uc.geometry is not None:
+            try:
+                sigef_proj = gdf_sigef.to_crs(epsg=31983)
+                uc_geom = gpd.GeoSeries([uc.geometry], crs=gdf_cnuc.crs).to_crs(epsg=31983).iloc[0]
+                sigef_intersect = sigef_proj[sigef_proj.intersects(uc_geom)]
+                if not sigef_intersect.empty:
+                    intersecao_car = gpd.overlay(
+                        gpd.GeoDataFrame([{'geometry': uc_geom}], crs='EPSG:31983'),
+                        sigef_intersect,
+                        how='intersection'
+                    )
+                    area_car_ha = intersecao_car.geometry.area.sum() / 10000
+                    qtd_car = len(sigef_intersect)
+            except Exception:
+                area_car_ha = uc.get('sigef_ha', 0)
+                qtd_car = uc.get('c_sigef', 0)
+
+        dados_tabela.append({
+            'UC': nome_uc,
+            'Área UC (ha)': area_uc_ha,
+            'Alertas (ha)': area_alertas_ha,
+            'Qtd Alertas': qtd_alertas,
+            'CAR (ha)': area_car_ha,
+            'Qtd CAR': qtd_car
+        })
+    return pd.DataFrame(dados_tabela)
+
+def _formatada(df_tabela: pd.DataFrame) -> pd.DataFrame:
+    # Mesma ordenação e formatação que a tabela recebe na tela
+    df_tabela = df_tabela.sort_values('Área UC (ha)', ascending=False)
+    for coluna in ['Área UC (ha)', 'Alertas (ha)', 'CAR (ha)']:
+        df_tabela[coluna] = df_tabela[coluna].apply(lambda x: f"{x:,.1f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+    return df_tabela.reset_index(drop=True)
+
+def executar(repeticoes: int) -> None:
+    registro = obter_registro()
+    gdf_alertas = registro.obter('alertas')
+    gdf_sigef = registro.obter('sigef_combinado')
+    gdf_cnuc = registro.obter('cnuc_combinado')
+    print(f"{len(gdf_alertas):,} alertas, {len(gdf_sigef):,} polígonos CAR/SIGEF, {len(gdf_cnuc):,} UCs; "
+          f"{repeticoes} repetições")
+
+    # O laço antigo trabalhava sobre camadas só com a geometria geográfica
+    antigas = [somente_geografica(gdf) for gdf in (gdf_alertas, gdf_sigef, gdf_cnuc)]
+    tempos = {'laço antigo': [], 'motor, frio': [], 'motor, em cache': []}
+    for _ in range(repeticoes):
+        referencia, segundos, _ = medir(lambda: _tabela_antiga(*antigas))
+        tempos['laço antigo'].append(segundos)
+
+        st.cache_data.clear()
+        tabela, segundos, _ = medir(lambda: _tabela_unificada_vetorizada(gdf_alertas, gdf_sigef, gdf_cnuc))
+        tempos['motor, frio'].append(segundos)
+        _, segundos, _ = medir(lambda: _tabela_unificada_vetorizada(gdf_alertas, gdf_sigef, gdf_cnuc))
+        tempos['motor, em cache'].append(segundos)
+
+    for forma, segundos in tempos.items():
+        print(f"{forma:>16}: {min(segundos):7.2f} s")
+
+    diferenca = np.abs(tabela[['Alertas (ha)', 'CAR (ha)']].to_numpy(dtype=float)
+                       - referencia[['Alertas (ha)', 'CAR (ha)']].to_numpy(dtype=float)).max()
+    iguais = _formatada(tabela).astype(str).equals(_formatada(referencia).astype(str))
+    print(f"maior diferença de área {diferenca:.2e} ha; tabela formatada "
+          f"{'idêntica' if iguais else 'DIFERENTE'} à do laço antigo")
+
+if __name__ == '__main__':
+    argumentos = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argumentos.add_argument('--repeticoes', type=int, default=1)
+    opcoes = argumentos.parse_args()
+    executar(opcoes.repeticoes)
@@ -0,0 +1,31 @@
+"""
+Medição compartilhada pelos benchmarks: tempo de parede e pico de RSS de uma chamada
+"""
+
+import threading
+import time
+import psutil
+
+def medir(funcao):
+    """Executa funcao() e devolve (resultado, segundos, pico de RSS acima do inicial em MB)"""
+    # Pico de RSS amostrado em paralelo: a memória do Arrow e do GEOS não passa pelo tracemalloc
+    processo = psutil.Process()
+    inicial = processo.memory_info().rss
+    pico = [inicial]
+    parar = threading.Event()
+
+    def amostrar():
+        while not parar.is_set():
+            pico[0] = max(pico[0], processo.memory_info().rss)
+            parar.wait(0.01)
+
+    amostrador = threading.Thread(target=amostrar, daemon=True)
+    amostrador.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao()
+    finally:
+        segundos = time.perf_counter() - inicio
+        parar.set()
+        amostrador.join()
+    return resultado, segundos, (pico[0] - inicial) / 1e6
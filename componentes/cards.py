@@ -2,19 +2,20 @@ import pandas as pd
 import geopandas as gpd
 import streamlit as st
 from utilitarios.formatacao import formatar_numero_com_pontos
+from processadores.processador_espacial import obter_sobreposicao_por_uc
+from utilitarios.geometria_dupla import projetar
 
 
 def criar_cards(gdf_cnuc_filtered, gdf_sigef_filtered, invadindo_opcao):
     try:
-        ucs_selecionadas = gdf_cnuc_filtered.copy()
-        sigef_base = gdf_sigef_filtered.copy()
+        ucs_selecionadas = gdf_cnuc_filtered
         
         if ucs_selecionadas.empty:
             return (0.0, 0.0, 0, 0, 0)
 
-        crs_proj = "EPSG:31983"
-        ucs_proj = ucs_selecionadas.to_crs(crs_proj)
-        sigef_proj = sigef_base.to_crs(crs_proj)
+        # projetar já devolve novos GeoDataFrames, com a geometria projetada como única geometria
+        ucs_proj = projetar(ucs_selecionadas)
+        sigef_proj = projetar(gdf_sigef_filtered)
 
         if invadindo_opcao and invadindo_opcao.lower() != "todos":
             mascara = sigef_proj["invadindo"].str.strip().str.lower() == invadindo_opcao.strip().lower()
@@ -139,6 +140,43 @@ def render_cards(perc_alerta, perc_sigef, total_unidades, contagem_alerta, conta
         )
 
 
+def _tabela_unificada_iterativa(gdf_cnuc):
+    dados_tabela = []
+    
+    for idx, uc in gdf_cnuc.iterrows():
+        nome_uc = uc.get('nome_uc', 'N/A')
+        area_uc_ha = uc.get('area_ha', 0) if 'area_ha' in gdf_cnuc.columns else uc.get('ha_total', 0)
+        
+        dados_tabela.append({
+            'UC': nome_uc,
+            'Área UC (ha)': area_uc_ha,
+            'Alertas (ha)': uc.get('alerta_ha', 0),
+            'Qtd Alertas': uc.get('c_alertas', 0),
+            'CAR (ha)': uc.get('sigef_ha', 0),
+            'Qtd CAR': uc.get('c_sigef', 0)
+        })
+    
+    return pd.DataFrame(dados_tabela)
+
+
+def _tabela_unificada_vetorizada(gdf_alertas, gdf_sigef, gdf_cnuc):
+    sobreposicao_alertas = obter_sobreposicao_por_uc(gdf_cnuc, gdf_alertas)
+    sobreposicao_car = obter_sobreposicao_por_uc(gdf_cnuc, gdf_sigef)
+    
+    nomes = gdf_cnuc['nome_uc'] if 'nome_uc' in gdf_cnuc.columns else pd.Series('N/A', index=gdf_cnuc.index)
+    coluna_area = 'area_ha' if 'area_ha' in gdf_cnuc.columns else 'ha_total'
+    areas = gdf_cnuc[coluna_area] if coluna_area in gdf_cnuc.columns else pd.Series(0, index=gdf_cnuc.index)
+    
+    return pd.DataFrame({
+        'UC': nomes.to_numpy(),
+        'Área UC (ha)': areas.to_numpy(),
+        'Alertas (ha)': sobreposicao_alertas['area_ha'].to_numpy(),
+        'Qtd Alertas': sobreposicao_alertas['quantidade'].to_numpy(),
+        'CAR (ha)': sobreposicao_car['area_ha'].to_numpy(),
+        'Qtd CAR': sobreposicao_car['quantidade'].to_numpy()
+    })
+
+
 def mostrar_tabela_unificada(gdf_alertas, gdf_sigef, gdf_cnuc):
     try:
         if gdf_cnuc.empty:
@@ -146,64 +184,14 @@ def mostrar_tabela_unificada(gdf_alertas, gdf_sigef, gdf_cnuc):
             return
         
         # Preparar dados por UC
-        dados_tabela = []
+        try:
+            df_tabela = _tabela_unificada_vetorizada(gdf_alertas, gdf_sigef, gdf_cnuc)
+        except Exception as e:
+            # Sem a sobreposição espacial a tabela usa as contagens já gravadas na camada de UCs
+            st.warning(f"Aviso: sobreposição por UC indisponível, usando os totais da camada: {e}")
+            df_tabela = _tabela_unificada_iterativa(gdf_cnuc)
         
-        for idx, uc in gdf_cnuc.iterrows():
-            nome_uc = uc.get('nome_uc', 'N/A')
-            area_uc_ha = uc.get('area_ha', 0) if 'area_ha' in gdf_cnuc.columns else uc.get('ha_total', 0)
-            
-            # Sobreposição com Alertas
-            area_alertas_ha = 0
-            qtd_alertas = 0
-            if not gdf_alertas.empty and uc.geometry is not None:
-                try:
-                    alertas_proj = gdf_alertas.to_crs(epsg=31983)
-                    uc_geom = gpd.GeoSeries([uc.geometry], crs=gdf_cnuc.crs).to_crs(epsg=31983).iloc[0]
-                    alertas_intersect = alertas_proj[alertas_proj.intersects(uc_geom)]
-                    if not alertas_intersect.empty:
-                        intersecao = gpd.overlay(
-                            gpd.GeoDataFrame([{'geometry': uc_geom}], crs='EPSG:31983'),
-                            alertas_intersect,
-                            how='intersection'
-                        )
-                        area_alertas_ha = intersecao.geometry.area.sum() / 10000
-                        qtd_alertas = len(alertas_intersect)
-                except:
-                    area_alertas_ha = uc.get('alerta_ha', 0)
-                    qtd_alertas = uc.get('c_alertas', 0)
-            
-            # Sobreposição com CAR
-            area_car_ha = 0
-            qtd_car = 0
-            if not gdf_sigef.empty and uc.geometry is not None:
-                try:
-                    sigef_proj = gdf_sigef.to_crs(epsg=31983)
-                    uc_geom = gpd.GeoSeries([uc.geometry], crs=gdf_cnuc.crs).to_crs(epsg=31983).iloc[0]
-                    sigef_intersect = sigef_proj[sigef_proj.intersects(uc_geom)]
-                    if not sigef_intersect.empty:
-                        intersecao_car = gpd.overlay(
-                            gpd.GeoDataFrame([{'geometry': uc_geom}], crs='EPSG:31983'),
-                            sigef_intersect,
-                            how='intersection'
-                        )
-                        area_car_ha = intersecao_car.geometry.area.sum() / 10000
-                        qtd_car = len(sigef_intersect)
-                except:
-                    area_car_ha = uc.get('sigef_ha', 0)
-                    qtd_car = uc.get('c_sigef', 0)
-            
-            dados_tabela.append({
-                'UC': nome_uc,
-                'Área UC (ha)': area_uc_ha,
-                'Alertas (ha)': area_alertas_ha,
-                'Qtd Alertas': qtd_alertas,
-                'CAR (ha)': area_car_ha,
-                'Qtd CAR': qtd_car
-            })
-        
-        if dados_tabela:
-            df_tabela = pd.DataFrame(dados_tabela)
-            
+        if not df_tabela.empty:
             # Ordenar por área de UC decrescente
             df_tabela = df_tabela.sort_values('Área UC (ha)', ascending=False)
             
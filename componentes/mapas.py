@@ -4,18 +4,24 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
+from utilitarios.geojson_compacto import geojson_compacto
 
+ZOOM_MAPA_UCS = 5
 
-def criar_figura(gdf_cnuc_filtered, gdf_sigef_filtered, df_csv_filtered, centro, ids_selecionados, invadindo_opcao):
+
+def criar_figura(gdf_cnuc_filtered, gdf_sigef_filtered, df_csv_filtered, centro, ids_selecionados, invadindo_opcao,
+                 piramide_ucs=None, piramide_sigef=None):
     try:
+        # GeoJSON compacto no nível da pirâmide adequado ao zoom inicial, só com as geometrias;
+        # os atributos do hover vão pelo próprio data frame
         fig = px.choropleth_map(
             gdf_cnuc_filtered,
-            geojson=gdf_cnuc_filtered.__geo_interface__,
+            geojson=geojson_compacto(gdf_cnuc_filtered, 'ucs', ZOOM_MAPA_UCS, piramide_ucs),
             locations=gdf_cnuc_filtered.index,
             color=np.ones(len(gdf_cnuc_filtered)),
             color_continuous_scale=[[0, "rgba(34,139,34,0.6)"], [1, "rgba(34,139,34,0.6)"]],
             map_style="open-street-map",
-            zoom=5,
+            zoom=ZOOM_MAPA_UCS,
             center=centro,
             opacity=0.7,
             hover_data={
@@ -53,7 +59,7 @@ def criar_figura(gdf_cnuc_filtered, gdf_sigef_filtered, df_csv_filtered, centro,
             if not sigef_plot.empty:
                 fig_sigef = px.choropleth_map(
                     sigef_plot,
-                    geojson=sigef_plot.__geo_interface__,
+                    geojson=geojson_compacto(sigef_plot, 'sigef', ZOOM_MAPA_UCS, piramide_sigef),
                     locations=sigef_plot.index,
                     color=np.ones(len(sigef_plot)),
                     color_continuous_scale=[[0, "rgba(255,140,0,0.8)"], [1, "rgba(255,140,0,0.8)"]],
@@ -107,7 +113,7 @@ def criar_figura(gdf_cnuc_filtered, gdf_sigef_filtered, df_csv_filtered, centro,
         fig.update_layout(
             mapbox=dict(
                 style="open-street-map",
-                zoom=5,
+                zoom=ZOOM_MAPA_UCS,
                 center=centro
             ),
             showlegend=False,
@@ -0,0 +1,42 @@
+import streamlit as st
+from processadores.gerenciador_bd import GerenciadorBancoDados, relatorio_pools
+
+
+@st.fragment
+def painel_conexoes():
+    with st.expander("🔌 Conexões com o banco", expanded=False):
+        col_atualizar, col_saude = st.columns(2)
+        with col_atualizar:
+            st.button("Atualizar", key="atualizar_painel_conexoes", use_container_width=True)
+        with col_saude:
+            verificar = st.button("Testar conexão", key="testar_conexao_bd", use_container_width=True)
+        
+        if verificar:
+            saude = GerenciadorBancoDados().verificar_saude()
+            if saude['ok']:
+                st.success(f"PostgreSQL respondeu em {saude['latencia_ms']:.0f} ms")
+            else:
+                st.error(f"PostgreSQL indisponível: {saude['erro']}")
+        
+        df_pools = relatorio_pools()
+        if df_pools.empty:
+            st.caption("Nenhum engine criado neste processo ainda.")
+            return
+        
+        for _, pool in df_pools.iterrows():
+            st.caption(pool['banco'])
+            # Conexões abertas por checkout: perto de 0 quando o pool é reaproveitado, perto de 1 quando cada consulta reconecta
+            rotatividade = pool['conexoes_abertas'] / pool['checkouts'] if pool['checkouts'] else 0.0
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Checkouts", f"{pool['checkouts']:,}")
+                st.metric("Em uso / ociosas", f"{pool['em_uso']} / {pool['ociosas']}")
+                st.metric("Overflow (pico)", f"{pool['overflow']} ({pool['overflow_max']})")
+            with col2:
+                st.metric("Conexões abertas", f"{pool['conexoes_abertas']:,}", delta=f"{rotatividade:.0%} por checkout",
+                          delta_color="inverse")
+                st.metric("Espera média", f"{pool['espera_media_ms']:.1f} ms")
+                st.metric("Espera máxima", f"{pool['espera_max_ms']:.1f} ms")
+        
+        st.dataframe(df_pools.drop(columns=['banco']), use_container_width=True, hide_index=True)
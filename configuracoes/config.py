@@ -10,3 +10,46 @@ CONFIGURACAO_BD = {
 
 TAMANHO_CHUNK = 15000
 LIMITE_MEMORIA = 85
+MODO_CARGA_INPE = 'copy'
+TAMANHO_BUFFER_COPY = 64 * 1024 * 1024
+
+TABELAS_CPT = {
+    'areas_conflito': '"CPT".areas_conflito',
+    'assassinatos': '"CPT".assassinatos_consolidado_padronizado',
+    'conflitos': '"CPT".conflitos_cpt',
+    'trabalho_escravo': '"CPT".trabalho_escravo_consolidado'
+}
+
+USAR_ESPELHO_DUCKDB = True
+CAMINHO_ESPELHO_DUCKDB = 'cache/espelho_inpe_cpt.duckdb'
+INTERVALO_SINCRONIZACAO_ESPELHO = 900
+ESPERA_APOS_FALHA_ESPELHO = 300
+INTERVALO_SINCRONIZACAO_COMPLETA_ESPELHO = 86400
+
+DIRETORIO_CACHE_GEOPARQUET = 'cache/geoparquet'
+VERSAO_CACHE_GEOPARQUET = 2
+
+COLUNAS_CNUC = ['nome_uc', 'municipio', 'uf', 'area_km2', 'alerta_km2', 'sigef_km2', 'c_alertas', 'c_sigef', 'geometry']
+COLUNAS_SIGEF = ['invadindo', 'municipio', 'geometry']
+
+CRS_GEOGRAFICO = 'EPSG:4326'
+CRS_PROJETADO = 'EPSG:31983'
+COLUNA_GEOMETRIA_PROJETADA = 'geometria_proj'
+DIRETORIO_CACHE_INCIDENCIA = 'cache/incidencia'
+TAMANHO_LOTE_FOCOS = 500000
+
+NIVEIS_PIRAMIDE = (0.0001, 0.0005, 0.002, 0.008)
+FOLGA_ZOOM_PIRAMIDE = 2
+# 5 casas decimais ≈ 1 m no equador
+CASAS_DECIMAIS_MAPA = 5
+MAX_ENTRADAS_GEOJSON = 16
+
+VALIDADE_REGISTRO_DADOS = 3600
+TRABALHADORES_CARGA = 4
+VERIFICAR_IMUTABILIDADE = False
+
+VALIDADE_CACHE_CPT = 3600
+INTERVALO_VERSAO_CPT = 60
+
+# Caixa dos focos do INPE considerados pelo painel: (lon_min, lat_min, lon_max, lat_max)
+LIMITES_INPE = (-60, -15, -45, 5)
@@ -6,41 +6,37 @@ import geopandas as gpd
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
-from typing import List, Optional, Tuple
 
-from configuracoes.config import CONFIGURACAO_BD
 from utilitarios.formatacao import formatar_numero_seguro, formatar_numero_com_pontos, wrap_label
 from utilitarios.estilos import ESTILO_CSS, aplicar_patch_plotly, aplicar_layout
-from utilitarios.shapefile import carregar_shapefile, carregar_shapefile_cloud_seguro, preparar_hectares
-from utilitarios.dados_auxiliares import obter_anos_disponiveis, obter_estatisticas_resumo, inicializar_dados, obter_dados_ano
+from utilitarios.dados_auxiliares import inicializar_dados, obter_dados_ano, obter_ranking_municipios
 
-from processadores.gerenciador_bd import GerenciadorBancoDados
-from processadores.processador_dados import ProcessadorDados
 from processadores.processador_ranking import ProcessadorRanking
-from processadores.processador_cpt import processar_dados_cpt_por_municipios
+from processadores.processador_espacial import obter_sobreposicao_por_uc, obter_focos_por_uc, obter_atribuicao_focos
+from processadores.registro_dados import obter_registro
+from processadores.processador_cpt import (
+    processar_dados_cpt_por_municipios, filtrar_tabela_cpt_por_estado,
+    COLUNAS_ESTADO_CPT, COLUNAS_ANO_TEMPORAL_CPT
+)
+from processadores.acesso_cpt import carregar_dados_cpt, carregar_tabela_cpt_completa
 from processadores.processador_desmatamento import (
-    processar_dados_desmatamento,
     calcular_ranking_municipios_desmatamento,
     obter_anos_disponiveis_desmatamento,
-    preprocessar_dados_desmatamento_temporal,
     calcular_bounds_desmatamento,
     processar_intersecao_uc_desmatamento,
     atualizar_alertas_em_ucs
 )
-from processadores.processador_alertas import (
-    carregar_todos_alertas, 
-    filtrar_alertas_por_estado, 
-    filtrar_alertas_por_ano,
-    normalizar_estado
-)
+from processadores.normalizador_estados import normalizar_serie_estados
+from utilitarios.geometria_dupla import geometria_projetada, sem_geometria
 
 from graficos.graficos_sobreposicoes import fig_sobreposicoes, fig_contagens_uc, fig_car_por_uc_donut
 from graficos.graficos_inpe import graficos_inpe
 from graficos.graficos_justica import fig_justica, fig_focos_calor_por_uc
-from graficos.graficos_desmatamento import fig_desmatamento_uc, fig_desmatamento_temporal, fig_desmatamento_municipio, fig_desmatamento_mapa_pontos
+from graficos.graficos_desmatamento import fig_desmatamento_temporal, fig_desmatamento_mapa_pontos
 
-from componentes.cards import criar_cards, render_cards, mostrar_tabela_unificada
+from componentes.cards import mostrar_tabela_unificada
 from componentes.mapas import criar_figura
+from componentes.painel_conexoes import painel_conexoes
 
 warnings.filterwarnings('ignore')
 logging.getLogger().setLevel(logging.ERROR)
@@ -66,167 +62,102 @@ st.title("Análise de Conflitos em Áreas Protegidas e Territórios Tradicionais
 st.markdown("Monitoramento integrado de sobreposições em Unidades de Conservação, Terras Indígenas e Territórios Quilombolas")
 st.markdown("---")
 
-@st.cache_data(ttl=3600, show_spinner=False, max_entries=1)
-def carregar_dados_iniciais():
-    gdf_cnuc_cols = ['nome_uc', 'municipio', 'uf', 'area_km2', 'alerta_km2', 'sigef_km2', 'c_alertas', 'c_sigef', 'geometry']
-    gdf_sigef_cols = ['invadindo', 'municipio', 'geometry']
-    df_proc_cols = ['municipio', 'data_ajuizamento', 'classe', 'assuntos', 'orgao_julgador']
-    gdf_alertas_raw = carregar_todos_alertas()
-    if not gdf_alertas_raw.empty:
-        gdf_alertas_raw = gdf_alertas_raw.reset_index(drop=True)
-    gdf_cnuc_raw = carregar_shapefile_cloud_seguro("cnuc.shp", colunas=gdf_cnuc_cols)
-    gdf_cnuc_ha_raw = preparar_hectares(gdf_cnuc_raw)
-    
-    # Processar ESTADO do cnuc - como não tem coluna 'uf', adicionar Pará manualmente
-    if not gdf_cnuc_ha_raw.empty:
-        if 'uf' in gdf_cnuc_ha_raw.columns:
-            gdf_cnuc_ha_raw['ESTADO'] = gdf_cnuc_ha_raw['uf'].apply(normalizar_estado)
-            gdf_cnuc_ha_raw = gdf_cnuc_ha_raw[gdf_cnuc_ha_raw['ESTADO'].notna()].reset_index(drop=True)
-        else:
-            # cnuc.shp é do Pará, adicionar ESTADO manualmente
-            gdf_cnuc_ha_raw['ESTADO'] = 'Pará'
-    
-    # Adicionar tipo_area para identificação
-    if not gdf_cnuc_ha_raw.empty:
-        gdf_cnuc_ha_raw['tipo_area'] = 'UC'
-    
-    gdf_sigef_raw = carregar_shapefile("sigef.shp", calcular_percentuais=False, colunas=gdf_sigef_cols)
-    gdf_sigef_raw = gdf_sigef_raw.rename(columns={"id":"id_sigef"})
-    
-    if not gdf_sigef_raw.empty:
-        gdf_sigef_raw['ESTADO'] = 'Pará'
-    
-    if 'MUNICIPIO' in gdf_sigef_raw.columns and 'municipio' not in gdf_sigef_raw.columns:
-        gdf_sigef_raw = gdf_sigef_raw.rename(columns={'MUNICIPIO': 'municipio'})
-    elif 'municipio' not in gdf_sigef_raw.columns:
-        gdf_sigef_raw['municipio'] = None
-    
-    gdf_ucs_filtradas = carregar_shapefile("Filtrado/UCs_filtradas.shp", calcular_percentuais=False)
-    if not gdf_ucs_filtradas.empty and 'uf' in gdf_ucs_filtradas.columns:
-        gdf_ucs_filtradas['ESTADO'] = gdf_ucs_filtradas['uf'].apply(normalizar_estado)
-        gdf_ucs_filtradas = gdf_ucs_filtradas[gdf_ucs_filtradas['ESTADO'].notna()].reset_index(drop=True)
-        
-        if 'nome_uc' in gdf_ucs_filtradas.columns:
-            gdf_ucs_filtradas['invadindo'] = gdf_ucs_filtradas['nome_uc']
-    
-    gdf_ucs_filtradas = preparar_hectares(gdf_ucs_filtradas)
-    
-    # Adicionar tipo_area para identificação
-    if not gdf_ucs_filtradas.empty:
-        gdf_ucs_filtradas['tipo_area'] = 'UC'
-    
-    # Carregar CAR de outros estados do PostgreSQL
-    from utilitarios.shapefile import carregar_car_postgres
-    gdf_car_filtrado = carregar_car_postgres()
-    
-    if not gdf_car_filtrado.empty and 'cod_estado' in gdf_car_filtrado.columns:
-        gdf_car_filtrado['ESTADO'] = gdf_car_filtrado['cod_estado'].apply(normalizar_estado)
-        gdf_car_filtrado = gdf_car_filtrado[gdf_car_filtrado['ESTADO'].notna()].reset_index(drop=True)
-    
-    gdf_car_filtrado = preparar_hectares(gdf_car_filtrado)
-    
-    gdf_terras_indigenas = carregar_shapefile("Filtrado/TerraIn_filtrado.shp", calcular_percentuais=False)
-    if not gdf_terras_indigenas.empty and 'uf_sigla' in gdf_terras_indigenas.columns:
-        def processar_estados_ti(uf_sigla):
-            if pd.isna(uf_sigla):
-                return None
-            estados = str(uf_sigla).split(',')
-            estados_normalizados = [normalizar_estado(e.strip()) for e in estados]
-            estados_validos = [e for e in estados_normalizados if e is not None]
-            return estados_validos[0] if estados_validos else None
-        
-        gdf_terras_indigenas['ESTADO'] = gdf_terras_indigenas['uf_sigla'].apply(processar_estados_ti)
-        gdf_terras_indigenas = gdf_terras_indigenas[gdf_terras_indigenas['ESTADO'].notna()].reset_index(drop=True)
-        
-        gdf_terras_indigenas = gdf_terras_indigenas[gdf_terras_indigenas['ESTADO'].isin(['Mato Grosso', 'Paraná'])].reset_index(drop=True)
-        
-        if 'terrai_nom' in gdf_terras_indigenas.columns:
-            gdf_terras_indigenas['invadindo'] = gdf_terras_indigenas['terrai_nom']
-        elif 'nome' in gdf_terras_indigenas.columns:
-            gdf_terras_indigenas['invadindo'] = gdf_terras_indigenas['nome']
-        else:
-            gdf_terras_indigenas['invadindo'] = 'Terra Indígena'
-    
-    gdf_terras_indigenas = preparar_hectares(gdf_terras_indigenas)
-    
-    # Adicionar tipo_area para identificação
-    if not gdf_terras_indigenas.empty:
-        gdf_terras_indigenas['tipo_area'] = 'T.I'
-    
-    limites = gdf_cnuc_raw.total_bounds
-    centro = {"lat": (limites[1] + limites[3]) / 2, "lon": (limites[0] + limites[2]) / 2}
-    
-    df_proc_raw = pd.read_csv("processos_tjpa_completo_atualizada_pronto.csv", sep=";", encoding="windows-1252", usecols=df_proc_cols)
-    
-    return gdf_alertas_raw, gdf_cnuc_ha_raw, gdf_sigef_raw, centro, df_proc_raw, gdf_ucs_filtradas, gdf_car_filtrado, gdf_terras_indigenas
+registro = obter_registro()
 
-try:
-    gdf_alertas_raw, gdf_cnuc_raw, gdf_sigef_raw, centro, df_proc_raw, gdf_ucs_filtradas, gdf_car_filtrado, gdf_terras_indigenas = carregar_dados_iniciais()
-except Exception as e:
-    st.error(f"❌ Erro ao carregar dados: {e}")
-    st.stop()
-
-# ===== PREPARAR DATASETS COMBINADOS (DISPONÍVEIS PARA TODAS AS ABAS) =====
-gdf_sigef_combinado = pd.concat([gdf_sigef_raw.reset_index(drop=True), gdf_car_filtrado.reset_index(drop=True)], ignore_index=True)
-if not gdf_sigef_combinado.empty and 'ESTADO' not in gdf_sigef_combinado.columns:
-    gdf_sigef_combinado['ESTADO'] = None
-
-# Calcular sigef_km2 e c_sigef para UCs filtradas através de intersecção com CAR
-if not gdf_ucs_filtradas.empty and not gdf_car_filtrado.empty:
+def obter_camadas(*nomes):
+    # Cada camada é lida na primeira vez que uma aba precisa dela e fica compartilhada entre as sessões
     try:
-        ucs_proj = gdf_ucs_filtradas.to_crs(epsg=31983)
-        car_proj = gdf_car_filtrado.to_crs(epsg=31983)
-        
-        for idx, uc_row in gdf_ucs_filtradas.iterrows():
-            if 'nome_uc' in uc_row and pd.notna(uc_row['nome_uc']):
-                uc_geom = ucs_proj.loc[idx, 'geometry']
-                car_intersect = car_proj[car_proj.intersects(uc_geom)]
-                
-                if not car_intersect.empty:
-                    area_car_ha = car_proj.loc[car_intersect.index, 'num_area'].sum()
-                    contagem_car = len(car_intersect)
-                    gdf_ucs_filtradas.at[idx, 'sigef_km2'] = area_car_ha / 100
-                    gdf_ucs_filtradas.at[idx, 'c_sigef'] = contagem_car
-        
-        gdf_ucs_filtradas = preparar_hectares(gdf_ucs_filtradas)
+        return registro.obter_varias(*nomes)
     except Exception as e:
-        st.warning(f"Aviso: Não foi possível calcular áreas de CAR: {str(e)}")
+        st.error(f"❌ Erro ao carregar dados: {e}")
+        st.stop()
+
+@st.fragment
+def bloco_mapa_ucs(gdf_cnuc_filtrado, gdf_sigef_filtrado, centro, piramide_ucs=None, piramide_sigef=None):
+    if not gdf_cnuc_filtrado.empty and 'nome_uc' in gdf_cnuc_filtrado.columns:
+        ucs_disponiveis = sorted(gdf_cnuc_filtrado['nome_uc'].dropna().unique().tolist())
+        opcoes_uc = ["Selecione", "Todas"] + ucs_disponiveis
+    else:
+        opcoes_uc = ["Selecione", "Todas"]
+    uc_selecionada = st.selectbox("Área de Conservação:", opcoes_uc, index=0, help="Selecione uma área de conservação para destacar no mapa")
+    
+    # Os filtros abaixo criam novos objetos; as camadas recebidas nunca são alteradas
+    gdf_cnuc_map = gdf_cnuc_filtrado
+    gdf_sigef_map = gdf_sigef_filtrado
+    ids_selecionados_map = []
+
+    # Filtrar CARs pela UC selecionada através de intersecção geométrica
+    if uc_selecionada and uc_selecionada not in ["Selecione", "Todas"]:
+        if 'nome_uc' in gdf_cnuc_map.columns:
+            ids_selecionados_map = gdf_cnuc_map[gdf_cnuc_map["nome_uc"] == uc_selecionada]["nome_uc"].unique().tolist()
+            
+            # Filtrar CARs que intersectam com a UC selecionada
+            uc_geom = gdf_cnuc_map[gdf_cnuc_map["nome_uc"] == uc_selecionada]
+            if not uc_geom.empty and not gdf_sigef_map.empty:
+                try:
+                    # Garantir mesmo CRS
+                    if uc_geom.crs != gdf_sigef_map.crs:
+                        gdf_sigef_map = gdf_sigef_map.to_crs(uc_geom.crs)
+                    # Filtrar CARs que intersectam a UC
+                    gdf_sigef_map = gdf_sigef_map[gdf_sigef_map.intersects(uc_geom.unary_union)]
+                except Exception as e:
+                    st.warning(f"Aviso ao filtrar CARs: {e}")
+
+    st.subheader("Mapa de Unidades")
+    # Passar "todos" se há CARs filtrados para exibir
+    invadindo_para_mapa = "todos" if (uc_selecionada not in ["Selecione", "Todas"] and not gdf_sigef_map.empty) else None
+    fig_map = criar_figura(gdf_cnuc_map, gdf_sigef_map, None, centro, ids_selecionados_map, invadindo_para_mapa,
+                           piramide_ucs, piramide_sigef)
+    fig_map.update_layout(height=300)
+    st.plotly_chart(
+        fig_map,
+        use_container_width=True,
+        config={"scrollZoom": True}
+    )
+    st.caption("Figura 1.1: Distribuição espacial das unidades de conservação.")
+    with st.expander("Detalhes e Fonte da Figura 1.1"):
+        st.write("""
+        **Interpretação:**
+        O mapa mostra a distribuição espacial das unidades de conservação na região, destacando as áreas com sobreposições selecionadas.
 
-# Combinar UCs (Pará + Filtradas)
-gdf_cnuc_combinado = pd.concat([gdf_cnuc_raw.reset_index(drop=True), gdf_ucs_filtradas.reset_index(drop=True)], ignore_index=True)
+        **Observações:**
+        - Áreas em destaque indicam unidades de conservação
+        - Cores diferentes representam diferentes tipos de unidades
+        - Sobreposições são destacadas quando selecionadas no filtro
 
-# Incluir Terras Indígenas
-if not gdf_terras_indigenas.empty:
-    gdf_ti_como_uc = gdf_terras_indigenas.copy()
-    
-    if 'nome_uc' not in gdf_ti_como_uc.columns:
-        if 'terrai_nom' in gdf_ti_como_uc.columns:
-            gdf_ti_como_uc['nome_uc'] = 'TI - ' + gdf_ti_como_uc['terrai_nom'].astype(str)
-        elif 'nome' in gdf_ti_como_uc.columns:
-            gdf_ti_como_uc['nome_uc'] = 'TI - ' + gdf_ti_como_uc['nome'].astype(str)
-        else:
-            gdf_ti_como_uc['nome_uc'] = 'Terra Indígena'
-    else:
-        gdf_ti_como_uc['nome_uc'] = 'TI - ' + gdf_ti_como_uc['nome_uc'].astype(str)
-    
-    if 'municipio' not in gdf_ti_como_uc.columns:
-        gdf_ti_como_uc['municipio'] = None
-    
-    gdf_ti_como_uc['tipo_area'] = 'T.I'
-    gdf_cnuc_combinado = pd.concat([gdf_cnuc_combinado.reset_index(drop=True), gdf_ti_como_uc.reset_index(drop=True)], ignore_index=True)
+        **Fonte:** MMA - Ministério do Meio Ambiente. *Cadastro Nacional de Unidades de Conservação*. Brasília: MMA, 2025. Disponível em: https://www.gov.br/mma/. Acesso em: maio de 2025.
+        """)
 
-if not gdf_cnuc_combinado.empty and 'nome_uc' in gdf_cnuc_combinado.columns and 'tipo_area' in gdf_cnuc_combinado.columns:
-    gdf_cnuc_combinado = gdf_cnuc_combinado.drop_duplicates(subset=['nome_uc', 'tipo_area'])
+    st.subheader("Proporção da Área do CAR sobre a UC")
+    uc_names = ["Todas"] + sorted(gdf_cnuc_filtrado["nome_uc"].unique()) if not gdf_cnuc_filtrado.empty and 'nome_uc' in gdf_cnuc_filtrado.columns else ["Todas"]
+    nome_uc = st.selectbox("Selecione a Unidade de Conservação:", uc_names)
+    modo_input = st.radio("Mostrar valores como:", ["Hectares (ha)", "% da UC"], horizontal=True)
+    modo = "absoluto" if modo_input == "Hectares (ha)" else "percent"
+    fig = fig_car_por_uc_donut(gdf_cnuc_filtrado, nome_uc, modo)
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption("Figura 1.2: Comparação entre área do CAR e área restante da UC.")
+    with st.expander("Detalhes e Fonte da Figura 1.2"):
+        st.write("""
+        **Interpretação:**
+        Este gráfico mostra a proporção entre a área cadastrada no CAR e a área restante da Unidade de Conservação (UC).
 
-if not gdf_cnuc_combinado.empty:
-    for col in ['ha_total', 'num_area', 'alerta_km2', 'sigef_km2', 'area_km2']:
-        if col in gdf_cnuc_combinado.columns:
-            gdf_cnuc_combinado[col] = pd.to_numeric(gdf_cnuc_combinado[col], errors='coerce').fillna(0)
+        **Observações:**
+        - A área restante é o que sobra da UC após considerar a área cadastrada no CAR
+        - Pode ocorrer de o CAR ultrapassar 100% devido a sobreposições ou múltiplos cadastros em uma mesma área
+        - Valores podem ser visualizados em hectares ou percentual, conforme seleção acima
 
-tabs = st.tabs(["Sobreposições", "CPT", "Justiça", "Queimadas", "Desmatamento"])
+        **Fonte:** MMA - Ministério do Meio Ambiente. *Cadastro Nacional de Unidades de Conservação*. Brasília: MMA, 2025. Disponível em: https://www.gov.br/mma/. Acesso em: maio de 2025.
+        """)
 
-with tabs[0]:
+@st.fragment
+def aba_sobreposicoes(gdf_cnuc_combinado, gdf_sigef_combinado, alertas, gdf_cnuc_raw,
+                      gdf_ucs_filtradas, gdf_terras_indigenas, centro, indice_incidencia,
+                      piramide_ucs=None, piramide_sigef=None):
+    gdf_alertas_raw = alertas.gdf
     st.header("Sobreposições")
+    # Falha registrada na carga compartilhada das camadas: toda sessão vê o aviso, não só a que carregou
+    if 'ucs_filtradas_car' in registro.avisos:
+        st.warning(f"Aviso: Não foi possível calcular áreas de CAR: {registro.avisos['ucs_filtradas_car']}")
     with st.expander("ℹ️ Sobre esta seção", expanded=True):
         st.write("""
         Esta análise apresenta dados sobre sobreposições territoriais, incluindo:
@@ -241,8 +172,6 @@ with tabs[0]:
             unsafe_allow_html=True
         )
 
-    perc_alerta, perc_sigef, total_unidades, contagem_alerta, contagem_sigef = criar_cards(gdf_cnuc_combinado, gdf_sigef_combinado, None)
-    
     st.markdown("### Filtros")
     col_f1, col_f2, col_f3 = st.columns(3)
     
@@ -266,7 +195,7 @@ with tabs[0]:
     
     with col_f3:
         # Filtrar por tipo antes de montar o dropdown de UCs/TIs
-        gdf_para_dropdown = gdf_cnuc_combinado.copy()
+        gdf_para_dropdown = gdf_cnuc_combinado
         if tipo_area_selecionado != 'Todos' and 'tipo_area' in gdf_para_dropdown.columns:
             gdf_para_dropdown = gdf_para_dropdown[gdf_para_dropdown['tipo_area'] == tipo_area_selecionado]
         
@@ -277,10 +206,11 @@ with tabs[0]:
     # Remover sufixo (T.I) se existir para comparação
     estado_para_filtro = estado_selecionado.replace(' (T.I)', '') if estado_selecionado.endswith(' (T.I)') else estado_selecionado
     
-    gdf_cnuc_filtrado = gdf_cnuc_combinado[gdf_cnuc_combinado['ESTADO'] == estado_para_filtro].copy() if 'ESTADO' in gdf_cnuc_combinado.columns and not gdf_cnuc_combinado.empty else gdf_cnuc_combinado.copy()
-    gdf_alertas_filtrado_cards = gdf_alertas_raw[gdf_alertas_raw['ESTADO'] == estado_para_filtro].copy() if not gdf_alertas_raw.empty and 'ESTADO' in gdf_alertas_raw.columns else gpd.GeoDataFrame()
-    gdf_sigef_filtrado = gdf_sigef_combinado[gdf_sigef_combinado['ESTADO'] == estado_para_filtro].copy() if 'ESTADO' in gdf_sigef_combinado.columns and not gdf_sigef_combinado.empty else gdf_sigef_combinado.copy()
-    gdf_ti_filtrado = gdf_terras_indigenas[gdf_terras_indigenas['ESTADO'] == estado_para_filtro].copy() if not gdf_terras_indigenas.empty and 'ESTADO' in gdf_terras_indigenas.columns else gpd.GeoDataFrame()
+    # As camadas vêm do registro compartilhado entre sessões: filtrar já gera um novo objeto,
+    # e sem filtro a própria camada é usada apenas para leitura
+    gdf_cnuc_filtrado = gdf_cnuc_combinado[gdf_cnuc_combinado['ESTADO'] == estado_para_filtro] if 'ESTADO' in gdf_cnuc_combinado.columns and not gdf_cnuc_combinado.empty else gdf_cnuc_combinado
+    gdf_alertas_filtrado_cards = alertas.fatia(estado_para_filtro) if not gdf_alertas_raw.empty and 'ESTADO' in gdf_alertas_raw.columns else gpd.GeoDataFrame()
+    gdf_sigef_filtrado = gdf_sigef_combinado[gdf_sigef_combinado['ESTADO'] == estado_para_filtro] if 'ESTADO' in gdf_sigef_combinado.columns and not gdf_sigef_combinado.empty else gdf_sigef_combinado
     
     # Aplicar filtro de tipo (UC ou T.I)
     if tipo_area_selecionado != 'Todos' and 'tipo_area' in gdf_cnuc_filtrado.columns:
@@ -305,23 +235,18 @@ with tabs[0]:
             area_total_ucs = gdf_cnuc_filtrado['area_km2'].sum() * 100
         else:
             try:
-                area_total_ucs = gdf_cnuc_filtrado.to_crs(epsg=31983).geometry.area.sum() / 10000
+                area_total_ucs = geometria_projetada(gdf_cnuc_filtrado).area.sum() / 10000
             except:
                 area_total_ucs = 0
         
         try:
-            gdf_cnuc_proj = gdf_cnuc_filtrado.to_crs(epsg=31983)
-            
+            # Mesma soma das áreas de intersecção do overlay, servida pelo cache do motor de sobreposição
             if not gdf_alertas_filtrado_cards.empty:
-                gdf_alertas_proj = gdf_alertas_filtrado_cards.to_crs(epsg=31983)
-                intersecao_alertas = gpd.overlay(gdf_cnuc_proj, gdf_alertas_proj, how='intersection')
-                area_alertas_ucs = intersecao_alertas.geometry.area.sum() / 10000 if not intersecao_alertas.empty else 0
+                area_alertas_ucs = obter_sobreposicao_por_uc(gdf_cnuc_filtrado, gdf_alertas_filtrado_cards)['area_ha'].sum()
             
             if not gdf_sigef_filtrado.empty:
-                gdf_sigef_proj = gdf_sigef_filtrado.to_crs(epsg=31983)
-                intersecao_cars = gpd.overlay(gdf_cnuc_proj, gdf_sigef_proj, how='intersection')
-                area_cars_ucs = intersecao_cars.geometry.area.sum() / 10000 if not intersecao_cars.empty else 0
-        except Exception as e:
+                area_cars_ucs = obter_sobreposicao_por_uc(gdf_cnuc_filtrado, gdf_sigef_filtrado)['area_ha'].sum()
+        except Exception:
             if 'alerta_km2' in gdf_cnuc_filtrado.columns:
                 area_alertas_ucs = gdf_cnuc_filtrado['alerta_km2'].sum() * 100
             if 'sigef_km2' in gdf_cnuc_filtrado.columns:
@@ -417,82 +342,11 @@ with tabs[0]:
 
     row1_map, row1_chart1 = st.columns([3, 2], gap="large")
     with row1_map:
-        if not gdf_cnuc_filtrado.empty and 'nome_uc' in gdf_cnuc_filtrado.columns:
-            ucs_disponiveis = sorted(gdf_cnuc_filtrado['nome_uc'].dropna().unique().tolist())
-            opcoes_uc = ["Selecione", "Todas"] + ucs_disponiveis
-        else:
-            opcoes_uc = ["Selecione", "Todas"]
-        uc_selecionada = st.selectbox("Área de Conservação:", opcoes_uc, index=0, help="Selecione uma área de conservação para destacar no mapa")
-        
-        gdf_cnuc_map = gdf_cnuc_filtrado.copy()
-        gdf_sigef_map = gdf_sigef_filtrado.copy()
-        ids_selecionados_map = []
-
-        # Filtrar CARs pela UC selecionada através de intersecção geométrica
-        if uc_selecionada and uc_selecionada not in ["Selecione", "Todas"]:
-            if 'nome_uc' in gdf_cnuc_map.columns:
-                ids_selecionados_map = gdf_cnuc_map[gdf_cnuc_map["nome_uc"] == uc_selecionada]["nome_uc"].unique().tolist()
-                
-                # Filtrar CARs que intersectam com a UC selecionada
-                uc_geom = gdf_cnuc_map[gdf_cnuc_map["nome_uc"] == uc_selecionada]
-                if not uc_geom.empty and not gdf_sigef_map.empty:
-                    try:
-                        # Garantir mesmo CRS
-                        if uc_geom.crs != gdf_sigef_map.crs:
-                            gdf_sigef_map = gdf_sigef_map.to_crs(uc_geom.crs)
-                        # Filtrar CARs que intersectam a UC
-                        gdf_sigef_map = gdf_sigef_map[gdf_sigef_map.intersects(uc_geom.unary_union)]
-                    except Exception as e:
-                        st.warning(f"Aviso ao filtrar CARs: {e}")
-
-        st.subheader("Mapa de Unidades")
-        # Passar "todos" se há CARs filtrados para exibir
-        invadindo_para_mapa = "todos" if (uc_selecionada not in ["Selecione", "Todas"] and not gdf_sigef_map.empty) else None
-        fig_map = criar_figura(gdf_cnuc_map, gdf_sigef_map, None, centro, ids_selecionados_map, invadindo_para_mapa)
-        fig_map.update_layout(height=300)
-        st.plotly_chart(
-            fig_map,
-            use_container_width=True,
-            config={"scrollZoom": True}
-        )
-        st.caption("Figura 1.1: Distribuição espacial das unidades de conservação.")
-        with st.expander("Detalhes e Fonte da Figura 1.1"):
-            st.write("""
-            **Interpretação:**
-            O mapa mostra a distribuição espacial das unidades de conservação na região, destacando as áreas com sobreposições selecionadas.
-
-            **Observações:**
-            - Áreas em destaque indicam unidades de conservação
-            - Cores diferentes representam diferentes tipos de unidades
-            - Sobreposições são destacadas quando selecionadas no filtro
-
-            **Fonte:** MMA - Ministério do Meio Ambiente. *Cadastro Nacional de Unidades de Conservação*. Brasília: MMA, 2025. Disponível em: https://www.gov.br/mma/. Acesso em: maio de 2025.
-            """)
-
-        st.subheader("Proporção da Área do CAR sobre a UC")
-        uc_names = ["Todas"] + sorted(gdf_cnuc_filtrado["nome_uc"].unique()) if not gdf_cnuc_filtrado.empty and 'nome_uc' in gdf_cnuc_filtrado.columns else ["Todas"]
-        nome_uc = st.selectbox("Selecione a Unidade de Conservação:", uc_names)
-        modo_input = st.radio("Mostrar valores como:", ["Hectares (ha)", "% da UC"], horizontal=True)
-        modo = "absoluto" if modo_input == "Hectares (ha)" else "percent"
-        fig = fig_car_por_uc_donut(gdf_cnuc_filtrado, nome_uc, modo)
-        st.plotly_chart(fig, use_container_width=True)
-        st.caption("Figura 1.2: Comparação entre área do CAR e área restante da UC.")
-        with st.expander("Detalhes e Fonte da Figura 1.2"):
-            st.write("""
-            **Interpretação:**
-            Este gráfico mostra a proporção entre a área cadastrada no CAR e a área restante da Unidade de Conservação (UC).
-
-            **Observações:**
-            - A área restante é o que sobra da UC após considerar a área cadastrada no CAR
-            - Pode ocorrer de o CAR ultrapassar 100% devido a sobreposições ou múltiplos cadastros em uma mesma área
-            - Valores podem ser visualizados em hectares ou percentual, conforme seleção acima
-
-            **Fonte:** MMA - Ministério do Meio Ambiente. *Cadastro Nacional de Unidades de Conservação*. Brasília: MMA, 2025. Disponível em: https://www.gov.br/mma/. Acesso em: maio de 2025.
-            """)
+        bloco_mapa_ucs(gdf_cnuc_filtrado, gdf_sigef_filtrado, centro, piramide_ucs, piramide_sigef)
 
     with row1_chart1:
         # Atualizar valores de alertas nas UCs com base nos alertas filtrados
-        gdf_cnuc_com_alertas = atualizar_alertas_em_ucs(gdf_cnuc_filtrado, gdf_alertas_filtrado_cards)
+        gdf_cnuc_com_alertas = atualizar_alertas_em_ucs(gdf_cnuc_filtrado, gdf_alertas_filtrado_cards, indice_incidencia)
         
         st.subheader("Áreas por UC")
         st.plotly_chart(fig_sobreposicoes(gdf_cnuc_com_alertas), use_container_width=True, config={'displayModeBar': True})
@@ -558,7 +412,7 @@ with tabs[0]:
     with dados_tabs[0]:
         st.markdown("**Dados brutos de alertas de desmatamento:**")
         if not gdf_alertas_filtrado_cards.empty:
-            df_alertas_display = gdf_alertas_filtrado_cards.drop(columns=['geometry']) if 'geometry' in gdf_alertas_filtrado_cards.columns else gdf_alertas_filtrado_cards
+            df_alertas_display = sem_geometria(gdf_alertas_filtrado_cards)
             st.dataframe(df_alertas_display, use_container_width=True, hide_index=True)
         else:
             st.info("Nenhum dado de alertas disponível para o filtro selecionado.")
@@ -566,7 +420,7 @@ with tabs[0]:
     with dados_tabs[1]:
         st.markdown("**Dados brutos das Unidades de Conservação:**")
         if not gdf_cnuc_filtrado.empty:
-            df_cnuc_display = gdf_cnuc_filtrado.drop(columns=['geometry']) if 'geometry' in gdf_cnuc_filtrado.columns else gdf_cnuc_filtrado
+            df_cnuc_display = sem_geometria(gdf_cnuc_filtrado)
             st.dataframe(df_cnuc_display, use_container_width=True, hide_index=True)
         else:
             st.info("Nenhum dado de UCs disponível para o filtro selecionado.")
@@ -574,304 +428,18 @@ with tabs[0]:
     with dados_tabs[2]:
         st.markdown("**Dados brutos do SIGEF/CAR:**")
         if not gdf_sigef_filtrado.empty:
-            df_sigef_display = gdf_sigef_filtrado.drop(columns=['geometry']) if 'geometry' in gdf_sigef_filtrado.columns else gdf_sigef_filtrado
+            df_sigef_display = sem_geometria(gdf_sigef_filtrado)
             st.dataframe(df_sigef_display, use_container_width=True, hide_index=True)
         else:
             st.info("Nenhum dado do SIGEF/CAR disponível para o filtro selecionado.")
 
-with tabs[1]:
-    st.header("Impacto Social - CPT")
-    
-    with st.expander("ℹ️ Sobre esta seção", expanded=True):
-        st.write("""
-        Esta análise apresenta dados consolidados sobre impactos sociais relacionados a conflitos agrários, incluindo:
-        - Áreas de conflito
-        - Assassinatos registrados
-        - Conflitos por terra
-        - Trabalho escravo
-        - Famílias afetadas
-
-        Os dados são provenientes da Comissão Pastoral da Terra (CPT) e foram consolidados a partir das bases de dados atualizadas.
-        """)
-        st.markdown(
-            "**Fonte Geral da Seção:** CPT - Comissão Pastoral da Terra. Conflitos no Campo Brasil. Goiânia: CPT Nacional.",
-            unsafe_allow_html=True
-        )
-
-    with st.spinner("Carregando dados CPT do PostgreSQL..."):
-        try:
-            import psycopg2
-            
-            conn_params = {
-                'host': 'dataiesb.iesbtech.com.br',
-                'database': '2312120036_Joel',
-                'user': '2312120036_Joel',
-                'password': '2312120036_Joel',
-                'port': '5432'
-            }
-            
-            conn = psycopg2.connect(**conn_params)
-            
-            cpt_data = {}
-        
-            tabelas_cpt = {
-                'areas_conflito': '"CPT".areas_conflito',
-                'assassinatos': '"CPT".assassinatos_consolidado_padronizado',
-                'conflitos': '"CPT".conflitos_cpt',
-                'trabalho_escravo': '"CPT".trabalho_escravo_consolidado'
-            }
-            
-            total_carregado = 0
-            
-            for chave, nome_tabela in tabelas_cpt.items():
-                try:
-                    query = f"SELECT * FROM {nome_tabela}"
-                    df_resultado = pd.read_sql_query(query, conn)
-                    cpt_data[chave] = df_resultado
-                    total_carregado += len(df_resultado)
-                except Exception as e:
-                    cpt_data[chave] = pd.DataFrame()
-                    st.warning(f"⚠️ Erro ao carregar {chave}: {e}")
-            
-            conn.close()
-            
-            if total_carregado == 0:
-                st.warning("⚠️ Nenhum dado CPT encontrado no esquema CPT")
-                
-        except ImportError:
-            st.error("❌ psycopg2 não instalado. Execute: `pip install psycopg2-binary`")
-            
-            cpt_data = {
-                'areas_conflito': pd.DataFrame(),
-                'assassinatos': pd.DataFrame(), 
-                'conflitos': pd.DataFrame(),
-                'trabalho_escravo': pd.DataFrame()
-            }
-            
-        except Exception as e:
-            st.error(f"❌ Erro ao conectar ao PostgreSQL: {str(e)}")
-            
-            cpt_data = {
-                'areas_conflito': pd.DataFrame(),
-                'assassinatos': pd.DataFrame(), 
-                'conflitos': pd.DataFrame(),
-                'trabalho_escravo': pd.DataFrame()
-            }
-    
-    def clean_state_data(estado_value):
-        if pd.isna(estado_value):
-            return None
-        
-        estado_str = str(estado_value).strip().upper()
-        
-        if estado_str in ['UF', 'NAN', 'NONE', 'NULL', '']:
-            return None
-        
-        if estado_str.isdigit():
-            return None
-        
-        if any(char.isdigit() for char in estado_str):
-            return None
-        
-        if not all(char.isalpha() or char.isspace() for char in estado_str):
-            return None
-        
-        if len(estado_str.replace(' ', '')) < 2:
-            return None
-        
-        siglas_para_estados = {
-            'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas',
-            'BA': 'Bahia', 'CE': 'Ceará', 'DF': 'Distrito Federal',
-            'ES': 'Espírito Santo', 'GO': 'Goiás', 'MA': 'Maranhão',
-            'MT': 'Mato Grosso', 'MS': 'Mato Grosso do Sul', 'MG': 'Minas Gerais',
-            'PA': 'Pará', 'PB': 'Paraíba', 'PR': 'Paraná', 'PE': 'Pernambuco',
-            'PI': 'Piauí', 'RJ': 'Rio de Janeiro', 'RN': 'Rio Grande do Norte',
-            'RS': 'Rio Grande do Sul', 'RO': 'Rondônia', 'RR': 'Roraima',
-            'SC': 'Santa Catarina', 'SP': 'São Paulo', 'SE': 'Sergipe',
-            'TO': 'Tocantins'
-        }
-        
-        if estado_str in siglas_para_estados:
-            return siglas_para_estados[estado_str]
-        
-        for sigla, nome_completo in siglas_para_estados.items():
-            if estado_str == nome_completo.upper():
-                return nome_completo
-        
-        correcoes = {
-            'PARA': 'Pará', 'CEARA': 'Ceará', 'ESPIRITO SANTO': 'Espírito Santo',
-            'GOIAS': 'Goiás', 'MARANHAO': 'Maranhão', 'PARAIBA': 'Paraíba',
-            'PARANA': 'Paraná', 'PIAUI': 'Piauí', 'RONDONIA': 'Rondônia',
-            'SAO PAULO': 'São Paulo'
-        }
-        
-        if estado_str in correcoes:
-            return correcoes[estado_str]
-        
-        nomes_validos = list(siglas_para_estados.values())
-        for nome_valido in nomes_validos:
-            if estado_str == nome_valido.upper() or estado_str.replace(' ', '') == nome_valido.upper().replace(' ', ''):
-                return nome_valido
-        
-        return None
-    
-    estados_disponiveis_cpt = []
-    for tabela_key, df_tabela in cpt_data.items():
-        if not df_tabela.empty:
-            colunas_estado = ['estado', 'Estado', 'ESTADO', 'uf', 'UF', 'sigla_uf', 'unidade_federacao']
-            for col in colunas_estado:
-                if col in df_tabela.columns:
-                    estados_limpos = df_tabela[col].dropna().apply(clean_state_data).dropna().unique().tolist()
-                    estados_disponiveis_cpt.extend(estados_limpos)
-                    break
-    
-    estados_disponiveis_cpt = [estado for estado in set(estados_disponiveis_cpt) if estado and isinstance(estado, str)]
-    estados_disponiveis_cpt = sorted(estados_disponiveis_cpt)
-    
-    if len(estados_disponiveis_cpt) > 0:
-        st.markdown("### Filtros")
-        estado_selecionado_cpt = st.selectbox('Filtrar por Estado:', estados_disponiveis_cpt, index=0, key="filtro_estado_cpt")
-        
-        if estado_selecionado_cpt:
-            cpt_data_filtrado = {}
-            for tabela_key, df_tabela in cpt_data.items():
-                if not df_tabela.empty:
-                    colunas_estado = ['estado', 'Estado', 'ESTADO', 'uf', 'UF', 'sigla_uf', 'unidade_federacao']
-                    coluna_estado_encontrada = None
-                    for col in colunas_estado:
-                        if col in df_tabela.columns:
-                            coluna_estado_encontrada = col
-                            break
-                    
-                    if coluna_estado_encontrada:
-                        cpt_data_filtrado[tabela_key] = df_tabela[df_tabela[coluna_estado_encontrada] == estado_selecionado_cpt]
-                    else:
-                        cpt_data_filtrado[tabela_key] = df_tabela
-                else:
-                    cpt_data_filtrado[tabela_key] = df_tabela
-            cpt_processed_data = processar_dados_cpt_por_municipios(cpt_data_filtrado)
-            df_summary = cpt_processed_data['municipios_summary']
-            cpt_data_final = cpt_data_filtrado
-    else:
-        cpt_processed_data = processar_dados_cpt_por_municipios(cpt_data)
-        df_summary = cpt_processed_data['municipios_summary']
-        cpt_data_final = cpt_data
-    
-    st.markdown("### Resumo Geral")
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    total_municipios = len(df_summary)
-    total_conflitos = df_summary['Total_Ocorrencias'].sum() if 'Total_Ocorrencias' in df_summary.columns else 0
-    total_familias = df_summary['Total_Familias'].sum() if 'Total_Familias' in df_summary.columns else 0
-    total_areas = df_summary['Areas_Conflito'].sum() if 'Areas_Conflito' in df_summary.columns else 0
-    
-    with col1:
-        st.metric("Municípios", f"{total_municipios:,}")
-    with col2:
-        st.metric("Total de Ocorrências", f"{total_conflitos:,}")
-    with col3:
-        st.metric("Total de Famílias", f"{total_familias:,}")
-    with col4:
-        st.metric("Áreas em Conflito", f"{total_areas:,}")
-    
-    st.markdown("### Análise por Municípios")
-    
-    col_ranking, col_familias = st.columns(2)
-    
-    with col_ranking:
-        st.markdown("#### Ranking de Municípios")
-        
-        if len(df_summary) > 0 and 'Total_Ocorrencias' in df_summary.columns:
-            top_10 = df_summary.nlargest(10, 'Total_Ocorrencias')
-            
-            if not top_10.empty:
-                fig_ranking = px.bar(
-                    top_10,
-                    x='Total_Ocorrencias',
-                    y='Município',
-                    orientation='h',
-                    title="Top 10 Municípios por Total de Ocorrências",
-                    color='Total_Ocorrencias',
-                    color_continuous_scale='Reds'
-                )
-                fig_ranking.update_layout(
-                    height=400,
-                    yaxis={'categoryorder': 'total ascending'},
-                    margin=dict(l=80, r=50, t=50, b=40)
-                )
-                st.plotly_chart(fig_ranking, use_container_width=True)
-            else:
-                st.info("Dados insuficientes para ranking")
-        else:
-            st.info("Dados não disponíveis")
-    
-    with col_familias:
-        st.markdown("#### Top Municípios por Famílias Afetadas")
-        
-        if not df_summary.empty and 'Total_Familias' in df_summary.columns:
-            df_familias = df_summary[
-                (df_summary['Total_Familias'] > 0) & 
-                (df_summary['Município'].notna()) & 
-                (df_summary['Município'] != '') &
-                (df_summary['Município'] != 'None') &
-                (df_summary['Município'] != 'Nan') &
-                (df_summary['Município'].str.len() > 2)
-            ].copy()
-            
-            if not df_familias.empty:
-                df_familias['Município'] = df_familias['Município'].astype(str).str.strip().str.title()
-                
-                top_familias = df_familias.nlargest(10, 'Total_Familias').sort_values('Total_Familias', ascending=True)
-                
-                familias_text = [formatar_numero_com_pontos(val, 0) for val in top_familias['Total_Familias']]
-                
-                fig_familias_top = go.Figure()
-                fig_familias_top.add_trace(go.Bar(
-                    x=top_familias['Total_Familias'],
-                    y=top_familias['Município'],
-                    orientation='h',
-                    text=familias_text,
-                    textposition='auto',
-                    marker=dict(
-                        color=top_familias['Total_Familias'],
-                        colorscale='Reds',
-                        line=dict(color='rgb(80,80,80)', width=0.5)
-                    ),
-                    hovertemplate='<b>%{y}</b><br>Famílias: %{text}<extra></extra>'
-                ))
-                
-                fig_familias_top.update_layout(
-                    title="Top 10 Municípios por Famílias Afetadas",
-                    xaxis_title="Famílias Afetadas",
-                    yaxis_title="",
-                    height=400,
-                    margin=dict(l=120, r=80, t=50, b=40),
-                    yaxis=dict(tickfont=dict(size=10)),
-                    xaxis=dict(tickfont=dict(size=10), range=[0, top_familias['Total_Familias'].max() * 1.15]),
-                    showlegend=False
-                )
-
-                st.plotly_chart(fig_familias_top, use_container_width=True)
-            else:
-                st.info("Sem dados válidos de famílias afetadas após limpeza")
-        else:
-            st.info("Dados de famílias não disponíveis")
-    
-    st.markdown("### Evolução Temporal dos Dados CPT")
-    
+@st.fragment
+def bloco_temporal_cpt(cpt_data_final):
     with st.spinner("Carregando dados temporais..."):
         try:
             if any(len(df) > 0 for df in cpt_data_final.values()):
                 df_temporal = pd.DataFrame()
             
-                colunas_ano = {
-                    'conflitos': ['ano', 'ano_referencia'],
-                    'areas_conflito': ['Ano', 'ano', 'ano_referencia'],
-                    'assassinatos': ['Ano', 'ano', 'ano_referencia'],
-                    'trabalho_escravo': ['Ano', 'ano', 'ano_referencia']
-                }
-                
                 tabelas_info = {
                     'conflitos': 'Conflitos por Terra',
                     'areas_conflito': 'Áreas em Conflito', 
@@ -884,7 +452,7 @@ with tabs[1]:
                         df_tabela = cpt_data_final[tabela_key].copy()
                         
                         ano_col = None
-                        for col_possivel in colunas_ano.get(tabela_key, ['ano']):
+                        for col_possivel in COLUNAS_ANO_TEMPORAL_CPT.get(tabela_key, ['ano']):
                             if col_possivel in df_tabela.columns:
                                 ano_col = col_possivel
                                 break
@@ -982,12 +550,167 @@ with tabs[1]:
                 else:
                     st.info("Nenhum dado encontrado com os filtros selecionados")
             else:
-                st.warning("⚠️ Dados temporais não disponíveis - verifique se as tabelas contêm colunas de ano válidas")
+                st.warning("⚠️ Dados temporais não disponíveis - verifique se as tabelas contêm colunas de ano válidas")
+        
+        except Exception as e:
+            st.error(f"❌ Erro ao carregar dados temporais: {str(e)}")
+            import traceback
+            st.code(traceback.format_exc())
+
+@st.fragment
+def aba_cpt():
+    st.header("Impacto Social - CPT")
+    
+    with st.expander("ℹ️ Sobre esta seção", expanded=True):
+        st.write("""
+        Esta análise apresenta dados consolidados sobre impactos sociais relacionados a conflitos agrários, incluindo:
+        - Áreas de conflito
+        - Assassinatos registrados
+        - Conflitos por terra
+        - Trabalho escravo
+        - Famílias afetadas
+
+        Os dados são provenientes da Comissão Pastoral da Terra (CPT) e foram consolidados a partir das bases de dados atualizadas.
+        """)
+        st.markdown(
+            "**Fonte Geral da Seção:** CPT - Comissão Pastoral da Terra. Conflitos no Campo Brasil. Goiânia: CPT Nacional.",
+            unsafe_allow_html=True
+        )
+
+    with st.spinner("Carregando dados CPT do PostgreSQL..."):
+        cpt_data = carregar_dados_cpt()
+    
+    estados_disponiveis_cpt = []
+    for tabela_key, df_tabela in cpt_data.items():
+        if not df_tabela.empty:
+            for col in COLUNAS_ESTADO_CPT:
+                if col in df_tabela.columns:
+                    estados_limpos = normalizar_serie_estados(df_tabela[col].dropna(), tolerante=True).dropna().unique().tolist()
+                    estados_disponiveis_cpt.extend(estados_limpos)
+                    break
+    
+    estados_disponiveis_cpt = [estado for estado in set(estados_disponiveis_cpt) if estado and isinstance(estado, str)]
+    estados_disponiveis_cpt = sorted(estados_disponiveis_cpt)
+    
+    if len(estados_disponiveis_cpt) > 0:
+        st.markdown("### Filtros")
+        estado_selecionado_cpt = st.selectbox('Filtrar por Estado:', estados_disponiveis_cpt, index=0, key="filtro_estado_cpt")
+        
+        if estado_selecionado_cpt:
+            cpt_data_filtrado = {tabela_key: filtrar_tabela_cpt_por_estado(df_tabela, estado_selecionado_cpt)
+                                 for tabela_key, df_tabela in cpt_data.items()}
+            cpt_processed_data = processar_dados_cpt_por_municipios(cpt_data_filtrado)
+            df_summary = cpt_processed_data['municipios_summary']
+            cpt_data_final = cpt_data_filtrado
+    else:
+        cpt_processed_data = processar_dados_cpt_por_municipios(cpt_data)
+        df_summary = cpt_processed_data['municipios_summary']
+        cpt_data_final = cpt_data
+    
+    st.markdown("### Resumo Geral")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    total_municipios = len(df_summary)
+    total_conflitos = df_summary['Total_Ocorrencias'].sum() if 'Total_Ocorrencias' in df_summary.columns else 0
+    total_familias = df_summary['Total_Familias'].sum() if 'Total_Familias' in df_summary.columns else 0
+    total_areas = df_summary['Areas_Conflito'].sum() if 'Areas_Conflito' in df_summary.columns else 0
+    
+    with col1:
+        st.metric("Municípios", f"{total_municipios:,}")
+    with col2:
+        st.metric("Total de Ocorrências", f"{total_conflitos:,}")
+    with col3:
+        st.metric("Total de Famílias", f"{total_familias:,}")
+    with col4:
+        st.metric("Áreas em Conflito", f"{total_areas:,}")
+    
+    st.markdown("### Análise por Municípios")
+    
+    col_ranking, col_familias = st.columns(2)
+    
+    with col_ranking:
+        st.markdown("#### Ranking de Municípios")
+        
+        if len(df_summary) > 0 and 'Total_Ocorrencias' in df_summary.columns:
+            top_10 = df_summary.nlargest(10, 'Total_Ocorrencias')
+            
+            if not top_10.empty:
+                fig_ranking = px.bar(
+                    top_10,
+                    x='Total_Ocorrencias',
+                    y='Município',
+                    orientation='h',
+                    title="Top 10 Municípios por Total de Ocorrências",
+                    color='Total_Ocorrencias',
+                    color_continuous_scale='Reds'
+                )
+                fig_ranking.update_layout(
+                    height=400,
+                    yaxis={'categoryorder': 'total ascending'},
+                    margin=dict(l=80, r=50, t=50, b=40)
+                )
+                st.plotly_chart(fig_ranking, use_container_width=True)
+            else:
+                st.info("Dados insuficientes para ranking")
+        else:
+            st.info("Dados não disponíveis")
+    
+    with col_familias:
+        st.markdown("#### Top Municípios por Famílias Afetadas")
         
-        except Exception as e:
-            st.error(f"❌ Erro ao carregar dados temporais: {str(e)}")
-            import traceback
-            st.code(traceback.format_exc())
+        if not df_summary.empty and 'Total_Familias' in df_summary.columns:
+            df_familias = df_summary[
+                (df_summary['Total_Familias'] > 0) & 
+                (df_summary['Município'].notna()) & 
+                (df_summary['Município'] != '') &
+                (df_summary['Município'] != 'None') &
+                (df_summary['Município'] != 'Nan') &
+                (df_summary['Município'].str.len() > 2)
+            ].copy()
+            
+            if not df_familias.empty:
+                df_familias['Município'] = df_familias['Município'].astype(str).str.strip().str.title()
+                
+                top_familias = df_familias.nlargest(10, 'Total_Familias').sort_values('Total_Familias', ascending=True)
+                
+                familias_text = [formatar_numero_com_pontos(val, 0) for val in top_familias['Total_Familias']]
+                
+                fig_familias_top = go.Figure()
+                fig_familias_top.add_trace(go.Bar(
+                    x=top_familias['Total_Familias'],
+                    y=top_familias['Município'],
+                    orientation='h',
+                    text=familias_text,
+                    textposition='auto',
+                    marker=dict(
+                        color=top_familias['Total_Familias'],
+                        colorscale='Reds',
+                        line=dict(color='rgb(80,80,80)', width=0.5)
+                    ),
+                    hovertemplate='<b>%{y}</b><br>Famílias: %{text}<extra></extra>'
+                ))
+                
+                fig_familias_top.update_layout(
+                    title="Top 10 Municípios por Famílias Afetadas",
+                    xaxis_title="Famílias Afetadas",
+                    yaxis_title="",
+                    height=400,
+                    margin=dict(l=120, r=80, t=50, b=40),
+                    yaxis=dict(tickfont=dict(size=10)),
+                    xaxis=dict(tickfont=dict(size=10), range=[0, top_familias['Total_Familias'].max() * 1.15]),
+                    showlegend=False
+                )
+
+                st.plotly_chart(fig_familias_top, use_container_width=True)
+            else:
+                st.info("Sem dados válidos de famílias afetadas após limpeza")
+        else:
+            st.info("Dados de famílias não disponíveis")
+    
+    st.markdown("### Evolução Temporal dos Dados CPT")
+    
+    bloco_temporal_cpt(cpt_data_final)
     
     st.markdown("### Gráficos dos Dados CPT")
     
@@ -1186,7 +909,10 @@ with tabs[1]:
         )
         
         tabela_real = tabela_selecionada.split('(')[1].replace(')', '')
-        df_tabela_selecionada = cpt_processed_data['detailed_data'][tabela_real]
+        # O resumo usa só as colunas projetadas; o visualizador lê a tabela inteira sob demanda
+        df_tabela_selecionada = carregar_tabela_cpt_completa(tabela_real)
+        if estados_disponiveis_cpt:
+            df_tabela_selecionada = filtrar_tabela_cpt_por_estado(df_tabela_selecionada, estado_selecionado_cpt)
         
         if not df_tabela_selecionada.empty:
             df_tabela_filtrada = df_tabela_selecionada.copy()
@@ -1219,7 +945,175 @@ with tabs[1]:
     else:
         st.warning("Nenhuma tabela detalhada disponível.")
 
-with tabs[2]:
+@st.fragment
+def bloco_tabela_processos(df_proc_raw):
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        tipo_analise = st.selectbox(
+            "Escolha o tipo de análise:",
+            ["Municípios com mais processos", "Órgãos mais atuantes", "Classes processuais mais frequentes", "Assuntos mais recorrentes", "Dados gerais relevantes"],
+            key="tipo_analise_proc"
+        )
+    
+    with col2:
+        if 'data_ajuizamento' in df_proc_raw.columns:
+            anos_proc = pd.to_datetime(df_proc_raw['data_ajuizamento'], errors='coerce').dt.year
+            anos_disponiveis_just = sorted([ano for ano in anos_proc.dropna().unique() if not pd.isna(ano)])
+            if anos_disponiveis_just:
+                ano_selecionado_just = st.selectbox(
+                    "Filtrar por ano:",
+                    ["Todos os anos"] + anos_disponiveis_just,
+                    key="ano_filter_proc"
+                )
+            else:
+                ano_selecionado_just = "Todos os anos"
+        else:
+            ano_selecionado_just = "Todos os anos"
+    
+    # Cópia local: as tabelas abaixo limpam colunas in-place e df_proc_raw é compartilhado entre sessões
+    if ano_selecionado_just != "Todos os anos":
+        df_filtrado = df_proc_raw[anos_proc == ano_selecionado_just].copy()
+    else:
+        df_filtrado = df_proc_raw.copy()
+
+    def limpar_texto(texto):
+        if pd.isna(texto):
+            return ""
+        return str(texto).strip().title()
+
+    if tipo_analise == "Municípios com mais processos":
+        if 'municipio' in df_filtrado.columns and len(df_filtrado) > 0:
+            df_filtrado['municipio'] = df_filtrado['municipio'].apply(limpar_texto)
+            
+            municipio_counts = df_filtrado['municipio'].value_counts().reset_index()
+            municipio_counts.columns = ['Município', 'Total de Processos']
+            
+            if 'data_ajuizamento' in df_filtrado.columns:
+                df_filtrado['data_ajuizamento'] = pd.to_datetime(df_filtrado['data_ajuizamento'], errors='coerce')
+                datas_municipio = df_filtrado.groupby('municipio', observed=False)['data_ajuizamento'].agg(['min', 'max']).reset_index()
+                datas_municipio.columns = ['Município', 'Primeiro Processo', 'Último Processo']
+                municipio_counts = municipio_counts.merge(datas_municipio, on='Município', how='left')
+            
+            municipio_counts = municipio_counts.head(20)
+            st.dataframe(municipio_counts, use_container_width=True)
+            st.caption("Tabela 4.1: Top 20 municípios com mais processos judiciais.")
+        else:
+             st.info("Dados insuficientes para gerar esta tabela.")
+        
+    elif tipo_analise == "Órgãos mais atuantes":
+        if 'orgao_julgador' in df_filtrado.columns and len(df_filtrado) > 0:
+            df_filtrado['orgao_julgador'] = df_filtrado['orgao_julgador'].apply(limpar_texto)
+            
+            orgao_counts = df_filtrado['orgao_julgador'].value_counts().reset_index()
+            orgao_counts.columns = ['Órgão Julgador', 'Total de Processos']
+            
+            if 'data_ajuizamento' in df_filtrado.columns:
+                df_filtrado['data_ajuizamento'] = pd.to_datetime(df_filtrado['data_ajuizamento'], errors='coerce')
+                datas_orgao = df_filtrado.groupby('orgao_julgador', observed=False)['data_ajuizamento'].agg(['min', 'max']).reset_index()
+                datas_orgao.columns = ['Órgão Julgador', 'Primeiro Processo', 'Último Processo']
+                orgao_counts = orgao_counts.merge(datas_orgao, on='Órgão Julgador', how='left')
+            
+            orgao_counts = orgao_counts.head(15)
+            st.dataframe(orgao_counts, use_container_width=True)
+            st.caption("Tabela 4.1: Top 15 órgãos julgadores mais atuantes.")
+        else:
+             st.info("Dados insuficientes para gerar esta tabela.")
+
+    elif tipo_analise == "Classes processuais mais frequentes":
+        if 'classe' in df_filtrado.columns and len(df_filtrado) > 0:
+            df_filtrado['classe'] = df_filtrado['classe'].apply(limpar_texto)
+            
+            classe_counts = df_filtrado['classe'].value_counts().reset_index()
+            classe_counts.columns = ['Classe Processual', 'Total de Processos']
+            
+            if 'data_ajuizamento' in df_filtrado.columns:
+                df_filtrado['data_ajuizamento'] = pd.to_datetime(df_filtrado['data_ajuizamento'], errors='coerce')
+                datas_classe = df_filtrado.groupby('classe', observed=False)['data_ajuizamento'].agg(['min', 'max']).reset_index()
+                datas_classe.columns = ['Classe Processual', 'Primeiro Processo', 'Último Processo']
+                classe_counts = classe_counts.merge(datas_classe, on='Classe Processual', how='left')
+            
+            classe_counts = classe_counts.head(15)
+            st.dataframe(classe_counts, use_container_width=True)
+            st.caption("Tabela 4.1: Top 15 classes processuais mais frequentes.")
+        else:
+             st.info("Dados insuficientes para gerar esta tabela.")
+
+    elif tipo_analise == "Assuntos mais recorrentes":
+        if 'assuntos' in df_filtrado.columns and len(df_filtrado) > 0:
+            df_filtrado['assuntos'] = df_filtrado['assuntos'].apply(limpar_texto)
+            
+            assunto_counts = df_filtrado['assuntos'].value_counts().reset_index()
+            assunto_counts.columns = ['Assunto', 'Total de Processos']
+            
+            if 'data_ajuizamento' in df_filtrado.columns:
+                df_filtrado['data_ajuizamento'] = pd.to_datetime(df_filtrado['data_ajuizamento'], errors='coerce')
+                datas_assunto = df_filtrado.groupby('assuntos', observed=False)['data_ajuizamento'].agg(['min', 'max']).reset_index()
+                datas_assunto.columns = ['Assunto', 'Primeiro Processo', 'Último Processo']
+                assunto_counts = assunto_counts.merge(datas_assunto, on='Assunto', how='left')
+            
+            assunto_counts = assunto_counts.head(15)
+            st.dataframe(assunto_counts, use_container_width=True)
+            st.caption("Tabela 4.1: Top 15 assuntos mais recorrentes.")
+        else:
+             st.info("Dados insuficientes para gerar esta tabela.")
+
+    else: 
+        if len(df_filtrado) > 0:
+            colunas_preferenciais = ['municipio', 'data_ajuizamento', 'classe', 'assuntos', 'orgao_julgador']
+            colunas_existentes = [col for col in colunas_preferenciais if col in df_filtrado.columns]
+            
+            if colunas_existentes:
+                df_relevante = df_filtrado[colunas_existentes].copy()
+                
+                for col in ['municipio', 'classe', 'assuntos', 'orgao_julgador']:
+                    if col in df_relevante.columns:
+                        df_relevante[col] = df_relevante[col].apply(limpar_texto)
+                
+                if 'data_ajuizamento' in df_relevante.columns:
+                    df_relevante['data_ajuizamento'] = pd.to_datetime(df_relevante['data_ajuizamento'], errors='coerce')
+                    df_relevante = df_relevante.sort_values('data_ajuizamento', ascending=False)
+                
+                df_amostra = df_relevante.head(500)
+                st.dataframe(df_amostra, use_container_width=True)
+                st.caption("Tabela 4.1: Dados gerais relevantes dos processos judiciais (limitado a 500 registros).")
+                
+                st.info(f"Mostrando {len(df_amostra)} de {len(df_filtrado)} processos totais.")
+            else:
+                st.warning("Nenhuma coluna relevante encontrada nos dados.")
+        else:
+            st.info("Nenhum processo encontrado com os filtros selecionados.")
+    
+    with st.expander("ℹ️ Sobre esta tabela", expanded=False):
+        if tipo_analise == "Municípios com mais processos":
+            st.write("""
+            Esta tabela mostra os municípios com maior número de processos judiciais,
+            incluindo o total de processos e o período de atuação (primeiro e último processo).
+            """)
+        elif tipo_analise == "Órgãos mais atuantes":
+            st.write("""
+            Esta tabela apresenta os órgãos julgadores com maior volume de processos,
+            mostrando sua atividade ao longo do tempo.
+            """)
+        elif tipo_analise == "Classes processuais mais frequentes":
+            st.write("""
+            Esta tabela mostra as classes processuais mais utilizadas nos processos judiciais,
+            indicando os tipos de ações mais comuns no sistema judiciário.
+            """)
+        elif tipo_analise == "Assuntos mais recorrentes":
+            st.write("""
+            Esta tabela apresenta os assuntos mais frequentes nos processos judiciais,
+            revelando as principais questões levadas ao judiciário.
+            """)
+        else:
+            st.write("""
+            Esta tabela apresenta os dados gerais mais relevantes dos processos judiciais,
+            ordenados por data de ajuizamento (mais recentes primeiro).
+            Limitada a 500 registros para melhor performance.
+            """)
+
+@st.fragment
+def aba_justica(df_proc_raw):
     st.header("Processos Judiciais")
     
     with st.expander("ℹ️ Sobre esta seção", expanded=True):
@@ -1239,7 +1133,7 @@ with tabs[2]:
     )
     
     col_estado = None
-    df_proc_filtrado = df_proc_raw.copy()
+    df_proc_filtrado = df_proc_raw
     
     if 'estado' in df_proc_raw.columns:
         col_estado = 'estado'
@@ -1253,19 +1147,21 @@ with tabs[2]:
         col_estado = 'UF'
     
     if col_estado:
-        estados_justica = df_proc_raw[col_estado].apply(normalizar_estado).dropna().unique()
+        # Normalizado uma vez por valor distinto e reaproveitado no filtro abaixo
+        estados_proc = normalizar_serie_estados(df_proc_raw[col_estado])
+        estados_justica = estados_proc.dropna().unique()
         if len(estados_justica) > 0:
             estados_justica_lista = sorted(estados_justica.tolist())
             
             st.markdown("### Filtros")
             estado_justica = st.selectbox('Filtrar por Estado:', estados_justica_lista, index=0, key="filtro_estado_justica")
             
-            df_proc_filtrado = df_proc_raw[df_proc_raw[col_estado].apply(normalizar_estado) == estado_justica].copy()
+            df_proc_filtrado = df_proc_raw[estados_proc == estado_justica]
     
     if 'data_ajuizamento' in df_proc_filtrado.columns:
-        df_proc_filtrado['data_ajuizamento'] = pd.to_datetime(df_proc_filtrado['data_ajuizamento'], errors='coerce')
+        df_proc_filtrado = df_proc_filtrado.assign(data_ajuizamento=pd.to_datetime(df_proc_filtrado['data_ajuizamento'], errors='coerce'))
     if 'ultima_atualizaçao' in df_proc_filtrado.columns:
-        df_proc_filtrado['ultima_atualizaçao'] = pd.to_datetime(df_proc_filtrado['ultima_atualizaçao'], errors='coerce')
+        df_proc_filtrado = df_proc_filtrado.assign(ultima_atualizaçao=pd.to_datetime(df_proc_filtrado['ultima_atualizaçao'], errors='coerce'))
 
     if not df_proc_filtrado.empty:
         figs_j = fig_justica(df_proc_filtrado)
@@ -1390,170 +1286,7 @@ with tabs[2]:
         </div>
         """, unsafe_allow_html=True)
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            tipo_analise = st.selectbox(
-                "Escolha o tipo de análise:",
-                ["Municípios com mais processos", "Órgãos mais atuantes", "Classes processuais mais frequentes", "Assuntos mais recorrentes", "Dados gerais relevantes"],
-                key="tipo_analise_proc"
-            )
-        
-        with col2:
-            if 'data_ajuizamento' in df_proc_raw.columns:
-                df_proc_raw['ano'] = pd.to_datetime(df_proc_raw['data_ajuizamento'], errors='coerce').dt.year
-                anos_disponiveis_just = sorted([ano for ano in df_proc_raw['ano'].dropna().unique() if not pd.isna(ano)])
-                if anos_disponiveis_just:
-                    ano_selecionado_just = st.selectbox(
-                        "Filtrar por ano:",
-                        ["Todos os anos"] + anos_disponiveis_just,
-                        key="ano_filter_proc"
-                    )
-                else:
-                    ano_selecionado_just = "Todos os anos"
-            else:
-                ano_selecionado_just = "Todos os anos"
-        
-        df_proc_filtered_year = df_proc_raw.copy()
-        if ano_selecionado_just != "Todos os anos":
-            df_proc_filtered_year = df_proc_filtered_year[df_proc_filtered_year['ano'] == ano_selecionado_just]
-        
-        df_filtrado = df_proc_filtered_year.copy()
-
-        def limpar_texto(texto):
-            if pd.isna(texto):
-                return ""
-            return str(texto).strip().title()
-
-        if tipo_analise == "Municípios com mais processos":
-            if 'municipio' in df_filtrado.columns and len(df_filtrado) > 0:
-                df_filtrado['municipio'] = df_filtrado['municipio'].apply(limpar_texto)
-                
-                municipio_counts = df_filtrado['municipio'].value_counts().reset_index()
-                municipio_counts.columns = ['Município', 'Total de Processos']
-                
-                if 'data_ajuizamento' in df_filtrado.columns:
-                    df_filtrado['data_ajuizamento'] = pd.to_datetime(df_filtrado['data_ajuizamento'], errors='coerce')
-                    datas_municipio = df_filtrado.groupby('municipio', observed=False)['data_ajuizamento'].agg(['min', 'max']).reset_index()
-                    datas_municipio.columns = ['Município', 'Primeiro Processo', 'Último Processo']
-                    municipio_counts = municipio_counts.merge(datas_municipio, on='Município', how='left')
-                
-                municipio_counts = municipio_counts.head(20)
-                st.dataframe(municipio_counts, use_container_width=True)
-                st.caption("Tabela 4.1: Top 20 municípios com mais processos judiciais.")
-            else:
-                 st.info("Dados insuficientes para gerar esta tabela.")
-            
-        elif tipo_analise == "Órgãos mais atuantes":
-            if 'orgao_julgador' in df_filtrado.columns and len(df_filtrado) > 0:
-                df_filtrado['orgao_julgador'] = df_filtrado['orgao_julgador'].apply(limpar_texto)
-                
-                orgao_counts = df_filtrado['orgao_julgador'].value_counts().reset_index()
-                orgao_counts.columns = ['Órgão Julgador', 'Total de Processos']
-                
-                if 'data_ajuizamento' in df_filtrado.columns:
-                    df_filtrado['data_ajuizamento'] = pd.to_datetime(df_filtrado['data_ajuizamento'], errors='coerce')
-                    datas_orgao = df_filtrado.groupby('orgao_julgador', observed=False)['data_ajuizamento'].agg(['min', 'max']).reset_index()
-                    datas_orgao.columns = ['Órgão Julgador', 'Primeiro Processo', 'Último Processo']
-                    orgao_counts = orgao_counts.merge(datas_orgao, on='Órgão Julgador', how='left')
-                
-                orgao_counts = orgao_counts.head(15)
-                st.dataframe(orgao_counts, use_container_width=True)
-                st.caption("Tabela 4.1: Top 15 órgãos julgadores mais atuantes.")
-            else:
-                 st.info("Dados insuficientes para gerar esta tabela.")
-
-        elif tipo_analise == "Classes processuais mais frequentes":
-            if 'classe' in df_filtrado.columns and len(df_filtrado) > 0:
-                df_filtrado['classe'] = df_filtrado['classe'].apply(limpar_texto)
-                
-                classe_counts = df_filtrado['classe'].value_counts().reset_index()
-                classe_counts.columns = ['Classe Processual', 'Total de Processos']
-                
-                if 'data_ajuizamento' in df_filtrado.columns:
-                    df_filtrado['data_ajuizamento'] = pd.to_datetime(df_filtrado['data_ajuizamento'], errors='coerce')
-                    datas_classe = df_filtrado.groupby('classe', observed=False)['data_ajuizamento'].agg(['min', 'max']).reset_index()
-                    datas_classe.columns = ['Classe Processual', 'Primeiro Processo', 'Último Processo']
-                    classe_counts = classe_counts.merge(datas_classe, on='Classe Processual', how='left')
-                
-                classe_counts = classe_counts.head(15)
-                st.dataframe(classe_counts, use_container_width=True)
-                st.caption("Tabela 4.1: Top 15 classes processuais mais frequentes.")
-            else:
-                 st.info("Dados insuficientes para gerar esta tabela.")
-
-        elif tipo_analise == "Assuntos mais recorrentes":
-            if 'assuntos' in df_filtrado.columns and len(df_filtrado) > 0:
-                df_filtrado['assuntos'] = df_filtrado['assuntos'].apply(limpar_texto)
-                
-                assunto_counts = df_filtrado['assuntos'].value_counts().reset_index()
-                assunto_counts.columns = ['Assunto', 'Total de Processos']
-                
-                if 'data_ajuizamento' in df_filtrado.columns:
-                    df_filtrado['data_ajuizamento'] = pd.to_datetime(df_filtrado['data_ajuizamento'], errors='coerce')
-                    datas_assunto = df_filtrado.groupby('assuntos', observed=False)['data_ajuizamento'].agg(['min', 'max']).reset_index()
-                    datas_assunto.columns = ['Assunto', 'Primeiro Processo', 'Último Processo']
-                    assunto_counts = assunto_counts.merge(datas_assunto, on='Assunto', how='left')
-                
-                assunto_counts = assunto_counts.head(15)
-                st.dataframe(assunto_counts, use_container_width=True)
-                st.caption("Tabela 4.1: Top 15 assuntos mais recorrentes.")
-            else:
-                 st.info("Dados insuficientes para gerar esta tabela.")
-
-        else: 
-            if len(df_filtrado) > 0:
-                colunas_preferenciais = ['municipio', 'data_ajuizamento', 'classe', 'assuntos', 'orgao_julgador']
-                colunas_existentes = [col for col in colunas_preferenciais if col in df_filtrado.columns]
-                
-                if colunas_existentes:
-                    df_relevante = df_filtrado[colunas_existentes].copy()
-                    
-                    for col in ['municipio', 'classe', 'assuntos', 'orgao_julgador']:
-                        if col in df_relevante.columns:
-                            df_relevante[col] = df_relevante[col].apply(limpar_texto)
-                    
-                    if 'data_ajuizamento' in df_relevante.columns:
-                        df_relevante['data_ajuizamento'] = pd.to_datetime(df_relevante['data_ajuizamento'], errors='coerce')
-                        df_relevante = df_relevante.sort_values('data_ajuizamento', ascending=False)
-                    
-                    df_amostra = df_relevante.head(500)
-                    st.dataframe(df_amostra, use_container_width=True)
-                    st.caption("Tabela 4.1: Dados gerais relevantes dos processos judiciais (limitado a 500 registros).")
-                    
-                    st.info(f"Mostrando {len(df_amostra)} de {len(df_filtrado)} processos totais.")
-                else:
-                    st.warning("Nenhuma coluna relevante encontrada nos dados.")
-            else:
-                st.info("Nenhum processo encontrado com os filtros selecionados.")
-        
-        with st.expander("ℹ️ Sobre esta tabela", expanded=False):
-            if tipo_analise == "Municípios com mais processos":
-                st.write("""
-                Esta tabela mostra os municípios com maior número de processos judiciais,
-                incluindo o total de processos e o período de atuação (primeiro e último processo).
-                """)
-            elif tipo_analise == "Órgãos mais atuantes":
-                st.write("""
-                Esta tabela apresenta os órgãos julgadores com maior volume de processos,
-                mostrando sua atividade ao longo do tempo.
-                """)
-            elif tipo_analise == "Classes processuais mais frequentes":
-                st.write("""
-                Esta tabela mostra as classes processuais mais utilizadas nos processos judiciais,
-                indicando os tipos de ações mais comuns no sistema judiciário.
-                """)
-            elif tipo_analise == "Assuntos mais recorrentes":
-                st.write("""
-                Esta tabela apresenta os assuntos mais frequentes nos processos judiciais,
-                revelando as principais questões levadas ao judiciário.
-                """)
-            else:
-                st.write("""
-                Esta tabela apresenta os dados gerais mais relevantes dos processos judiciais,
-                ordenados por data de ajuizamento (mais recentes primeiro).
-                Limitada a 500 registros para melhor performance.
-                """)
+        bloco_tabela_processos(df_proc_raw)
         
         st.markdown(
             "**Fonte:** CNJ - Conselho Nacional de Justiça.",
@@ -1570,7 +1303,93 @@ with tabs[2]:
     else:
         st.warning("Nenhum dado de processos disponível")
 
-with tabs[3]:
+@st.fragment
+def bloco_graficos_queimadas(df_base_filtrado, anos_disponiveis, gdf_cnuc_raw, atribuicao_focos=None, piramide_cnuc=None):
+    ano_sel_graf = st.selectbox(
+        'Período para gráficos:',
+        anos_disponiveis,
+        index=0, 
+        key="ano_focos_calor_global_tab3"
+    )
+    
+    df_graf = obter_dados_ano(ano_sel_graf, df_base_filtrado)
+    
+    ano_param = None if ano_sel_graf == "Todos os Anos" else int(ano_sel_graf)
+    display_graf = ("todo o período histórico" if ano_param is None else f"o ano de {ano_param}")
+
+    if not df_graf.empty:
+        figs = graficos_inpe(df_graf, ano_sel_graf, gdf_cnuc_raw, piramide_cnuc)
+        
+        st.subheader("Evolução Temporal do Risco de Fogo")
+        st.plotly_chart(figs['temporal'], use_container_width=True)
+        st.caption(f"Figura: Evolução mensal do risco médio de fogo para {display_graf}.")
+
+        col1, col2 = st.columns(2, gap="large")
+        with col1:
+            st.subheader("Top Municípios por Risco Médio de Fogo")
+            st.plotly_chart(figs['top_risco'], use_container_width=True)
+        with col2:
+            st.subheader("Mapa de Distribuição dos Focos de Calor")
+            st.plotly_chart(figs['mapa'], use_container_width=True, config={'scrollZoom': True, 'displayModeBar': True})
+        
+        st.divider()
+        col3, col4 = st.columns(2, gap="large")
+        with col3:
+            st.subheader("Top Municípios por Precipitação Acumulada")
+            st.plotly_chart(figs['top_precip'], use_container_width=True)
+        with col4:
+            st.subheader("Focos de Calor por Unidade de Conservação")
+            fig_focos_uc = fig_focos_calor_por_uc(df_graf, gdf_cnuc_raw, atribuicao_focos)
+            if fig_focos_uc and fig_focos_uc.data:
+                st.plotly_chart(fig_focos_uc, use_container_width=True, config={'displayModeBar': True})
+                st.caption("Figura: Top 10 Unidades de Conservação com maior quantidade de focos de calor.")
+            else:
+                st.info("Não foram encontrados focos de calor dentro das Unidades de Conservação para o período selecionado.")
+    else:
+        st.warning(f"Nenhum dado para {ano_sel_graf}.")
+
+@st.fragment
+def bloco_ranking_queimadas(df_base_filtrado, anos_disponiveis):
+    st.header("Ranking de Municípios por Indicadores de Queimadas")
+    st.caption("Classifica municípios pelo maior registro de cada indicador.")
+    colA, colB = st.columns(2)
+    with colA:
+        ano_sel_rank = st.selectbox(
+            'Período para ranking:', anos_disponiveis,
+            index=0, key="ano_ranking_tab3"
+        )
+    with colB:
+        tema_rank = st.selectbox(
+            'Indicador para ranking:',
+            ["Maior Risco de Fogo", "Maior Precipitação (evento)", "Máx. Dias Sem Chuva"],
+            key="tema_ranking"
+        )
+    
+    ano_rank_param = None if ano_sel_rank == "Todos os Anos" else int(ano_sel_rank)
+    periodo_rank = ("Todo o Período Histórico" if ano_rank_param is None else f"Ano de {ano_rank_param}")
+
+    st.subheader(f"Ranking por {tema_rank} ({periodo_rank})")
+    
+    df_rank_data = obter_dados_ano(ano_sel_rank, df_base_filtrado)
+    
+    if df_rank_data is not None and not df_rank_data.empty:
+        df_rank, col_ord = pd.DataFrame(), ''
+        if 'Estado' not in df_rank_data.columns:
+            df_rank, col_ord = obter_ranking_municipios(tema_rank, periodo_rank, ano_rank_param)
+        
+        if df_rank is None or df_rank.empty:
+            processador = ProcessadorRanking()
+            df_rank, col_ord = processador.processar_ranking(df_rank_data, tema_rank, periodo_rank)
+        
+        if df_rank is not None and not df_rank.empty:
+            st.dataframe(df_rank, use_container_width=True)
+        else:
+            st.info("Sem dados válidos para este ranking.")
+    else:
+        st.info("Sem dados válidos para este ranking.")
+
+@st.fragment
+def aba_queimadas(gdf_cnuc_raw, piramide_cnuc=None):
     st.header("Focos de Calor")
 
     with st.expander("ℹ️ Sobre esta seção", expanded=True):
@@ -1599,34 +1418,37 @@ with tabs[3]:
     
     anos_disponiveis, df_base = inicializar_dados()
     
-    df_base_filtrado = df_base.copy() if df_base is not None else None
+    df_base_filtrado = df_base
     
     if df_base is not None and not df_base.empty:
         if 'Estado' in df_base.columns:
-            estados_queimadas = df_base['Estado'].apply(normalizar_estado).dropna().unique()
+            estados_base = normalizar_serie_estados(df_base['Estado'])
+            estados_queimadas = estados_base.dropna().unique()
             if len(estados_queimadas) > 0:
                 estados_queimadas_lista = sorted(estados_queimadas.tolist())
                 
                 st.markdown("### Filtros")
                 estado_queimadas = st.selectbox('Filtrar por Estado:', estados_queimadas_lista, index=0, key="filtro_estado_queimadas")
                 
-                df_base_filtrado = df_base[df_base['Estado'].apply(normalizar_estado) == estado_queimadas].copy()
+                df_base_filtrado = df_base[estados_base == estado_queimadas]
                 anos_disponiveis, _ = inicializar_dados()
     
+    # Focos da base inteira atribuídos às UCs uma vez por versão dos dados; os cards e o
+    # gráfico por UC leem recortes dessa atribuição em vez de refazer o join espacial
+    atribuicao_focos = None
+    if df_base is not None and not df_base.empty and not gdf_cnuc_raw.empty:
+        try:
+            atribuicao_focos = obter_atribuicao_focos(df_base, gdf_cnuc_raw)
+        except Exception:
+            atribuicao_focos = None
+    
     if df_base_filtrado is not None and not df_base_filtrado.empty and not gdf_cnuc_raw.empty:
         try:
-            from shapely.geometry import Point
-            df_valid = df_base_filtrado.dropna(subset=['Latitude', 'Longitude']).copy()
+            df_valid = df_base_filtrado.dropna(subset=['Latitude', 'Longitude'])
             if not df_valid.empty:
-                geometry = [Point(lon, lat) for lon, lat in zip(df_valid['Longitude'], df_valid['Latitude'])]
-                gdf_focos = gpd.GeoDataFrame(df_valid, geometry=geometry, crs="EPSG:4326")
-                crs_proj = "EPSG:31983"
-                gdf_focos_proj = gdf_focos.to_crs(crs_proj)
-                gdf_cnuc_proj = gdf_cnuc_raw.to_crs(crs_proj)
-                focos_in_ucs = gpd.sjoin(gdf_focos_proj, gdf_cnuc_proj, how="inner", predicate="intersects")
+                focos_em_ucs, focos_por_uc = obter_focos_por_uc(df_valid, gdf_cnuc_raw, atribuicao_focos)
                 
                 total_focos_geral = len(df_base_filtrado)
-                focos_em_ucs = len(focos_in_ucs) if not focos_in_ucs.empty else 0
                 percentual_ucs = (focos_em_ucs / total_focos_geral * 100) if total_focos_geral > 0 else 0
                 
                 col1, col2, col3 = st.columns(3, gap="medium")
@@ -1679,9 +1501,8 @@ with tabs[3]:
                         unsafe_allow_html=True
                     )
                 
-                if not focos_in_ucs.empty:
+                if focos_em_ucs > 0:
                     st.markdown("**Ranking de UCs com mais focos de calor:**")
-                    focos_por_uc = focos_in_ucs.groupby('nome_uc', observed=False).size().reset_index(name='quantidade_focos')
                     focos_por_uc = focos_por_uc.sort_values('quantidade_focos', ascending=False).head(10)
                     ranking_display = focos_por_uc.copy()
                     ranking_display.index = range(1, len(ranking_display) + 1)
@@ -1699,83 +1520,10 @@ with tabs[3]:
     st.divider()
 
     if df_base_filtrado is not None and not df_base_filtrado.empty:
-        ano_sel_graf = st.selectbox(
-            'Período para gráficos:',
-            anos_disponiveis,
-            index=0, 
-            key="ano_focos_calor_global_tab3"
-        )
-        
-        df_graf = obter_dados_ano(ano_sel_graf, df_base_filtrado)
-        
-        ano_param = None if ano_sel_graf == "Todos os Anos" else int(ano_sel_graf)
-        display_graf = ("todo o período histórico" if ano_param is None else f"o ano de {ano_param}")
-
-        if not df_graf.empty:
-            figs = graficos_inpe(df_graf, ano_sel_graf, gdf_cnuc_raw)
-            
-            st.subheader("Evolução Temporal do Risco de Fogo")
-            st.plotly_chart(figs['temporal'], use_container_width=True)
-            st.caption(f"Figura: Evolução mensal do risco médio de fogo para {display_graf}.")
-
-            col1, col2 = st.columns(2, gap="large")
-            with col1:
-                st.subheader("Top Municípios por Risco Médio de Fogo")
-                st.plotly_chart(figs['top_risco'], use_container_width=True)
-            with col2:
-                st.subheader("Mapa de Distribuição dos Focos de Calor")
-                st.plotly_chart(figs['mapa'], use_container_width=True, config={'scrollZoom': True, 'displayModeBar': True})
-            
-            st.divider()
-            col3, col4 = st.columns(2, gap="large")
-            with col3:
-                st.subheader("Top Municípios por Precipitação Acumulada")
-                st.plotly_chart(figs['top_precip'], use_container_width=True)
-            with col4:
-                st.subheader("Focos de Calor por Unidade de Conservação")
-                fig_focos_uc = fig_focos_calor_por_uc(df_graf, gdf_cnuc_raw)
-                if fig_focos_uc and fig_focos_uc.data:
-                    st.plotly_chart(fig_focos_uc, use_container_width=True, config={'displayModeBar': True})
-                    st.caption("Figura: Top 10 Unidades de Conservação com maior quantidade de focos de calor.")
-                else:
-                    st.info("Não foram encontrados focos de calor dentro das Unidades de Conservação para o período selecionado.")
-        else:
-            st.warning(f"Nenhum dado para {ano_sel_graf}.")
+        bloco_graficos_queimadas(df_base_filtrado, anos_disponiveis, gdf_cnuc_raw, atribuicao_focos, piramide_cnuc)
             
         st.divider()
-        st.header("Ranking de Municípios por Indicadores de Queimadas")
-        st.caption("Classifica municípios pelo maior registro de cada indicador.")
-        colA, colB = st.columns(2)
-        with colA:
-            ano_sel_rank = st.selectbox(
-                'Período para ranking:', anos_disponiveis,
-                index=0, key="ano_ranking_tab3"
-            )
-        with colB:
-            tema_rank = st.selectbox(
-                'Indicador para ranking:',
-                ["Maior Risco de Fogo", "Maior Precipitação (evento)", "Máx. Dias Sem Chuva"],
-                key="tema_ranking"
-            )
-        
-        ano_rank_param = None if ano_sel_rank == "Todos os Anos" else int(ano_sel_rank)
-        periodo_rank = ("Todo o Período Histórico" if ano_rank_param is None else f"Ano de {ano_rank_param}")
-
-        st.subheader(f"Ranking por {tema_rank} ({periodo_rank})")
-        
-        df_rank_data = obter_dados_ano(ano_sel_rank, df_base_filtrado)
-        
-        if df_rank_data is not None and not df_rank_data.empty:
-            from processadores.processador_ranking import ProcessadorRanking
-            processador = ProcessadorRanking()
-            df_rank, col_ord = processador.processar_ranking(df_rank_data, tema_rank, periodo_rank)
-            
-            if df_rank is not None and not df_rank.empty:
-                st.dataframe(df_rank, use_container_width=True)
-            else:
-                st.info("Sem dados válidos para este ranking.")
-        else:
-            st.info("Sem dados válidos para este ranking.")
+        bloco_ranking_queimadas(df_base_filtrado, anos_disponiveis)
             
         st.divider()
         st.markdown("### 📊 Dados Completos")
@@ -1788,7 +1536,9 @@ with tabs[3]:
     else:
         st.error("Não foi possível carregar os dados de queimadas. Verifique a conexão com o banco de dados.")
 
-with tabs[4]:
+@st.fragment
+def aba_desmatamento(alertas, gdf_cnuc_combinado, indice_incidencia):
+    gdf_alertas_raw = alertas.gdf
     st.header("Desmatamento")
 
     with st.expander("ℹ️ Sobre esta seção", expanded=True):
@@ -1811,9 +1561,8 @@ with tabs[4]:
     
     with col_f1:
         if 'ESTADO' in gdf_alertas_raw.columns:
-            # A coluna ESTADO já foi normalizada durante o carregamento, não precisa normalizar novamente
-            estados_desmat = gdf_alertas_raw['ESTADO'].dropna().unique()
-            estados_desmat_lista = sorted(estados_desmat.tolist())
+            # A coluna ESTADO já foi normalizada durante o carregamento; os estados vêm da tabela de partições
+            estados_desmat_lista = sorted(alertas.estados())
             if not estados_desmat_lista:
                 estados_desmat_lista = ['Pará']
             estado_desmat = st.selectbox('Filtrar por Estado:', estados_desmat_lista, index=0, key="filtro_estado_desmat")
@@ -1824,13 +1573,9 @@ with tabs[4]:
         anos_disponiveis = obter_anos_disponiveis_desmatamento(gdf_alertas_raw)
         ano_global_selecionado = st.selectbox('Ano de Detecção:', anos_disponiveis, key="filtro_ano_global")
     
-    # Filtrar alertas por estado selecionado
-    gdf_alertas_temp = gdf_alertas_raw.copy()
-    if 'ESTADO' in gdf_alertas_temp.columns:
-        gdf_alertas_temp = gdf_alertas_temp[gdf_alertas_temp['ESTADO'] == estado_desmat].copy()
-    
-    # Processar dados de desmatamento (filtrar por ano)
-    gdf_alertas_filtrado = processar_dados_desmatamento(gdf_alertas_temp, ano_global_selecionado)
+    # Recortes de estado e de estado/ano saem das partições da camada, sem máscara nem cópia
+    gdf_alertas_temp = alertas.fatia(estado_desmat) if 'ESTADO' in gdf_alertas_raw.columns else gdf_alertas_raw
+    gdf_alertas_filtrado = alertas.fatia(estado_desmat, ano_global_selecionado) if 'ESTADO' in gdf_alertas_raw.columns else alertas.fatia(None, ano_global_selecionado)
 
     st.divider()
 
@@ -1839,7 +1584,7 @@ with tabs[4]:
     with col_charts:
         if not gdf_cnuc_combinado.empty and not gdf_alertas_filtrado.empty:
             # Filtrar UCs/T.I.s do estado selecionado
-            gdf_cnuc_estado = gdf_cnuc_combinado.copy()
+            gdf_cnuc_estado = gdf_cnuc_combinado
             if 'ESTADO' in gdf_cnuc_estado.columns:
                 gdf_cnuc_estado = gdf_cnuc_estado[gdf_cnuc_estado['ESTADO'] == estado_desmat]
             
@@ -1847,7 +1592,7 @@ with tabs[4]:
             if gdf_cnuc_estado.empty:
                 st.info(f"Nenhuma UC ou T.I. encontrada para o estado {estado_desmat}.")
             else:
-                dados_uc_desmatamento = processar_intersecao_uc_desmatamento(gdf_cnuc_estado, gdf_alertas_filtrado)
+                dados_uc_desmatamento = processar_intersecao_uc_desmatamento(gdf_cnuc_estado, gdf_alertas_filtrado, indice_incidencia)
             
                 if not dados_uc_desmatamento.empty:
                     # Ordenar por área de alertas decrescente
@@ -1978,28 +1723,25 @@ with tabs[4]:
     st.divider()
 
     if not gdf_alertas_temp.empty:
-        dados_temporais = preprocessar_dados_desmatamento_temporal(gdf_alertas_temp)
-        if not dados_temporais.empty:
-            fig_desmat_temp = fig_desmatamento_temporal(dados_temporais)
-            if fig_desmat_temp and fig_desmat_temp.data:
-                st.subheader("Evolução Temporal de Alertas")
-                fig_desmat_temp.update_layout(height=400)
-                st.plotly_chart(fig_desmat_temp, use_container_width=True, config={'displayModeBar': True}, key="desmat_temporal_chart")
-                st.caption("Figura 6.4: Evolução mensal da área total de alertas de desmatamento.")
-                with st.expander("Detalhes e Fonte da Figura 6.4"):
-                    st.write("""
-                    **Interpretação:**
-                    O gráfico de linha mostra a variação mensal da área total (em hectares) de alertas de desmatamento ao longo do tempo.
-
-                    **Observações:**
-                    - Cada ponto representa a soma da área de alertas para um determinado mês.
-                    - A linha conecta os pontos para mostrar a tendência temporal.
-                    - Valores são exibidos acima de cada ponto para facilitar a leitura.
-
-                    **Fonte:** MapBiomas Alerta. *Plataforma de Dados de Alertas de Desmatamento*. Disponível em: https://alerta.mapbiomas.org/. Acesso em: maio de 2025.
-                    """)
-            else:
-                st.info("Dados de alertas de desmatamento não contêm informações temporais válidas.")
+        # A fatia do registro vai direto ao gráfico: AREAHA já chega numérico da carga da camada
+        fig_desmat_temp = fig_desmatamento_temporal(gdf_alertas_temp)
+        if fig_desmat_temp and fig_desmat_temp.data:
+            st.subheader("Evolução Temporal de Alertas")
+            fig_desmat_temp.update_layout(height=400)
+            st.plotly_chart(fig_desmat_temp, use_container_width=True, config={'displayModeBar': True}, key="desmat_temporal_chart")
+            st.caption("Figura 6.4: Evolução mensal da área total de alertas de desmatamento.")
+            with st.expander("Detalhes e Fonte da Figura 6.4"):
+                st.write("""
+                **Interpretação:**
+                O gráfico de linha mostra a variação mensal da área total (em hectares) de alertas de desmatamento ao longo do tempo.
+
+                **Observações:**
+                - Cada ponto representa a soma da área de alertas para um determinado mês.
+                - A linha conecta os pontos para mostrar a tendência temporal.
+                - Valores são exibidos acima de cada ponto para facilitar a leitura.
+
+                **Fonte:** MapBiomas Alerta. *Plataforma de Dados de Alertas de Desmatamento*. Disponível em: https://alerta.mapbiomas.org/. Acesso em: maio de 2025.
+                """)
         else:
             st.info("Dados de alertas de desmatamento não contêm informações temporais válidas.")
     
@@ -2007,8 +1749,46 @@ with tabs[4]:
     st.markdown("### 📊 Dados Completos")
     st.markdown("**Dados brutos de alertas de desmatamento:**")
     if not gdf_alertas_filtrado.empty:
-        df_alertas_display = gdf_alertas_filtrado.drop(columns=['geometry']) if 'geometry' in gdf_alertas_filtrado.columns else gdf_alertas_filtrado
+        df_alertas_display = sem_geometria(gdf_alertas_filtrado)
         st.dataframe(df_alertas_display, use_container_width=True, hide_index=True)
     else:
         st.info("Nenhum dado de alertas de desmatamento disponível para o estado e ano selecionados.")
 
+def aba_aberta(aba) -> bool:
+    # Sem abas preguiçosas (Streamlit < 1.50) .open não existe e todas as abas são executadas
+    return getattr(aba, 'open', None) is not False
+
+NOMES_ABAS = ["Sobreposições", "CPT", "Justiça", "Queimadas", "Desmatamento"]
+
+# Cada aba é um fragmento: um widget só reexecuta a própria aba (ou o próprio bloco).
+# Com abas preguiçosas, só a aba visível pede suas camadas ao registro, então o
+# tempo até a primeira pintura depende apenas dos dados daquela aba
+try:
+    tabs = st.tabs(NOMES_ABAS, key="aba_ativa", on_change="rerun")
+except TypeError:
+    tabs = st.tabs(NOMES_ABAS)
+
+with tabs[0]:
+    if aba_aberta(tabs[0]):
+        aba_sobreposicoes(*obter_camadas('cnuc_combinado', 'sigef_combinado', 'alertas_particionados', 'cnuc',
+                                         'ucs_filtradas_car', 'terras_indigenas', 'centro', 'indice_incidencia',
+                                         'piramide_ucs', 'piramide_sigef'))
+
+with tabs[1]:
+    if aba_aberta(tabs[1]):
+        aba_cpt()
+
+with tabs[2]:
+    if aba_aberta(tabs[2]):
+        aba_justica(*obter_camadas('processos'))
+
+with tabs[3]:
+    if aba_aberta(tabs[3]):
+        aba_queimadas(*obter_camadas('cnuc', 'piramide_cnuc'))
+
+with tabs[4]:
+    if aba_aberta(tabs[4]):
+        aba_desmatamento(*obter_camadas('alertas_particionados', 'cnuc_combinado', 'indice_incidencia'))
+
+with st.sidebar:
+    painel_conexoes()
@@ -7,25 +7,34 @@ import numpy as np
 from utilitarios.formatacao import formatar_numero_com_pontos
 from utilitarios.estilos import aplicar_layout as _apply_layout
 from graficos.graficos_sobreposicoes import wrap_label
+from configuracoes.config import CRS_GEOGRAFICO
+from utilitarios.geometria_dupla import geometria_projetada, projetar
+from utilitarios.camadas_mapa import quantizar_coordenadas
 
 
-def fig_desmatamento_uc(gdf_cnuc_filtered: gpd.GeoDataFrame, gdf_alertas_filtered: gpd.GeoDataFrame) -> go.Figure:
+def fig_desmatamento_uc(gdf_cnuc_filtered: gpd.GeoDataFrame, gdf_alertas_filtered: gpd.GeoDataFrame,
+                        indice=None) -> go.Figure:
     if gdf_cnuc_filtered.empty or gdf_alertas_filtered.empty:
         return go.Figure() 
 
-    crs_proj = "EPSG:31983" 
-    gdf_cnuc_proj = gdf_cnuc_filtered.to_crs(crs_proj)
-    gdf_alertas_proj = gdf_alertas_filtered.to_crs(crs_proj)
-
-    if not gdf_alertas_proj.empty and not gdf_cnuc_proj.empty:
-        alerts_in_ucs = gpd.sjoin(gdf_alertas_proj, gdf_cnuc_proj, how="inner", predicate="intersects")
+    if indice is not None and indice.cobre(gdf_alertas_filtered, gdf_cnuc_filtered):
+        alert_area_per_uc = indice.agregar_por_uc(gdf_alertas_filtered, gdf_cnuc_filtered)[['nome_uc', 'AREAHA']]
+        if alert_area_per_uc.empty:
+            return go.Figure()
     else:
-        alerts_in_ucs = gpd.GeoDataFrame()
+        gdf_cnuc_proj = projetar(gdf_cnuc_filtered)
+        gdf_alertas_proj = projetar(gdf_alertas_filtered)
+
+        if not gdf_alertas_proj.empty and not gdf_cnuc_proj.empty:
+            alerts_in_ucs = gpd.sjoin(gdf_alertas_proj, gdf_cnuc_proj, how="inner", predicate="intersects")
+        else:
+            alerts_in_ucs = gpd.GeoDataFrame()
 
-    if alerts_in_ucs.empty:
-         return go.Figure() 
+        if alerts_in_ucs.empty:
+             return go.Figure() 
+
+        alert_area_per_uc = alerts_in_ucs.groupby('nome_uc', observed=False)['AREAHA'].sum().reset_index()
 
-    alert_area_per_uc = alerts_in_ucs.groupby('nome_uc', observed=False)['AREAHA'].sum().reset_index()
     alert_area_per_uc.columns = ['nome_uc', 'alerta_ha_total'] 
     alert_area_per_uc = alert_area_per_uc.sort_values('alerta_ha_total', ascending=False)
     alert_area_per_uc['uc_wrap'] = alert_area_per_uc['nome_uc'].apply(lambda x: wrap_label(x, 15)) 
@@ -63,9 +72,10 @@ def fig_desmatamento_temporal(gdf_alertas_filtered: gpd.GeoDataFrame) -> go.Figu
         fig.update_layout(title="Evolução Temporal de Alertas (Desmatamento)", xaxis_title="Data", yaxis_title="Área (ha)")
         return _apply_layout(fig, titulo="Evolução Temporal de Alertas (Desmatamento)", tamanho_titulo=16)
 
-    gdf_alertas_filtered['DATADETEC'] = pd.to_datetime(gdf_alertas_filtered['DATADETEC'], errors='coerce')
-    gdf_alertas_filtered['AREAHA'] = pd.to_numeric(gdf_alertas_filtered['AREAHA'], errors='coerce')
-    df_valid_dates = gdf_alertas_filtered.dropna(subset=['DATADETEC', 'AREAHA'])
+    df_valid_dates = pd.DataFrame({
+        'DATADETEC': pd.to_datetime(gdf_alertas_filtered['DATADETEC'], errors='coerce'),
+        'AREAHA': pd.to_numeric(gdf_alertas_filtered['AREAHA'], errors='coerce')
+    }).dropna(subset=['DATADETEC', 'AREAHA'])
 
     if df_valid_dates.empty:
          fig = go.Figure()
@@ -119,15 +129,14 @@ def fig_desmatamento_mapa_pontos(gdf_alertas_filtered: gpd.GeoDataFrame) -> go.F
         fig.update_layout(title="Mapa de Alertas (Desmatamento)")
         return _apply_layout(fig, titulo="Mapa de Alertas (Desmatamento)", tamanho_titulo=16)
 
-    gdf_alertas_filtered['AREAHA'] = pd.to_numeric(gdf_alertas_filtered['AREAHA'], errors='coerce')
-
     try:
-        gdf_proj = gdf_alertas_filtered.to_crs("EPSG:31983").copy()
-        centroids_proj = gdf_proj.geometry.centroid
-        centroids_geo = centroids_proj.to_crs("EPSG:4326")
-        gdf_map = gdf_alertas_filtered.to_crs("EPSG:4326").copy()
-        gdf_map['Latitude'] = centroids_geo.y
-        gdf_map['Longitude'] = centroids_geo.x
+        # Centroides sobre a geometria projetada da camada; só os pontos voltam para lat/lon
+        centroids_geo = geometria_projetada(gdf_alertas_filtered).centroid.to_crs(CRS_GEOGRAFICO)
+        gdf_map = gdf_alertas_filtered.to_crs(CRS_GEOGRAFICO)
+        gdf_map['AREAHA'] = pd.to_numeric(gdf_map['AREAHA'], errors='coerce')
+        # Coordenadas arredondadas como nos demais mapas: o payload encolhe sem deslocar os pontos na tela
+        gdf_map['Latitude'] = quantizar_coordenadas(centroids_geo.y)
+        gdf_map['Longitude'] = quantizar_coordenadas(centroids_geo.x)
     except Exception as e:
         st.warning(f"Erro ao calcular centroides: {e}")
         fig = go.Figure()
@@ -2,13 +2,15 @@ import pandas as pd
 import geopandas as gpd
 import plotly.graph_objects as go
 from utilitarios.formatacao import formatar_numero_com_pontos
+from utilitarios.camadas_mapa import tracos_contornos, geometrias_para_zoom, quantizar_coordenadas
 
 
-def graficos_inpe(data_frame_entrada: pd.DataFrame, ano_selecionado_str: str, gdf_cnuc_raw: gpd.GeoDataFrame = None) -> dict[str, go.Figure]:
-    df = data_frame_entrada.copy()
+def graficos_inpe(data_frame_entrada: pd.DataFrame, ano_selecionado_str: str, gdf_cnuc_raw: gpd.GeoDataFrame = None,
+                  piramide_ucs=None) -> dict[str, go.Figure]:
+    df = data_frame_entrada
     
     if 'municipio' in df.columns and 'mun_corrigido' not in df.columns:
-        df['mun_corrigido'] = df['municipio']
+        df = df.assign(mun_corrigido=df['municipio'])
     
     def create_placeholder_fig(title_message: str) -> go.Figure:
         fig = go.Figure()
@@ -142,48 +144,16 @@ def graficos_inpe(data_frame_entrada: pd.DataFrame, ano_selecionado_str: str, gd
                 elif max_range < 5: zoom_level = 5
                 elif max_range < 10: zoom_level = 4
                 fig_map = go.Figure()
+                # Todas as UCs em um traço de contornos e um de hover, no nível da pirâmide do zoom inicial
+                gdf_ucs_mapa = gdf_cnuc_raw
                 if gdf_cnuc_raw is not None and not gdf_cnuc_raw.empty:
-                    gdf_cnuc_geo = gdf_cnuc_raw.to_crs("EPSG:4326")
-                    
-                    for idx, row in gdf_cnuc_geo.iterrows():
-                        if row.geometry and hasattr(row.geometry, 'exterior'):
-                            if row.geometry.geom_type == 'Polygon':
-                                coords = list(row.geometry.exterior.coords)
-                                lons, lats = zip(*coords)
-                                
-                                fig_map.add_trace(go.Scattermapbox(
-                                    lon=lons,
-                                    lat=lats,
-                                    mode='lines',
-                                    fill='toself',
-                                    fillcolor='rgba(34,139,34,0.2)',
-                                    line=dict(color='rgba(34,139,34,0.8)', width=1),
-                                    name='Unidades de Conservação',
-                                    showlegend=False,  
-                                    hovertemplate=f"<b>{row.get('nome_uc', 'UC')}</b><extra></extra>",
-                                    text=row.get('nome_uc', 'UC')
-                                ))
-                        elif row.geometry and row.geometry.geom_type == 'MultiPolygon':
-                            for poly in row.geometry.geoms:
-                                coords = list(poly.exterior.coords)
-                                lons, lats = zip(*coords)
-                                
-                                fig_map.add_trace(go.Scattermapbox(
-                                    lon=lons,
-                                    lat=lats,
-                                    mode='lines',
-                                    fill='toself',
-                                    fillcolor='rgba(34,139,34,0.2)',
-                                    line=dict(color='rgba(34,139,34,0.8)', width=1),
-                                    name='Unidades de Conservação',
-                                    showlegend=False,
-                                    hovertemplate=f"<b>{row.get('nome_uc', 'UC')}</b><extra></extra>",
-                                    text=row.get('nome_uc', 'UC')
-                                ))
+                    gdf_ucs_mapa = geometrias_para_zoom(gdf_cnuc_raw, zoom_level, piramide_ucs)
+                for traco in tracos_contornos(gdf_ucs_mapa):
+                    fig_map.add_trace(traco)
 
                 fig_map.add_trace(go.Scattermapbox(
-                    lat=df_map_plot_sampled['Latitude'],
-                    lon=df_map_plot_sampled['Longitude'],
+                    lat=quantizar_coordenadas(df_map_plot_sampled['Latitude']),
+                    lon=quantizar_coordenadas(df_map_plot_sampled['Longitude']),
                     mode='markers',
                     marker=dict(
                         size=df_map_plot_sampled['Precipitacao'] / 10 + 3,  
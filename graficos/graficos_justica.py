@@ -3,9 +3,9 @@ import geopandas as gpd
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
-from shapely.geometry import Point
 from utilitarios.formatacao import formatar_numero_com_pontos
 from utilitarios.estilos import aplicar_layout as _apply_layout
+from processadores.processador_espacial import obter_focos_por_uc
 
 
 def fig_justica(df_proc: pd.DataFrame) -> dict:
@@ -108,8 +108,7 @@ def fig_justica(df_proc: pd.DataFrame) -> dict:
                 figs['org'] = _apply_layout(fig_org, "Top 10 Órgãos")
         
         if 'data_ajuizamento' in df_proc.columns:
-            df_proc['data_ajuizamento'] = pd.to_datetime(df_proc['data_ajuizamento'], errors='coerce')
-            df_validas = df_proc.dropna(subset=['data_ajuizamento'])
+            df_validas = df_proc.assign(data_ajuizamento=pd.to_datetime(df_proc['data_ajuizamento'], errors='coerce')).dropna(subset=['data_ajuizamento'])
             if not df_validas.empty:
                 df_temporal = df_validas.set_index('data_ajuizamento').resample('M').size().reset_index()
                 df_temporal.columns = ['data', 'quantidade']
@@ -134,28 +133,21 @@ def fig_justica(df_proc: pd.DataFrame) -> dict:
     return figs
 
 
-def fig_focos_calor_por_uc(df_focos: pd.DataFrame, gdf_cnuc: gpd.GeoDataFrame) -> go.Figure:
+def fig_focos_calor_por_uc(df_focos: pd.DataFrame, gdf_cnuc: gpd.GeoDataFrame, atribuicao=None) -> go.Figure:
     try:
         if df_focos.empty or gdf_cnuc.empty:
             return go.Figure()
         
-        df_valid = df_focos.dropna(subset=['Latitude', 'Longitude']).copy()
+        df_valid = df_focos.dropna(subset=['Latitude', 'Longitude'])
         if df_valid.empty:
             return go.Figure()
         
-        geometry = [Point(lon, lat) for lon, lat in zip(df_valid['Longitude'], df_valid['Latitude'])]
-        gdf_focos = gpd.GeoDataFrame(df_valid, geometry=geometry, crs="EPSG:4326")
+        # Mesma atribuição foco -> UC usada pelos cards da aba Queimadas
+        focos_em_ucs, focos_por_uc = obter_focos_por_uc(df_valid, gdf_cnuc, atribuicao)
         
-        crs_proj = "EPSG:31983"
-        gdf_focos_proj = gdf_focos.to_crs(crs_proj)
-        gdf_cnuc_proj = gdf_cnuc.to_crs(crs_proj)
-        
-        focos_in_ucs = gpd.sjoin(gdf_focos_proj, gdf_cnuc_proj, how="inner", predicate="intersects")
-        
-        if focos_in_ucs.empty:
+        if focos_em_ucs == 0:
             return go.Figure()
         
-        focos_por_uc = focos_in_ucs.groupby('nome_uc', observed=False).size().reset_index(name='quantidade_focos')
         focos_por_uc = focos_por_uc.sort_values('quantidade_focos', ascending=False).head(10)
         
         if focos_por_uc.empty:
@@ -11,12 +11,11 @@ def wrap_label(name, width=30):
     return "<br>".join(textwrap.wrap(str(name), width))
 
 def fig_sobreposicoes(gdf_cnuc_ha_filtered):
-    gdf = gdf_cnuc_ha_filtered.copy()
-    if gdf.empty:
+    if gdf_cnuc_ha_filtered.empty:
         return go.Figure()
     
-    # Ordenar por area_ha decrescente
-    gdf = gdf.sort_values("area_ha", ascending=False)
+    # Ordenar por area_ha decrescente (sort_values já devolve uma cópia)
+    gdf = gdf_cnuc_ha_filtered.sort_values("area_ha", ascending=False)
     gdf["uc_short"] = gdf["nome_uc"].apply(lambda x: wrap_label(x, 15))
     
     fig = go.Figure()
@@ -68,12 +67,11 @@ def fig_sobreposicoes(gdf_cnuc_ha_filtered):
     return aplicar_layout(fig, titulo="Áreas por UC", tamanho_titulo=16)
 
 def fig_contagens_uc(gdf_cnuc_filtered: gpd.GeoDataFrame) -> go.Figure:
-    gdf = gdf_cnuc_filtered.copy()
-    if gdf.empty:
+    if gdf_cnuc_filtered.empty:
         return go.Figure()
     
     # Ordenar por total de contagens decrescente
-    gdf["total_counts"] = gdf.get("c_alertas", 0) + gdf.get("c_sigef", 0)
+    gdf = gdf_cnuc_filtered.assign(total_counts=gdf_cnuc_filtered.get("c_alertas", 0) + gdf_cnuc_filtered.get("c_sigef", 0))
     gdf = gdf.sort_values("total_counts", ascending=False)
     
     gdf["uc_wrap"] = gdf["nome_uc"].apply(lambda x: wrap_label(x, 15))
@@ -115,7 +113,7 @@ def fig_contagens_uc(gdf_cnuc_filtered: gpd.GeoDataFrame) -> go.Figure:
     return aplicar_layout(fig, titulo="Contagens por UC", tamanho_titulo=16)
 
 def fig_car_por_uc_donut(gdf_cnuc_ha_filtered: gpd.GeoDataFrame, nome_uc: str, modo_valor: str = "percent") -> go.Figure:
-    gdf_cnuc_ha = gdf_cnuc_ha_filtered.copy()
+    gdf_cnuc_ha = gdf_cnuc_ha_filtered
     if gdf_cnuc_ha.empty:
          return go.Figure()
 
@@ -2,3 +2,4 @@ from .gerenciador_bd import *
 from .processador_dados import *
 from .processador_ranking import *
 from .processador_cpt import *
+from .espelho_duckdb import *
@@ -0,0 +1,149 @@
+"""
+Acesso aos dados da CPT
+Lê as quatro tabelas do esquema CPT pelo engine com pool, em paralelo e só com as
+colunas usadas pela aba; os resultados ficam em cache enquanto a versão das tabelas
+no Postgres não mudar, com o espelho DuckDB como reserva quando o banco cai
+"""
+
+import pandas as pd
+import streamlit as st
+from typing import Dict, List, Optional
+from sqlalchemy import text
+from processadores.gerenciador_bd import GerenciadorBancoDados
+from processadores.espelho_duckdb import obter_espelho
+from processadores.processador_cpt import colunas_necessarias_cpt
+from utilitarios.carga_paralela import executar_em_paralelo
+from configuracoes.config import TABELAS_CPT, VALIDADE_CACHE_CPT, INTERVALO_VERSAO_CPT
+
+# Usa o engine compartilhado pelo processo: as conexões do pool são reaproveitadas entre reexecuções
+_gerenciador_bd = GerenciadorBancoDados()
+
+# Duração da leitura de cada tabela na última carga de carregar_dados_cpt
+tempos_carga_cpt = {}
+
+def _esquema_e_tabela(nome_tabela: str):
+    esquema, tabela = nome_tabela.split('.', 1)
+    return esquema.strip('"'), tabela.strip('"')
+
+def _citar(identificador: str) -> str:
+    return '"' + identificador.replace('"', '""') + '"'
+
+def _tabelas_vazias() -> Dict[str, pd.DataFrame]:
+    return {chave: pd.DataFrame() for chave in TABELAS_CPT}
+
+@st.cache_data(ttl=INTERVALO_VERSAO_CPT, show_spinner=False)
+def versao_tabelas_cpt() -> Optional[tuple]:
+    """Contadores de escrita das tabelas CPT em pg_stat_user_tables; None se o banco não responder"""
+    engine = _gerenciador_bd.obter_engine()
+    if engine is None:
+        return None
+
+    tabelas = [_esquema_e_tabela(nome) for nome in TABELAS_CPT.values()]
+    consulta = text("""
+        SELECT schemaname, relname, n_tup_ins, n_tup_upd, n_tup_del
+        FROM pg_stat_user_tables
+        WHERE schemaname = ANY(:esquemas) AND relname = ANY(:tabelas)
+        ORDER BY schemaname, relname
+    """)
+    try:
+        with engine.connect() as conn:
+            linhas = conn.execute(consulta, {'esquemas': list({esquema for esquema, _ in tabelas}),
+                                             'tabelas': [tabela for _, tabela in tabelas]}).fetchall()
+        return tuple(tuple(linha) for linha in linhas)
+    except Exception:
+        return None
+
+def _listar_colunas(conn) -> Dict[str, List[str]]:
+    tabelas = {_esquema_e_tabela(nome): chave for chave, nome in TABELAS_CPT.items()}
+    consulta = text("""
+        SELECT table_schema, table_name, column_name
+        FROM information_schema.columns
+        WHERE table_schema = ANY(:esquemas) AND table_name = ANY(:tabelas)
+        ORDER BY table_schema, table_name, ordinal_position
+    """)
+    linhas = conn.execute(consulta, {'esquemas': list({esquema for esquema, _ in tabelas}),
+                                     'tabelas': [tabela for _, tabela in tabelas]}).fetchall()
+
+    colunas = {}
+    for esquema, tabela, coluna in linhas:
+        chave = tabelas.get((esquema, tabela))
+        if chave is not None:
+            colunas.setdefault(chave, []).append(coluna)
+    return colunas
+
+def _ler_tabela_cpt(engine, chave: str, colunas: Optional[List[str]]):
+    # Sem colunas reconhecidas a tabela vem inteira e processar_dados_cpt_por_municipios avisa o que falta
+    projecao = colunas_necessarias_cpt(chave, colunas or [])
+    selecao = ', '.join(_citar(col) for col in projecao) if projecao else '*'
+    try:
+        with engine.connect() as conn:
+            return pd.read_sql(text(f"SELECT {selecao} FROM {TABELAS_CPT[chave]}"), conn)
+    except Exception as e:
+        # O aviso é emitido na thread principal, onde o cache registra as mensagens
+        return e
+
+def _carregar_do_espelho(erro: Exception) -> Dict[str, pd.DataFrame]:
+    espelho = obter_espelho()
+    cpt_data = espelho.carregar_tabelas_cpt() if espelho is not None else {}
+
+    if any(not df.empty for df in cpt_data.values()):
+        st.warning("⚠️ PostgreSQL indisponível: exibindo a última cópia local dos dados CPT.")
+        return {chave: df[colunas_necessarias_cpt(chave, list(df.columns)) or list(df.columns)]
+                for chave, df in cpt_data.items()}
+
+    st.error(f"❌ Erro ao conectar ao PostgreSQL: {str(erro)}")
+    return _tabelas_vazias()
+
+@st.cache_data(ttl=VALIDADE_CACHE_CPT, show_spinner=False, max_entries=2)
+def _carregar_dados_cpt(versao: Optional[tuple]) -> Dict[str, pd.DataFrame]:
+    try:
+        engine = _gerenciador_bd.obter_engine()
+        if engine is None:
+            raise RuntimeError("engine do PostgreSQL indisponível")
+
+        with engine.connect() as conn:
+            colunas = _listar_colunas(conn)
+    except Exception as e:
+        return _carregar_do_espelho(e)
+
+    # Uma conexão do pool por tabela; a espera pelo servidor se sobrepõe entre as quatro
+    tarefas = {chave: (lambda chave=chave: _ler_tabela_cpt(engine, chave, colunas.get(chave)))
+               for chave in TABELAS_CPT}
+    cpt_data = executar_em_paralelo(tarefas, tempos_carga_cpt, max_trabalhadores=len(tarefas))
+
+    for chave, resultado in cpt_data.items():
+        if isinstance(resultado, Exception):
+            st.warning(f"⚠️ Erro ao carregar {chave}: {resultado}")
+            cpt_data[chave] = pd.DataFrame()
+
+    if sum(len(df) for df in cpt_data.values()) == 0:
+        st.warning("⚠️ Nenhum dado CPT encontrado no esquema CPT")
+
+    return cpt_data
+
+def carregar_dados_cpt() -> Dict[str, pd.DataFrame]:
+    """
+    Tabelas CPT projetadas nas colunas usadas pela aba.
+    A versão consultada a cada INTERVALO_VERSAO_CPT segundos entra na chave do cache:
+    uma escrita no Postgres invalida a cópia antes do fim da validade.
+    """
+    return _carregar_dados_cpt(versao_tabelas_cpt())
+
+@st.cache_data(ttl=VALIDADE_CACHE_CPT, show_spinner=False, max_entries=4)
+def _carregar_tabela_cpt_completa(chave: str, versao: Optional[tuple]) -> pd.DataFrame:
+    try:
+        engine = _gerenciador_bd.obter_engine()
+        if engine is None:
+            raise RuntimeError("engine do PostgreSQL indisponível")
+        with engine.connect() as conn:
+            return pd.read_sql(text(f"SELECT * FROM {TABELAS_CPT[chave]}"), conn)
+    except Exception:
+        espelho = obter_espelho()
+        try:
+            return espelho.consultar(f"SELECT * FROM cpt_{chave}") if espelho is not None else pd.DataFrame()
+        except Exception:
+            return pd.DataFrame()
+
+def carregar_tabela_cpt_completa(chave: str) -> pd.DataFrame:
+    """Todas as colunas de uma tabela CPT, lidas só quando o visualizador de tabelas pede"""
+    return _carregar_tabela_cpt_completa(chave, versao_tabelas_cpt())
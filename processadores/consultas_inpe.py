@@ -0,0 +1,92 @@
+"""
+Consultas aos focos de queimadas do INPE
+Os filtros saem como predicados que o Postgres consegue atender por índice: intervalo
+semiaberto em datahora no lugar de EXTRACT(YEAR ...) e caixa de coordenadas, com os
+valores como parâmetros vinculados no estilo de marcador de cada conexão
+"""
+
+import re
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import text
+from configuracoes.config import CONFIGURACAO_BD, LIMITES_INPE
+
+# text() do SQLAlchemy, cursor do psycopg2 (COPY) e DuckDB
+MARCADORES = {
+    'sqlalchemy': ':{}',
+    'psycopg2': '%({})s',
+    'duckdb': '${}'
+}
+
+# Faixas válidas fixas: ficam literais porque nunca mudam entre consultas
+FILTROS_FIXOS = [
+    "riscofogo BETWEEN 0 AND 1",
+    "precipitacao >= 0",
+    "diasemchuva >= 0"
+]
+
+def intervalo_ano(ano: int) -> Tuple[datetime, datetime]:
+    return datetime(ano, 1, 1), datetime(ano + 1, 1, 1)
+
+def montar_filtros_inpe(ano: Optional[int] = None,
+                        inicio: Optional[datetime] = None,
+                        fim: Optional[datetime] = None,
+                        limites: Optional[Tuple[float, float, float, float]] = LIMITES_INPE,
+                        estilo: str = 'sqlalchemy') -> Tuple[str, Dict[str, Any]]:
+    """
+    Cláusula WHERE e parâmetros dos focos do INPE
+    
+    Args:
+        ano: Ano completo, convertido em [1º de janeiro, 1º de janeiro seguinte)
+        inicio: Início do período (inclusivo), quando não se usa ano
+        fim: Fim do período (exclusivo), quando não se usa ano
+        limites: Caixa (lon_min, lat_min, lon_max, lat_max), ou None para não filtrar
+        estilo: Marcador de parâmetro da conexão ('sqlalchemy', 'psycopg2' ou 'duckdb')
+    
+    Returns:
+        Tupla (cláusula sem o WHERE, dicionário de parâmetros)
+    """
+    marcador = MARCADORES[estilo].format
+    filtros = list(FILTROS_FIXOS)
+    parametros = {}
+    
+    if limites is not None:
+        lon_min, lat_min, lon_max, lat_max = limites
+        filtros.append(f"latitude BETWEEN {marcador('lat_min')} AND {marcador('lat_max')}")
+        filtros.append(f"longitude BETWEEN {marcador('lon_min')} AND {marcador('lon_max')}")
+        parametros.update(lat_min=lat_min, lat_max=lat_max, lon_min=lon_min, lon_max=lon_max)
+    
+    if ano is not None:
+        inicio, fim = intervalo_ano(ano)
+    if inicio is not None:
+        filtros.append(f"datahora >= {marcador('inicio')}")
+        parametros['inicio'] = inicio
+    if fim is not None:
+        filtros.append(f"datahora < {marcador('fim')}")
+        parametros['fim'] = fim
+    
+    return " AND ".join(filtros), parametros
+
+def tabela_inpe() -> str:
+    return f'"{CONFIGURACAO_BD["schema"]}"."{CONFIGURACAO_BD["table"]}"'
+
+def explicar_consulta_inpe(engine, ano: Optional[int] = None) -> List[str]:
+    """Plano do Postgres (EXPLAIN) para a leitura dos focos de um ano"""
+    clausula, parametros = montar_filtros_inpe(ano)
+    consulta = text(f"EXPLAIN SELECT datahora FROM {tabela_inpe()} WHERE {clausula}")
+    with engine.connect() as conn:
+        return [linha[0] for linha in conn.execute(consulta, parametros).fetchall()]
+
+def plano_usa_indice(plano: List[str]) -> bool:
+    # Varredura por índice (btree) ou bitmap (btree ou BRIN) sobre datahora
+    return any(re.search(r'Index (Only )?Scan|Bitmap Index Scan', linha) for linha in plano)
+
+if __name__ == '__main__':
+    from processadores.gerenciador_bd import GerenciadorBancoDados
+    
+    ano = int(sys.argv[1]) if len(sys.argv) > 1 else datetime.now().year - 1
+    engine = GerenciadorBancoDados().obter_engine()
+    plano = explicar_consulta_inpe(engine, ano)
+    print('\n'.join(plano))
+    print(f"\nUsa índice em datahora para {ano}: {'sim' if plano_usa_indice(plano) else 'não'}")
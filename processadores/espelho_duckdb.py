@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+import pandas as pd
+from typing import Dict, Iterator, Optional, Union
+from sqlalchemy import text
+from processadores.gerenciador_bd import GerenciadorBancoDados
+from configuracoes.config import (CONFIGURACAO_BD, TAMANHO_CHUNK, TABELAS_CPT,
+                                  CAMINHO_ESPELHO_DUCKDB, INTERVALO_SINCRONIZACAO_ESPELHO,
+                                  ESPERA_APOS_FALHA_ESPELHO, INTERVALO_SINCRONIZACAO_COMPLETA_ESPELHO)
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+class EspelhoDuckDB:
+
+    _COLUNAS_QUEIMADAS = ['datahora', 'riscofogo', 'precipitacao', 'municipio',
+                          'diasemchuva', 'latitude', 'longitude']
+
+    def __init__(self, caminho: str = CAMINHO_ESPELHO_DUCKDB):
+        self.caminho = caminho
+        self.gerenciador_bd = GerenciadorBancoDados()
+        self._trava_escrita = threading.Lock()
+        self._trava_sincronizacao = threading.Lock()
+        self._ultima_sincronizacao = 0.0
+        self._ultima_falha = 0.0
+        # A cópia já no disco vale como completa: a primeira recópia integral fica para o próximo intervalo
+        self._ultima_sincronizacao_completa = time.time()
+
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._conexao = duckdb.connect(caminho)
+
+    def _cursor(self):
+        # cada thread usa o próprio cursor sobre a mesma base
+        return self._conexao.cursor()
+
+    def possui_tabela(self, tabela: str) -> bool:
+        try:
+            resultado = self._cursor().execute(
+                "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?", [tabela]
+            ).fetchone()
+            return bool(resultado and resultado[0] > 0)
+        except Exception:
+            return False
+
+    def consultar(self, consulta: str, parametros: Optional[Union[list, dict]] = None) -> pd.DataFrame:
+        return self._cursor().execute(consulta, parametros or []).df()
+
+    def iterar_consulta(self, consulta: str, parametros: Optional[Union[list, dict]] = None) -> Iterator[pd.DataFrame]:
+        leitor = self._cursor().execute(consulta, parametros or []).fetch_record_batch(TAMANHO_CHUNK)
+        for lote in leitor:
+            yield lote.to_pandas()
+
+    def _obter_marca_queimadas(self):
+        if not self.possui_tabela('queimadas'):
+            return None
+        return self._cursor().execute("SELECT MAX(datahora) FROM queimadas").fetchone()[0]
+
+    def _gravar_chunk_queimadas(self, cursor, chunk_df: pd.DataFrame) -> None:
+        cursor.register('chunk_queimadas', chunk_df)
+        try:
+            cursor.execute("CREATE TABLE IF NOT EXISTS queimadas AS SELECT * FROM chunk_queimadas LIMIT 0")
+            cursor.execute("INSERT INTO queimadas SELECT * FROM chunk_queimadas")
+        finally:
+            cursor.unregister('chunk_queimadas')
+
+    def _diverge_antes_da_marca(self, engine, marca) -> bool:
+        # Contagem abaixo da marca nos dois lados: pega linhas antigas apagadas (ou inseridas) no
+        # Postgres, que a cópia incremental não revisita. Correções que mantêm a contagem só
+        # aparecem na recópia integral periódica
+        consulta = f"""
+            SELECT COUNT(*) FROM "{CONFIGURACAO_BD['schema']}"."{CONFIGURACAO_BD['table']}"
+            WHERE datahora < :marca
+        """
+        with engine.connect() as conn:
+            remoto = conn.execute(text(consulta), {'marca': marca}).scalar()
+        local = self._cursor().execute("SELECT COUNT(*) FROM queimadas WHERE datahora < ?", [marca]).fetchone()[0]
+        return remoto != local
+
+    def sincronizar_queimadas(self, completa: bool = False) -> int:
+        engine = self.gerenciador_bd.obter_engine()
+        if not engine:
+            return 0
+
+        # Linhas com a mesma datahora da marca são relidas e substituídas, para não perder
+        # registros inseridos no Postgres depois da última sincronização com o mesmo horário.
+        # Sem marca (cópia integral pedida ou divergência antes dela) a tabela é relida inteira
+        marca = None if completa else self._obter_marca_queimadas()
+        if marca is not None and self._diverge_antes_da_marca(engine, marca):
+            marca = None
+        existe = self.possui_tabela('queimadas')
+        consulta = f"""
+            SELECT {', '.join(self._COLUNAS_QUEIMADAS)}
+            FROM "{CONFIGURACAO_BD['schema']}"."{CONFIGURACAO_BD['table']}"
+        """
+        parametros = {}
+        if marca is not None:
+            consulta += " WHERE datahora >= :marca"
+            parametros['marca'] = marca
+
+        total = 0
+        cursor = self._cursor()
+        with engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=TAMANHO_CHUNK)
+            chunks = pd.read_sql(text(consulta), conn, params=parametros,
+                                 parse_dates=['datahora'], chunksize=TAMANHO_CHUNK)
+
+            with self._trava_escrita:
+                cursor.execute("BEGIN TRANSACTION")
+                try:
+                    if marca is not None:
+                        cursor.execute("DELETE FROM queimadas WHERE datahora >= ?", [marca])
+                    elif existe:
+                        # Leitores seguem vendo a cópia anterior até o COMMIT
+                        cursor.execute("DELETE FROM queimadas")
+                    for chunk_df in chunks:
+                        self._gravar_chunk_queimadas(cursor, chunk_df)
+                        total += len(chunk_df)
+                    cursor.execute("COMMIT")
+                except Exception:
+                    cursor.execute("ROLLBACK")
+                    raise
+
+        return total
+
+    def sincronizar_cpt(self) -> int:
+        engine = self.gerenciador_bd.obter_engine()
+        if not engine:
+            return 0
+
+        total = 0
+        for chave, nome_tabela in TABELAS_CPT.items():
+            with engine.connect() as conn:
+                df_tabela = pd.read_sql(text(f"SELECT * FROM {nome_tabela}"), conn)
+
+            cursor = self._cursor()
+            with self._trava_escrita:
+                cursor.register('tabela_cpt', df_tabela)
+                try:
+                    cursor.execute(f"CREATE OR REPLACE TABLE cpt_{chave} AS SELECT * FROM tabela_cpt")
+                finally:
+                    cursor.unregister('tabela_cpt')
+            total += len(df_tabela)
+
+        return total
+
+    def _em_espera_apos_falha(self) -> bool:
+        return time.time() - self._ultima_falha < ESPERA_APOS_FALHA_ESPELHO
+
+    def sincronizar(self, forcar: bool = False) -> bool:
+        if not self._trava_sincronizacao.acquire(blocking=False):
+            return False
+
+        try:
+            # Nem a sincronização forçada insiste num banco que acabou de falhar
+            if self._em_espera_apos_falha():
+                return False
+            if not forcar and time.time() - self._ultima_sincronizacao < INTERVALO_SINCRONIZACAO_ESPELHO:
+                return False
+
+            try:
+                agora = time.time()
+                completa = agora - self._ultima_sincronizacao_completa >= INTERVALO_SINCRONIZACAO_COMPLETA_ESPELHO
+                self.sincronizar_queimadas(completa)
+                self.sincronizar_cpt()
+                self._ultima_sincronizacao = time.time()
+                if completa:
+                    self._ultima_sincronizacao_completa = agora
+                return True
+            except Exception:
+                # banco remoto lento ou fora do ar: o espelho segue servindo a última cópia
+                # e a próxima tentativa só sai depois de ESPERA_APOS_FALHA_ESPELHO
+                self._ultima_falha = time.time()
+                return False
+        finally:
+            self._trava_sincronizacao.release()
+
+    def sincronizar_em_segundo_plano(self, forcar: bool = False) -> None:
+        if self._trava_sincronizacao.locked() or self._em_espera_apos_falha():
+            return
+        if not forcar and time.time() - self._ultima_sincronizacao < INTERVALO_SINCRONIZACAO_ESPELHO:
+            return
+        threading.Thread(target=self.sincronizar, args=(forcar,), daemon=True,
+                         name="sincronizacao_espelho").start()
+
+    def preparar_queimadas(self) -> bool:
+        # Toda cópia, inclusive a primeira, roda em segundo plano: enquanto a tabela
+        # não existe a página lê direto do Postgres em vez de esperar a sincronização
+        if self.possui_tabela('queimadas'):
+            self.sincronizar_em_segundo_plano()
+            return True
+        self.sincronizar_em_segundo_plano(forcar=True)
+        return False
+
+    def carregar_tabelas_cpt(self) -> Dict[str, pd.DataFrame]:
+        cpt_data = {}
+        for chave in TABELAS_CPT:
+            try:
+                cpt_data[chave] = self.consultar(f"SELECT * FROM cpt_{chave}")
+            except Exception:
+                cpt_data[chave] = pd.DataFrame()
+        return cpt_data
+
+_espelho: Optional[EspelhoDuckDB] = None
+_falha_abertura = 0.0
+_trava_espelho = threading.Lock()
+
+def obter_espelho() -> Optional[EspelhoDuckDB]:
+    global _espelho, _falha_abertura
+    if duckdb is None:
+        return None
+
+    with _trava_espelho:
+        if _espelho is None:
+            # Arquivo travado por outro processo, por exemplo: sem nova tentativa a cada consulta
+            if time.time() - _falha_abertura < ESPERA_APOS_FALHA_ESPELHO:
+                return None
+            try:
+                _espelho = EspelhoDuckDB()
+            except Exception:
+                _falha_abertura = time.time()
+                return None
+        return _espelho
@@ -1,22 +1,81 @@
 import gc
+import threading
+import time
+import pandas as pd
 import psutil
-from sqlalchemy import create_engine
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 from configuracoes.config import CONFIGURACAO_BD
 
-class GerenciadorBancoDados:
+class MetricasPool:
     def __init__(self):
-        self._engine = None
-        self._string_conexao = self._construir_string_conexao()
-    
-    def _construir_string_conexao(self) -> str:
-        return (f"postgresql://{CONFIGURACAO_BD['user']}:{CONFIGURACAO_BD['password']}"
-                f"@{CONFIGURACAO_BD['host']}:{CONFIGURACAO_BD['port']}/{CONFIGURACAO_BD['database']}")
-    
-    def obter_engine(self):
-        if self._engine is None:
+        self._trava = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.conexoes_abertas = 0
+        self.conexoes_fechadas = 0
+        self.invalidacoes = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.overflow_max = 0
+
+    def incrementar(self, contador: str) -> None:
+        with self._trava:
+            setattr(self, contador, getattr(self, contador) + 1)
+
+    def registrar_espera(self, segundos: float, overflow: int) -> None:
+        with self._trava:
+            self.espera_total += segundos
+            self.espera_max = max(self.espera_max, segundos)
+            self.overflow_max = max(self.overflow_max, overflow)
+
+class PoolInstrumentado(QueuePool):
+    # Mede quanto cada checkout espera por uma conexão (livre, nova ou de overflow)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metricas = MetricasPool()
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metricas.registrar_espera(time.perf_counter() - inicio, self.overflow())
+
+    def recreate(self):
+        # engine.dispose() troca o pool; os contadores continuam acumulando no novo
+        novo = super().recreate()
+        novo.metricas = self.metricas
+        return novo
+
+# Um engine por string de conexão para todo o processo: todos os processadores
+# compartilham o mesmo pool e nenhuma consulta paga de novo TCP, TLS e autenticação
+_engines: Dict[str, Engine] = {}
+_trava_engines = threading.Lock()
+
+def _registrar_eventos(engine: Engine) -> None:
+    eventos = {
+        'checkout': 'checkouts',
+        'checkin': 'checkins',
+        'connect': 'conexoes_abertas',
+        'close': 'conexoes_fechadas',
+        'invalidate': 'invalidacoes'
+    }
+    for nome_evento, contador in eventos.items():
+        def ouvinte(*args, _contador=contador):
+            engine.pool.metricas.incrementar(_contador)
+        event.listen(engine, nome_evento, ouvinte)
+
+def obter_engine_compartilhado(string_conexao: str) -> Optional[Engine]:
+    with _trava_engines:
+        engine = _engines.get(string_conexao)
+        if engine is None:
             try:
-                self._engine = create_engine(
-                    self._string_conexao,
+                engine = create_engine(
+                    string_conexao,
+                    poolclass=PoolInstrumentado,
                     pool_size=5,
                     max_overflow=10,
                     pool_pre_ping=True,
@@ -25,13 +84,67 @@ class GerenciadorBancoDados:
                 )
             except Exception:
                 return None
-        return self._engine
-    
-    def liberar(self):
-        if self._engine:
-            self._engine.dispose()
-            self._engine = None
-            gc.collect()
+            _registrar_eventos(engine)
+            _engines[string_conexao] = engine
+        return engine
+
+def verificar_saude(engine: Engine) -> dict:
+    inicio = time.perf_counter()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return {'ok': True, 'latencia_ms': (time.perf_counter() - inicio) * 1000, 'erro': None}
+    except Exception as e:
+        return {'ok': False, 'latencia_ms': (time.perf_counter() - inicio) * 1000, 'erro': str(e)}
+
+def relatorio_pools() -> pd.DataFrame:
+    with _trava_engines:
+        engines = list(_engines.values())
+
+    linhas = []
+    for engine in engines:
+        pool = engine.pool
+        metricas = pool.metricas
+        linhas.append({
+            'banco': engine.url.render_as_string(hide_password=True),
+            'tamanho': pool.size(),
+            'em_uso': pool.checkedout(),
+            'ociosas': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'overflow_max': max(metricas.overflow_max, 0),
+            'checkouts': metricas.checkouts,
+            'conexoes_abertas': metricas.conexoes_abertas,
+            'conexoes_fechadas': metricas.conexoes_fechadas,
+            'invalidacoes': metricas.invalidacoes,
+            'espera_media_ms': metricas.espera_total / metricas.checkouts * 1000 if metricas.checkouts else 0.0,
+            'espera_max_ms': metricas.espera_max * 1000
+        })
+    return pd.DataFrame(linhas)
+
+def encerrar_engines() -> None:
+    with _trava_engines:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+    gc.collect()
+
+class GerenciadorBancoDados:
+    def __init__(self):
+        self._string_conexao = self._construir_string_conexao()
+
+    def _construir_string_conexao(self) -> str:
+        # Driver explícito: a partir do SQLAlchemy 2.1 "postgresql://" usa psycopg 3, que não está nos requisitos
+        return (f"postgresql+psycopg2://{CONFIGURACAO_BD['user']}:{CONFIGURACAO_BD['password']}"
+                f"@{CONFIGURACAO_BD['host']}:{CONFIGURACAO_BD['port']}/{CONFIGURACAO_BD['database']}")
+
+    def obter_engine(self):
+        return obter_engine_compartilhado(self._string_conexao)
+
+    def verificar_saude(self) -> dict:
+        engine = self.obter_engine()
+        if engine is None:
+            return {'ok': False, 'latencia_ms': 0.0, 'erro': 'engine indisponível'}
+        return verificar_saude(engine)
 
 def limpar_memoria_se_necessario():
     if psutil.virtual_memory().percent > 85:
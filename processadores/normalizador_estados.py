@@ -0,0 +1,67 @@
+"""
+Normalização de nomes de estados
+Tabelas únicas de siglas/nomes e mapeamento vetorizado: cada valor distinto é
+normalizado uma única vez e o resultado é propagado pelos códigos da coluna
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Callable, Optional
+
+SIGLAS_ESTADOS = {
+    'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas',
+    'BA': 'Bahia', 'CE': 'Ceará', 'DF': 'Distrito Federal',
+    'ES': 'Espírito Santo', 'GO': 'Goiás', 'MA': 'Maranhão',
+    'MT': 'Mato Grosso', 'MS': 'Mato Grosso do Sul', 'MG': 'Minas Gerais',
+    'PA': 'Pará', 'PB': 'Paraíba', 'PR': 'Paraná', 'PE': 'Pernambuco',
+    'PI': 'Piauí', 'RJ': 'Rio de Janeiro', 'RN': 'Rio Grande do Norte',
+    'RS': 'Rio Grande do Sul', 'RO': 'Rondônia', 'RR': 'Roraima',
+    'SC': 'Santa Catarina', 'SP': 'São Paulo', 'SE': 'Sergipe',
+    'TO': 'Tocantins'
+}
+
+# Grafias sem acento aceitas pela normalização tolerante (dados da CPT)
+CORRECOES_ESTADOS = {
+    'PARA': 'Pará', 'CEARA': 'Ceará', 'ESPIRITO SANTO': 'Espírito Santo',
+    'GOIAS': 'Goiás', 'MARANHAO': 'Maranhão', 'PARAIBA': 'Paraíba',
+    'PARANA': 'Paraná', 'PIAUI': 'Piauí', 'RONDONIA': 'Rondônia',
+    'SAO PAULO': 'São Paulo'
+}
+
+# Estrita: sigla ou nome oficial em maiúsculas
+_MAPA_ESTRITO = {**SIGLAS_ESTADOS, **{nome.upper(): nome for nome in SIGLAS_ESTADOS.values()}}
+
+# Tolerante: também aceita as correções sem acento e o nome sem espaços ("MATOGROSSO")
+_MAPA_TOLERANTE = {**_MAPA_ESTRITO, **CORRECOES_ESTADOS}
+_MAPA_SEM_ESPACOS = {nome.upper().replace(' ', ''): nome for nome in SIGLAS_ESTADOS.values()}
+
+def normalizar_estado(sigla) -> Optional[str]:
+    """Normaliza sigla ou nome oficial de estado para o nome completo"""
+    if pd.isna(sigla):
+        return None
+    return _MAPA_ESTRITO.get(str(sigla).strip().upper())
+
+def normalizar_estado_tolerante(valor_estado) -> Optional[str]:
+    """Como normalizar_estado, aceitando também grafias sem acento e nomes sem espaços"""
+    if pd.isna(valor_estado):
+        return None
+    # Todas as chaves só têm letras e espaços: valores com dígitos, pontuação ou
+    # marcadores como 'UF'/'NULL' nunca coincidem e resultam em None
+    estado_str = str(valor_estado).strip().upper()
+    estado = _MAPA_TOLERANTE.get(estado_str)
+    if estado is None:
+        estado = _MAPA_SEM_ESPACOS.get(estado_str.replace(' ', ''))
+    return estado
+
+def mapear_unicos(serie: pd.Series, funcao: Callable) -> pd.Series:
+    """Aplica funcao a cada valor distinto da série e propaga o resultado pelos códigos"""
+    codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+    # Posição extra no fim da tabela para os nulos (código -1)
+    tabela = np.empty(len(unicos) + 1, dtype=object)
+    tabela[:-1] = [funcao(valor) for valor in unicos]
+    tabela[-1] = funcao(None)
+    return pd.Series(tabela[codigos], index=serie.index, name=serie.name, dtype=object)
+
+def normalizar_serie_estados(serie: pd.Series, tolerante: bool = False) -> pd.Series:
+    """Versão vetorizada de normalizar_estado / normalizar_estado_tolerante"""
+    return mapear_unicos(serie, normalizar_estado_tolerante if tolerante else normalizar_estado)
@@ -6,48 +6,18 @@ Responsável pelo carregamento e processamento de dados de alertas
 import geopandas as gpd
 import pandas as pd
 import streamlit as st
+from utilitarios.cache_geoparquet import carregar_com_cache
+from utilitarios.impressao_digital import CHAVE_VERSAO_DADOS, definir_versao_dados
+from utilitarios.carga_paralela import executar_em_paralelo
+from processadores.normalizador_estados import normalizar_serie_estados
 
-def normalizar_estado(sigla):
-    """Normaliza sigla de estado para nome completo"""
-    mapa_estados = {
-        'AC': 'Acre', 'ACRE': 'Acre',
-        'AL': 'Alagoas', 'ALAGOAS': 'Alagoas',
-        'AP': 'Amapá', 'AMAPÁ': 'Amapá',
-        'AM': 'Amazonas', 'AMAZONAS': 'Amazonas',
-        'BA': 'Bahia', 'BAHIA': 'Bahia',
-        'CE': 'Ceará', 'CEARÁ': 'Ceará',
-        'DF': 'Distrito Federal', 'DISTRITO FEDERAL': 'Distrito Federal',
-        'ES': 'Espírito Santo', 'ESPÍRITO SANTO': 'Espírito Santo',
-        'GO': 'Goiás', 'GOIÁS': 'Goiás',
-        'MA': 'Maranhão', 'MARANHÃO': 'Maranhão',
-        'MT': 'Mato Grosso', 'MATO GROSSO': 'Mato Grosso',
-        'MS': 'Mato Grosso do Sul', 'MATO GROSSO DO SUL': 'Mato Grosso do Sul',
-        'MG': 'Minas Gerais', 'MINAS GERAIS': 'Minas Gerais',
-        'PA': 'Pará', 'PARÁ': 'Pará',
-        'PB': 'Paraíba', 'PARAÍBA': 'Paraíba',
-        'PR': 'Paraná', 'PARANÁ': 'Paraná',
-        'PE': 'Pernambuco', 'PERNAMBUCO': 'Pernambuco',
-        'PI': 'Piauí', 'PIAUÍ': 'Piauí',
-        'RJ': 'Rio de Janeiro', 'RIO DE JANEIRO': 'Rio de Janeiro',
-        'RN': 'Rio Grande do Norte', 'RIO GRANDE DO NORTE': 'Rio Grande do Norte',
-        'RS': 'Rio Grande do Sul', 'RIO GRANDE DO SUL': 'Rio Grande do Sul',
-        'RO': 'Rondônia', 'RONDÔNIA': 'Rondônia',
-        'RR': 'Roraima', 'RORAIMA': 'Roraima',
-        'SC': 'Santa Catarina', 'SANTA CATARINA': 'Santa Catarina',
-        'SP': 'São Paulo', 'SÃO PAULO': 'São Paulo',
-        'SE': 'Sergipe', 'SERGIPE': 'Sergipe',
-        'TO': 'Tocantins', 'TOCANTINS': 'Tocantins'
-    }
-    if pd.isna(sigla):
-        return None
-    sigla_upper = str(sigla).strip().upper()
-    return mapa_estados.get(sigla_upper, None)
-
+# Duração da leitura de cada arquivo na última carga de carregar_todos_alertas
+tempos_carga_alertas = {}
 
 def carregar_alerta_shapefile(caminho, tipo_origem):
     """
     Carrega um shapefile de alertas otimizado para Streamlit Cloud.
-    Simplifica geometrias e reduz uso de memória.
+    Mantém as geometrias exatas e reduz uso de memória nas colunas.
     
     Args:
         caminho: Caminho para o arquivo shapefile
@@ -56,6 +26,14 @@ def carregar_alerta_shapefile(caminho, tipo_origem):
     Returns:
         GeoDataFrame com alertas padronizados
     """
+    return carregar_com_cache(
+        caminho, 'alertas',
+        lambda: _normalizar_alerta_shapefile(caminho, tipo_origem),
+        (tipo_origem,)
+    )
+
+
+def _normalizar_alerta_shapefile(caminho, tipo_origem):
     try:
         # Verificar se arquivo existe
         import os
@@ -70,8 +48,7 @@ def carregar_alerta_shapefile(caminho, tipo_origem):
             st.warning(f"⚠️ Arquivo vazio: {caminho}")
             return gpd.GeoDataFrame()
         
-        # Simplificar geometrias ANTES de processar (reduz 50-70% da memória)
-        gdf['geometry'] = gdf['geometry'].simplify(tolerance=0.001, preserve_topology=True)
+        # Geometrias exatas: as áreas e intersecções dependem delas; os mapas usam a PiramideGeometrias
         
         # Ajustar CRS para padrão WGS84 (EPSG:4326)
         if gdf.crs is None:
@@ -116,7 +93,7 @@ def carregar_alerta_shapefile(caminho, tipo_origem):
         
         # Processar coluna ESTADO
         if 'ESTADO' in gdf.columns:
-            gdf['ESTADO'] = gdf['ESTADO'].apply(normalizar_estado)
+            gdf['ESTADO'] = normalizar_serie_estados(gdf['ESTADO'])
             gdf = gdf[gdf['ESTADO'].notna()].copy()
             # Resetar índice após filtragem por ESTADO
             gdf = gdf.reset_index(drop=True)
@@ -163,13 +140,18 @@ def carregar_todos_alertas():
     """
     import os
     
-    # Carregar cada arquivo separadamente (APENAS SHAPEFILES LOCAIS)
-    gdf_para = carregar_alerta_shapefile("alertas.shp", "Pará")
-    gdf_estados = carregar_alerta_shapefile("Filtrado/Alertas_Estados_Restantes.shp", "Estados")
-    gdf_ti = carregar_alerta_shapefile("Filtrado/Alertas_Outros.shp", "TI")
+    # Os arquivos são independentes: leitura, reparo e reprojeção correm em paralelo (APENAS SHAPEFILES LOCAIS)
+    arquivos = {
+        "Pará": "alertas.shp",
+        "Estados": "Filtrado/Alertas_Estados_Restantes.shp",
+        "TI": "Filtrado/Alertas_Outros.shp"
+    }
+    tarefas = {origem: (lambda caminho=caminho, origem=origem: carregar_alerta_shapefile(caminho, origem))
+               for origem, caminho in arquivos.items()}
+    gdfs = executar_em_paralelo(tarefas, tempos_carga_alertas)
     
-    # Combinar todos os dataframes
-    lista_gdfs = [gdf_para, gdf_estados, gdf_ti]
+    # Combinar todos os dataframes, na mesma ordem de antes
+    lista_gdfs = [gdfs["Pará"], gdfs["Estados"], gdfs["TI"]]
     lista_gdfs = [gdf for gdf in lista_gdfs if not gdf.empty]
     
     if not lista_gdfs:
@@ -193,9 +175,101 @@ def carregar_todos_alertas():
     # Recriar IDs únicos após combinação para evitar duplicatas
     gdf_combinado['id_alerta'] = [f"alerta_{i}" for i in range(len(gdf_combinado))]
     
+    # Ordenação estável por (ESTADO, ANODETEC): cada recorte de estado/ano vira um intervalo contíguo
+    gdf_combinado = ordenar_alertas(gdf_combinado)
+    
+    # Versão do conjunto combinado a partir das versões de cada arquivo
+    versoes = [str(gdf.attrs.get(CHAVE_VERSAO_DADOS, '')) for gdf in lista_gdfs_limpos]
+    definir_versao_dados(gdf_combinado, '+'.join(versoes))
+    
     return gdf_combinado
 
 
+def ordenar_alertas(gdf_alertas, manter_indice=False):
+    """
+    Ordena os alertas por estado e ano de detecção, mantendo a ordem original dentro de cada grupo
+    
+    Args:
+        gdf_alertas: GeoDataFrame com alertas
+        manter_indice: Se True, cada alerta conserva o próprio rótulo
+    
+    Returns:
+        GeoDataFrame ordenado, com índice 0..n-1 (ou os rótulos originais com manter_indice)
+    """
+    colunas = [col for col in ['ESTADO', 'ANODETEC'] if col in gdf_alertas.columns]
+    if gdf_alertas.empty or not colunas:
+        return gdf_alertas
+    return gdf_alertas.sort_values(colunas, kind='stable', na_position='last', ignore_index=not manter_indice)
+
+
+class AlertasParticionados:
+    """
+    Alertas ordenados por (ESTADO, ANODETEC) com tabelas de deslocamento.
+    Qualquer recorte de estado/ano é uma consulta ao dicionário seguida de um iloc
+    contíguo, sem máscara booleana nem cópia das colunas.
+    """
+    
+    def __init__(self, gdf_alertas):
+        self.gdf = gdf_alertas
+        self._estados = {}
+        self._estado_ano = {}
+        
+        if gdf_alertas.empty or 'ESTADO' not in gdf_alertas.columns:
+            return
+        
+        if not self._indexar():
+            # Camada fora de ordem: ordena uma única vez e recalcula os deslocamentos. Os rótulos
+            # ficam os da camada 'alertas', que o IndiceIncidencia usa para achar cada alerta
+            self.gdf = ordenar_alertas(gdf_alertas, manter_indice=True)
+            self._indexar()
+    
+    def _intervalos(self, chaves):
+        # Primeiro e último índice posicional de cada grupo definem o intervalo [início, fim)
+        intervalos = {}
+        for chave, posicoes in self.gdf.groupby(chaves, sort=False, observed=True).indices.items():
+            inicio, fim = int(posicoes[0]), int(posicoes[-1]) + 1
+            if fim - inicio != len(posicoes):
+                return None
+            intervalos[chave] = (inicio, fim)
+        return intervalos
+    
+    def _indexar(self):
+        self._estados = self._intervalos('ESTADO')
+        if self._estados is None:
+            return False
+        
+        if 'ANODETEC' in self.gdf.columns:
+            self._estado_ano = self._intervalos(['ESTADO', 'ANODETEC'])
+            if self._estado_ano is None:
+                return False
+        return True
+    
+    def estados(self):
+        return list(self._estados)
+    
+    def fatia(self, estado=None, ano='Todos'):
+        """
+        Recorte dos alertas por estado e ano
+        
+        Args:
+            estado: Nome do estado (None para todos)
+            ano: Ano de detecção (ou 'Todos')
+        
+        Returns:
+            GeoDataFrame com as linhas do intervalo; compartilha os dados da camada e não deve ser alterado
+        """
+        if estado is None:
+            if ano == 'Todos' or 'ANODETEC' not in self.gdf.columns:
+                return self.gdf
+            return self.gdf[self.gdf['ANODETEC'] == ano]
+        
+        if ano == 'Todos' or 'ANODETEC' not in self.gdf.columns:
+            inicio, fim = self._estados.get(estado, (0, 0))
+        else:
+            inicio, fim = self._estado_ano.get((estado, ano), (0, 0))
+        return self.gdf.iloc[inicio:fim]
+
+
 def filtrar_alertas_por_estado(gdf_alertas, estado):
     """
     Filtra alertas por estado
@@ -210,7 +284,8 @@ def filtrar_alertas_por_estado(gdf_alertas, estado):
     if gdf_alertas.empty or 'ESTADO' not in gdf_alertas.columns:
         return gpd.GeoDataFrame()
     
-    return gdf_alertas[gdf_alertas['ESTADO'] == estado].copy()
+    # A máscara booleana já produz um novo GeoDataFrame
+    return gdf_alertas[gdf_alertas['ESTADO'] == estado]
 
 
 def filtrar_alertas_por_ano(gdf_alertas, ano):
@@ -227,10 +302,11 @@ def filtrar_alertas_por_ano(gdf_alertas, ano):
     if gdf_alertas.empty:
         return gpd.GeoDataFrame()
     
+    # Sem filtro a própria camada é devolvida: o chamador não deve alterá-la
     if ano == 'Todos':
-        return gdf_alertas.copy()
+        return gdf_alertas
     
     if 'ANODETEC' not in gdf_alertas.columns:
-        return gdf_alertas.copy()
+        return gdf_alertas
     
-    return gdf_alertas[gdf_alertas['ANODETEC'] == ano].copy()
+    return gdf_alertas[gdf_alertas['ANODETEC'] == ano]
@@ -1,22 +1,52 @@
 import gc
+import logging
+import tempfile
 import pandas as pd
 import psutil
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from sqlalchemy import text
 from processadores.gerenciador_bd import GerenciadorBancoDados, limpar_memoria_se_necessario
-from configuracoes.config import CONFIGURACAO_BD, TAMANHO_CHUNK, LIMITE_MEMORIA
+from processadores.espelho_duckdb import obter_espelho
+from processadores.consultas_inpe import montar_filtros_inpe
+from configuracoes.config import (CONFIGURACAO_BD, TAMANHO_CHUNK, LIMITE_MEMORIA,
+                                  MODO_CARGA_INPE, TAMANHO_BUFFER_COPY, USAR_ESPELHO_DUCKDB)
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = None
+    pa_csv = None
+
+logger = logging.getLogger(__name__)
+
+class MemoriaInsuficienteError(MemoryError):
+    """Leitura dos focos interrompida por uso de memória acima de LIMITE_MEMORIA"""
 
 class ProcessadorDados:
     
+    _MAPA_COLUNAS = {
+        'datahora': 'DataHora',
+        'riscofogo': 'RiscoFogo',
+        'precipitacao': 'Precipitacao',
+        'municipio': 'mun_corrigido',
+        'diasemchuva': 'DiaSemChuva',
+        'latitude': 'Latitude',
+        'longitude': 'Longitude'
+    }
+    
+    _TIPOS_COPY = {
+        'datahora': 'str',
+        'riscofogo': 'float32',
+        'precipitacao': 'float32',
+        'municipio': 'category',
+        'diasemchuva': 'int16',
+        'latitude': 'float32',
+        'longitude': 'float32'
+    }
+    
     def __init__(self):
         self.gerenciador_bd = GerenciadorBancoDados()
-        self._filtros_base = [
-            "riscofogo BETWEEN 0 AND 1",
-            "precipitacao >= 0",
-            "diasemchuva >= 0",
-            "latitude BETWEEN -15 AND 5",
-            "longitude BETWEEN -60 AND -45"
-        ]
     
     def _verificar_uso_memoria(self) -> bool:
         return psutil.virtual_memory().percent < LIMITE_MEMORIA
@@ -40,20 +70,6 @@ class ProcessadorDados:
         
         return df
     
-    def _obter_contagem_linhas(self, engine, clausula_where: str) -> int:
-        try:
-            consulta_contagem = text(f"""
-                SELECT COUNT(*) 
-                FROM "{CONFIGURACAO_BD['schema']}"."{CONFIGURACAO_BD['table']}"
-                WHERE {clausula_where}
-            """)
-            
-            with engine.connect() as conn:
-                resultado = conn.execute(consulta_contagem)
-                return resultado.scalar() or 0
-        except Exception:
-            return 0
-    
     def _construir_consulta_base(self) -> str:
         return f"""
             SELECT
@@ -67,29 +83,62 @@ class ProcessadorDados:
             FROM "{CONFIGURACAO_BD['schema']}"."{CONFIGURACAO_BD['table']}"
         """
     
-    def _carregar_dados_em_chunks(self, engine, consulta_base: str, clausula_where: str, 
-                         total_linhas: int) -> Optional[pd.DataFrame]:
-        chunks = []
+    def _construir_consulta_espelho(self) -> str:
+        return """
+            SELECT
+                datahora,
+                riscofogo,
+                precipitacao,
+                municipio,
+                diasemchuva,
+                latitude,
+                longitude
+            FROM queimadas
+        """
+    
+    def _obter_espelho_queimadas(self):
+        if not USAR_ESPELHO_DUCKDB:
+            return None
+        espelho = obter_espelho()
+        if espelho is None or not espelho.preparar_queimadas():
+            return None
+        return espelho
+    
+    def _construir_clausula_where(self, ano: Optional[int] = None, estilo: str = 'sqlalchemy') -> Tuple[str, dict]:
+        # O ano vira o intervalo [1º de janeiro, 1º de janeiro seguinte): o índice em datahora é usado
+        return montar_filtros_inpe(ano, estilo=estilo)
+    
+    def _iterar_chunks(self, engine, consulta_base: str, clausula_where: str,
+                       parametros: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+        # stream_results abre um cursor nomeado (server-side) no psycopg2: o Postgres
+        # percorre a tabela uma única vez, em vez de reprocessar as linhas a cada OFFSET
+        consulta = text(f"""
+            {consulta_base}
+            WHERE {clausula_where}
+        """)
         
-        try:
-            for offset in range(0, total_linhas, TAMANHO_CHUNK):
+        linhas = 0
+        with engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=TAMANHO_CHUNK)
+            for chunk_df in pd.read_sql(consulta, conn, params=parametros, parse_dates=['datahora'],
+                                        chunksize=TAMANHO_CHUNK):
+                linhas += len(chunk_df)
+                chunk_df = chunk_df.rename(columns=self._MAPA_COLUNAS)
+                yield self._otimizar_dataframe(chunk_df)
+                
+                del chunk_df
                 if not self._verificar_uso_memoria():
                     gc.collect()
                     if not self._verificar_uso_memoria():
-                        break
-                
-                consulta_chunk = text(f"""
-                    {consulta_base}
-                    WHERE {clausula_where}
-                    LIMIT {TAMANHO_CHUNK} OFFSET {offset}
-                """)
-                
-                chunk_df = pd.read_sql(consulta_chunk, engine, parse_dates=['datahora'])
-                chunk_df = self._otimizar_dataframe(chunk_df)
-                chunks.append(chunk_df)
-                
-                del chunk_df
-                gc.collect()
+                        # Parar em silêncio entregaria totais parciais como se fossem os da tabela inteira
+                        raise MemoriaInsuficienteError(
+                            f"Uso de memória acima de {LIMITE_MEMORIA}%: leitura interrompida após {linhas} linhas"
+                        )
+    
+    def _carregar_dados_em_chunks(self, engine, consulta_base: str, clausula_where: str,
+                                  parametros: Optional[dict] = None) -> Optional[pd.DataFrame]:
+        try:
+            chunks = list(self._iterar_chunks(engine, consulta_base, clausula_where, parametros))
             
             if chunks:
                 df = pd.concat(chunks, ignore_index=True)
@@ -97,48 +146,145 @@ class ProcessadorDados:
                 gc.collect()
                 return df
             
+        except MemoriaInsuficienteError as e:
+            logger.error("Carga dos focos descartada: %s", e)
         except Exception:
-            pass
+            logger.exception("Falha na leitura dos focos pelo cursor")
         
         return None
     
-    def carregar_dados_inpe(self, ano: Optional[int] = None) -> Optional[pd.DataFrame]:
-        engine = None
+    def _ler_csv_copy(self, buffer) -> pd.DataFrame:
+        if pa_csv is not None:
+            tipos_arrow = {
+                'datahora': pa.string(),
+                'riscofogo': pa.float32(),
+                'precipitacao': pa.float32(),
+                'municipio': pa.dictionary(pa.int32(), pa.string()),
+                'diasemchuva': pa.int16(),
+                'latitude': pa.float32(),
+                'longitude': pa.float32()
+            }
+            # No CSV do COPY o NULL é o campo vazio sem aspas e o texto vazio vem como "": só o primeiro
+            # vira nulo, como no cursor (o padrão do pyarrow leria o NULL de municipio como '')
+            opcoes = pa_csv.ConvertOptions(column_types=tipos_arrow, null_values=[''], strings_can_be_null=True,
+                                           quoted_strings_can_be_null=False)
+            tabela = pa_csv.read_csv(buffer, convert_options=opcoes)
+            df = tabela.to_pandas()
+            del tabela
+        else:
+            df = pd.read_csv(buffer, dtype=self._TIPOS_COPY, keep_default_na=False, na_values=[''])
+        
+        # datahora vem como texto para aceitar tanto timestamp quanto timestamptz
+        df['datahora'] = pd.to_datetime(df['datahora'], format='ISO8601')
+        return df.rename(columns=self._MAPA_COLUNAS)
+    
+    def _carregar_dados_via_copy(self, engine, consulta_base: str, clausula_where: str,
+                                 parametros: Optional[dict] = None) -> Optional[pd.DataFrame]:
+        # COPY ... TO STDOUT entrega o resultado em bloco, sem montar objetos Python linha a linha.
+        # COPY não aceita parâmetros no servidor: o psycopg2 os escreve na consulta (mogrify)
+        consulta = f"""
+            COPY ({consulta_base}
+            WHERE {clausula_where}) TO STDOUT WITH (FORMAT csv, HEADER true)
+        """
+        
+        conexao = engine.raw_connection()
+        try:
+            with tempfile.SpooledTemporaryFile(max_size=TAMANHO_BUFFER_COPY) as buffer:
+                cursor = conexao.cursor()
+                try:
+                    cursor.copy_expert(cursor.mogrify(consulta, parametros or {}), buffer)
+                finally:
+                    cursor.close()
+                
+                if buffer.tell() == 0:
+                    return None
+                
+                buffer.seek(0)
+                if not self._verificar_uso_memoria():
+                    gc.collect()
+                return self._ler_csv_copy(buffer)
+        finally:
+            conexao.close()
+    
+    def _carregar_do_espelho(self, ano: Optional[int] = None) -> Optional[pd.DataFrame]:
+        espelho = self._obter_espelho_queimadas()
+        if espelho is None:
+            return None
+        
+        clausula_where, parametros = self._construir_clausula_where(ano, 'duckdb')
+        try:
+            df = espelho.consultar(f"""
+                {self._construir_consulta_espelho()}
+                WHERE {clausula_where}
+            """, parametros)
+        except Exception:
+            return None
+        
+        df = self._otimizar_dataframe(df.rename(columns=self._MAPA_COLUNAS))
+        return df.dropna(subset=['DataHora', 'mun_corrigido'])
+    
+    def iterar_dados_inpe(self, ano: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        espelho = self._obter_espelho_queimadas()
+        if espelho is not None:
+            clausula_where, parametros = self._construir_clausula_where(ano, 'duckdb')
+            consulta = f"""
+                {self._construir_consulta_espelho()}
+                WHERE {clausula_where}
+            """
+            for chunk_df in espelho.iterar_consulta(consulta, parametros):
+                yield self._otimizar_dataframe(chunk_df.rename(columns=self._MAPA_COLUNAS))
+            return
+        
+        engine = self.gerenciador_bd.obter_engine()
+        if not engine:
+            return
+        
+        try:
+            yield from self._iterar_chunks(engine, self._construir_consulta_base(),
+                                           *self._construir_clausula_where(ano))
+        finally:
+            limpar_memoria_se_necessario()
+    
+    def carregar_dados_inpe(self, ano: Optional[int] = None, modo: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Carrega os focos do INPE de um ano (ou de todos)
+        
+        Args:
+            ano: Ano dos focos, ou None para a tabela inteira
+            modo: 'copy' ou 'cursor' lê direto do Postgres pelo caminho pedido; None usa o espelho
+                  DuckDB quando disponível e, sem ele, o MODO_CARGA_INPE
+        
+        Returns:
+            DataFrame dos focos (vazio se a leitura falhar), ou None sem conexão com o banco
+        """
+        if modo is None:
+            df = self._carregar_do_espelho(ano)
+            if df is not None:
+                return df
+            modo = MODO_CARGA_INPE
+        
         try:
             engine = self.gerenciador_bd.obter_engine()
             if not engine:
                 return None
             
-            filtros = self._filtros_base.copy()
-            if ano is not None:
-                filtros.append(f"EXTRACT(YEAR FROM datahora) = {ano}")
-            clausula_where = " AND ".join(filtros)
-            
-            total_linhas = self._obter_contagem_linhas(engine, clausula_where)
-            if total_linhas == 0:
-                return pd.DataFrame()
-            
             consulta_base = self._construir_consulta_base()
             
-            if total_linhas <= TAMANHO_CHUNK:
-                consulta = text(f"{consulta_base} WHERE {clausula_where}")
-                df = pd.read_sql(consulta, engine, parse_dates=['datahora'])
-            else:
-                df = self._carregar_dados_em_chunks(engine, consulta_base, clausula_where, total_linhas)
+            df = None
+            if modo == 'copy':
+                try:
+                    df = self._carregar_dados_via_copy(engine, consulta_base,
+                                                       *self._construir_clausula_where(ano, 'psycopg2'))
+                except Exception:
+                    logger.warning("COPY dos focos falhou, lendo pelo cursor", exc_info=True)
+                    df = None
+            
+            if df is None:
+                df = self._carregar_dados_em_chunks(engine, consulta_base, *self._construir_clausula_where(ano))
             
             if df is None or df.empty:
                 return pd.DataFrame()
             
-            df = df.rename(columns={
-                'datahora': 'DataHora',
-                'riscofogo': 'RiscoFogo',
-                'precipitacao': 'Precipitacao',
-                'municipio': 'mun_corrigido',
-                'diasemchuva': 'DiaSemChuva',
-                'latitude': 'Latitude',
-                'longitude': 'Longitude'
-            })
-            
             df = self._otimizar_dataframe(df)
             df = df.dropna(subset=['DataHora', 'mun_corrigido'])
             
@@ -146,14 +292,26 @@ class ProcessadorDados:
             return df
             
         except Exception:
+            logger.exception("Falha na carga dos focos do INPE")
             return None
         finally:
-            if engine:
-                engine.dispose()
-            self.gerenciador_bd.liberar()
+            # O engine é compartilhado pelo processo: as conexões voltam ao pool em vez de serem fechadas
             limpar_memoria_se_necessario()
     
     def obter_anos_disponiveis(self) -> List[int]:
+        espelho = self._obter_espelho_queimadas()
+        if espelho is not None:
+            try:
+                anos = espelho.consultar("""
+                    SELECT DISTINCT EXTRACT(YEAR FROM datahora) AS year
+                    FROM queimadas
+                    WHERE datahora IS NOT NULL
+                    ORDER BY year
+                """)
+                return [int(ano) for ano in anos['year'].dropna()]
+            except Exception:
+                pass
+        
         engine = self.gerenciador_bd.obter_engine()
         if not engine:
             return []
@@ -174,5 +332,3 @@ class ProcessadorDados:
             
         except Exception:
             return []
-        finally:
-            self.gerenciador_bd.liberar()
@@ -1,31 +1,21 @@
 import streamlit as st
 import pandas as pd
 import geopandas as gpd
+from utilitarios.impressao_digital import HASH_FUNCS_DADOS
+from utilitarios.geometria_dupla import projetar
 
 
-@st.cache_data(ttl=3600, show_spinner=False, max_entries=10)
-def processar_dados_desmatamento(_gdf_alertas, ano_selecionado):
-    """Filtra dados de desmatamento por ano (parâmetro estado removido - filtro feito antes da chamada)"""
-    if ano_selecionado != 'Todos':
-        gdf_filtrado = _gdf_alertas[_gdf_alertas['ANODETEC'] == ano_selecionado].copy()
-    else:
-        gdf_filtrado = _gdf_alertas.copy()
-    
-    if 'AREAHA' in gdf_filtrado.columns:
-        gdf_filtrado['AREAHA'] = pd.to_numeric(gdf_filtrado['AREAHA'], errors='coerce')
-
-    return gdf_filtrado
-
-
-@st.cache_data(ttl=3600, show_spinner=False, max_entries=1)
-def calcular_ranking_municipios_desmatamento(_gdf_alertas):
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=8, hash_funcs=HASH_FUNCS_DADOS)
+def calcular_ranking_municipios_desmatamento(gdf_alertas):
     required_ranking_cols = ['ESTADO', 'MUNICIPIO', 'AREAHA', 'ANODETEC', 'BIOMA', 'VPRESSAO']
-    if not all(col in _gdf_alertas.columns for col in required_ranking_cols):
+    if not all(col in gdf_alertas.columns for col in required_ranking_cols):
         return pd.DataFrame()
     
-    _gdf_alertas['AREAHA'] = pd.to_numeric(_gdf_alertas['AREAHA'], errors='coerce')
+    # Converte numa cópia das colunas usadas, sem alterar o GeoDataFrame recebido
+    df_ranking = pd.DataFrame(gdf_alertas[required_ranking_cols])
+    df_ranking['AREAHA'] = pd.to_numeric(df_ranking['AREAHA'], errors='coerce')
     
-    ranking_municipios = _gdf_alertas.groupby(['ESTADO', 'MUNICIPIO'], observed=False).agg({
+    ranking_municipios = df_ranking.groupby(['ESTADO', 'MUNICIPIO'], observed=False).agg({
         'AREAHA': ['sum', 'count', 'mean'],
         'ANODETEC': ['min', 'max'],
         'BIOMA': lambda x: x.mode().iloc[0] if not x.empty and x.mode().size > 0 else 'N/A',
@@ -49,50 +39,41 @@ def obter_anos_disponiveis_desmatamento(_gdf_alertas):
     return ['Todos'] + sorted(_gdf_alertas['ANODETEC'].dropna().unique().tolist())
 
 
-@st.cache_data(ttl=3600, show_spinner=False, max_entries=1)
-def preprocessar_dados_desmatamento_temporal(_gdf_alertas):
-    if _gdf_alertas.empty:
-        return pd.DataFrame()
-    
-    temporal_data = _gdf_alertas.copy()
-    if 'AREAHA' in temporal_data.columns:
-        temporal_data['AREAHA'] = pd.to_numeric(temporal_data['AREAHA'], errors='coerce')
-    
-    return temporal_data
-
-
-@st.cache_data(ttl=3600, show_spinner=False, max_entries=1)
-def calcular_bounds_desmatamento(_gdf_alertas):
-    if _gdf_alertas.empty:
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=16, hash_funcs=HASH_FUNCS_DADOS)
+def calcular_bounds_desmatamento(gdf_alertas):
+    if gdf_alertas.empty:
         return None
     
     try:
-        minx, miny, maxx, maxy = _gdf_alertas.total_bounds
+        minx, miny, maxx, maxy = gdf_alertas.total_bounds
         return {'lat': (miny + maxy) / 2, 'lon': (minx + maxx) / 2, 'bounds': (minx, miny, maxx, maxy)}
     except Exception:
         return None
 
 
-@st.cache_data(ttl=3600, show_spinner=False, max_entries=1)
-def processar_intersecao_uc_desmatamento(_gdf_cnuc, _gdf_alertas):
+def processar_intersecao_uc_desmatamento(_gdf_cnuc, _gdf_alertas, indice=None):
     if _gdf_cnuc.empty or _gdf_alertas.empty:
         return pd.DataFrame()
     
-    try:
-        crs_proj = "EPSG:31983"
-        
-        # Converter apenas se necessário para otimizar performance
-        if _gdf_cnuc.crs != crs_proj:
-            gdf_cnuc_proj = _gdf_cnuc.to_crs(crs_proj)
-        else:
-            gdf_cnuc_proj = _gdf_cnuc
+    if indice is not None and indice.cobre(_gdf_alertas, _gdf_cnuc):
+        try:
+            stats_per_uc = indice.agregar_por_uc(_gdf_alertas, _gdf_cnuc)
+            if stats_per_uc.empty:
+                return pd.DataFrame()
             
-        if _gdf_alertas.crs != crs_proj:
-            gdf_alertas_proj = _gdf_alertas.to_crs(crs_proj)
-        else:
-            gdf_alertas_proj = _gdf_alertas
-        
-        alerts_in_ucs = gpd.sjoin(gdf_alertas_proj, gdf_cnuc_proj, how="inner", predicate="intersects")
+            alert_area_per_uc = stats_per_uc[['nome_uc', 'AREAHA']].rename(columns={'AREAHA': 'alerta_ha_total'})
+            return alert_area_per_uc.sort_values('alerta_ha_total', ascending=False)
+        except Exception:
+            pass
+    
+    return _processar_intersecao_uc_desmatamento_sjoin(_gdf_cnuc, _gdf_alertas)
+
+
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=8, hash_funcs=HASH_FUNCS_DADOS)
+def _processar_intersecao_uc_desmatamento_sjoin(gdf_cnuc, gdf_alertas):
+    try:
+        # Geometria projetada materializada na carga das camadas, sem reprojetar a cada chamada
+        alerts_in_ucs = gpd.sjoin(projetar(gdf_alertas), projetar(gdf_cnuc), how="inner", predicate="intersects")
         
         if alerts_in_ucs.empty:
             return pd.DataFrame()
@@ -106,40 +87,42 @@ def processar_intersecao_uc_desmatamento(_gdf_cnuc, _gdf_alertas):
         return pd.DataFrame()
 
 
-def atualizar_alertas_em_ucs(_gdf_cnuc, _gdf_alertas):
+def _estatisticas_alertas_por_uc(_gdf_cnuc, _gdf_alertas, indice=None):
+    if indice is not None and indice.cobre(_gdf_alertas, _gdf_cnuc):
+        try:
+            stats_per_uc = indice.agregar_por_uc(_gdf_alertas, _gdf_cnuc)
+            return stats_per_uc[['nome_uc', 'AREAHA', 'contagem']].rename(
+                columns={'AREAHA': 'alerta_ha_dinamico', 'contagem': 'c_alertas_dinamico'}
+            )
+        except Exception:
+            pass
+    
+    # Realizar intersecção sobre a geometria projetada já materializada nas camadas
+    alerts_in_ucs = gpd.sjoin(projetar(_gdf_alertas), projetar(_gdf_cnuc), how="inner", predicate="intersects")
+    
+    if alerts_in_ucs.empty:
+        return pd.DataFrame(columns=['nome_uc', 'alerta_ha_dinamico', 'c_alertas_dinamico'])
+    
+    # Calcular área e contagem de alertas por UC
+    stats_per_uc = alerts_in_ucs.groupby('nome_uc', observed=False).agg({
+        'AREAHA': 'sum',
+        'geometry': 'count'
+    }).reset_index()
+    stats_per_uc.columns = ['nome_uc', 'alerta_ha_dinamico', 'c_alertas_dinamico']
+    return stats_per_uc
+
+
+def atualizar_alertas_em_ucs(_gdf_cnuc, _gdf_alertas, indice=None):
     """Atualiza valores de alertas (área e contagem) nas UCs com base nos alertas filtrados"""
     if _gdf_cnuc.empty or _gdf_alertas.empty:
         return _gdf_cnuc
     
     try:
-        crs_proj = "EPSG:31983"
-        
-        # Converter para CRS projetado
-        if _gdf_cnuc.crs != crs_proj:
-            gdf_cnuc_proj = _gdf_cnuc.to_crs(crs_proj)
-        else:
-            gdf_cnuc_proj = _gdf_cnuc.copy()
-            
-        if _gdf_alertas.crs != crs_proj:
-            gdf_alertas_proj = _gdf_alertas.to_crs(crs_proj)
-        else:
-            gdf_alertas_proj = _gdf_alertas.copy()
-        
-        # Realizar intersecção
-        alerts_in_ucs = gpd.sjoin(gdf_alertas_proj, gdf_cnuc_proj, how="inner", predicate="intersects")
-        
-        if alerts_in_ucs.empty:
-            # Se não há intersecção, zerar alertas
-            _gdf_cnuc['alerta_ha'] = 0
-            _gdf_cnuc['c_alertas'] = 0
-            return _gdf_cnuc
+        stats_per_uc = _estatisticas_alertas_por_uc(_gdf_cnuc, _gdf_alertas, indice)
         
-        # Calcular área e contagem de alertas por UC
-        stats_per_uc = alerts_in_ucs.groupby('nome_uc', observed=False).agg({
-            'AREAHA': 'sum',
-            'geometry': 'count'
-        }).reset_index()
-        stats_per_uc.columns = ['nome_uc', 'alerta_ha_dinamico', 'c_alertas_dinamico']
+        if stats_per_uc.empty:
+            # Se não há intersecção, zerar alertas (sem alterar a camada recebida)
+            return _gdf_cnuc.assign(alerta_ha=0, c_alertas=0)
         
         # Merge com gdf_cnuc original
         gdf_cnuc_atualizado = _gdf_cnuc.merge(
@@ -0,0 +1,300 @@
+import os
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+import streamlit as st
+from typing import Optional
+from configuracoes.config import DIRETORIO_CACHE_INCIDENCIA, TAMANHO_LOTE_FOCOS
+from utilitarios.impressao_digital import impressao_digital_gdf
+from utilitarios.geometria_dupla import geometria_projetada
+
+def consultar_pares_intersecao(geom_esquerda: gpd.GeoSeries, geom_direita: gpd.GeoSeries) -> np.ndarray:
+    # Uma única consulta em lote na STRtree: o custo acompanha o número de pares candidatos
+    return geom_direita.sindex.query(geom_esquerda, predicate='intersects')
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _agregar_car_por_uc(impressao_ucs: str, impressao_car: str,
+                        _gdf_ucs: gpd.GeoDataFrame, _gdf_car: gpd.GeoDataFrame) -> pd.DataFrame:
+    pos_uc, pos_car = consultar_pares_intersecao(geometria_projetada(_gdf_ucs), geometria_projetada(_gdf_car))
+
+    pares = pd.DataFrame({
+        'pos_uc': pos_uc,
+        'num_area': _gdf_car['num_area'].to_numpy()[pos_car]
+    })
+    return pares.groupby('pos_uc').agg(
+        area_car_ha=('num_area', 'sum'),
+        contagem_car=('num_area', 'size')
+    )
+
+def atualizar_car_em_ucs(gdf_ucs: gpd.GeoDataFrame, gdf_car: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    if gdf_ucs.empty or gdf_car.empty or 'nome_uc' not in gdf_ucs.columns:
+        return gdf_ucs
+
+    agregado = _agregar_car_por_uc(
+        impressao_digital_gdf(gdf_ucs, geometria=True), impressao_digital_gdf(gdf_car, geometria=True), gdf_ucs, gdf_car
+    )
+
+    gdf_ucs = gdf_ucs.copy()
+    for col in ['sigef_km2', 'c_sigef']:
+        if col not in gdf_ucs.columns:
+            gdf_ucs[col] = np.nan
+
+    com_nome = gdf_ucs['nome_uc'].notna().to_numpy()
+    agregado = agregado[com_nome[agregado.index.to_numpy()]]
+    if agregado.empty:
+        return gdf_ucs
+
+    posicoes = agregado.index.to_numpy()
+    gdf_ucs.iloc[posicoes, gdf_ucs.columns.get_loc('sigef_km2')] = agregado['area_car_ha'].to_numpy() / 100
+    gdf_ucs.iloc[posicoes, gdf_ucs.columns.get_loc('c_sigef')] = agregado['contagem_car'].to_numpy()
+    return gdf_ucs
+
+def _geometrias_validas(geometrias: np.ndarray) -> np.ndarray:
+    invalidas = ~shapely.is_valid(geometrias) & ~shapely.is_missing(geometrias)
+    if invalidas.any():
+        geometrias = geometrias.copy()
+        geometrias[invalidas] = shapely.make_valid(geometrias[invalidas])
+    return geometrias
+
+def _areas_intersecao(geom_esquerda: np.ndarray, geom_direita: np.ndarray) -> np.ndarray:
+    # Feições inteiramente dentro da geometria da esquerda contribuem com a própria área; só os
+    # pares que cruzam a borda precisam da intersecção, que é cara em UCs com muitos vértices
+    shapely.prepare(geom_esquerda)
+    dentro = shapely.contains_properly(geom_esquerda, geom_direita)
+    areas = shapely.area(geom_direita)
+    borda = ~dentro
+    areas[borda] = shapely.area(shapely.intersection(geom_esquerda[borda], geom_direita[borda]))
+    return areas
+
+def calcular_sobreposicao_por_uc(gdf_ucs: gpd.GeoDataFrame, gdf_camada: gpd.GeoDataFrame) -> pd.DataFrame:
+    # As camadas já trazem a geometria projetada; as áreas saem de intersection/area vetorizados
+    # sobre os pares candidatos alinhados, e a agregação por UC é um único groupby
+    resultado = pd.DataFrame({'area_ha': 0.0, 'quantidade': 0}, index=pd.RangeIndex(len(gdf_ucs)))
+    if gdf_ucs.empty or gdf_camada.empty:
+        return resultado
+
+    geom_ucs = _geometrias_validas(np.asarray(geometria_projetada(gdf_ucs).values))
+    geom_camada = _geometrias_validas(np.asarray(geometria_projetada(gdf_camada).values))
+
+    arvore = shapely.STRtree(geom_camada)
+    pos_uc, pos_camada = arvore.query(geom_ucs, predicate='intersects')
+    if len(pos_uc) == 0:
+        return resultado
+
+    areas = _areas_intersecao(geom_ucs[pos_uc], geom_camada[pos_camada])
+    pares = pd.DataFrame({'pos_uc': pos_uc, 'area_ha': areas / 10000})
+    agregado = pares.groupby('pos_uc').agg(area_ha=('area_ha', 'sum'), quantidade=('area_ha', 'size'))
+
+    resultado.loc[agregado.index, 'area_ha'] = agregado['area_ha'].to_numpy()
+    resultado.loc[agregado.index, 'quantidade'] = agregado['quantidade'].to_numpy()
+    return resultado
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _sobreposicao_por_uc_cache(impressao_ucs: str, impressao_camada: str,
+                               _gdf_ucs: gpd.GeoDataFrame, _gdf_camada: gpd.GeoDataFrame) -> pd.DataFrame:
+    return calcular_sobreposicao_por_uc(_gdf_ucs, _gdf_camada)
+
+def obter_sobreposicao_por_uc(gdf_ucs: gpd.GeoDataFrame, gdf_camada: gpd.GeoDataFrame) -> pd.DataFrame:
+    return _sobreposicao_por_uc_cache(
+        impressao_digital_gdf(gdf_ucs, geometria=True), impressao_digital_gdf(gdf_camada, geometria=True), gdf_ucs, gdf_camada
+    )
+
+class AtribuicaoFocos:
+    
+    # Pares (foco, UC) em que o ponto intersecta o polígono, testados em coordenadas nativas;
+    # pos_foco indexa as linhas da base de focos e codigo_uc as linhas da camada de UCs.
+    # Recortes da base (estado, ano, coordenadas válidas) viram máscaras sobre os pares
+    def __init__(self, pos_foco: np.ndarray, codigo_uc: np.ndarray, rotulos_focos: np.ndarray,
+                 longitude: np.ndarray, latitude: np.ndarray, rotulos_ucs: np.ndarray):
+        self.pos_foco = pos_foco
+        self.codigo_uc = codigo_uc
+        self.rotulos_focos = pd.Index(rotulos_focos)
+        self.longitude = longitude
+        self.latitude = latitude
+        self.rotulos_ucs = pd.Index(rotulos_ucs)
+    
+    @classmethod
+    def construir(cls, df_focos: pd.DataFrame, gdf_ucs: gpd.GeoDataFrame) -> 'AtribuicaoFocos':
+        geom_ucs = _geometrias_validas(np.asarray(gdf_ucs.geometry.values))
+        arvore = shapely.STRtree(geom_ucs)
+        shapely.prepare(geom_ucs)
+        
+        longitude = df_focos['Longitude'].to_numpy(dtype='float64', na_value=np.nan)
+        latitude = df_focos['Latitude'].to_numpy(dtype='float64', na_value=np.nan)
+        
+        # Em lotes: só TAMANHO_LOTE_FOCOS pontos existem como geometria de cada vez
+        lotes_focos, lotes_ucs = [], []
+        for inicio in range(0, len(longitude), TAMANHO_LOTE_FOCOS):
+            x = longitude[inicio:inicio + TAMANHO_LOTE_FOCOS]
+            y = latitude[inicio:inicio + TAMANHO_LOTE_FOCOS]
+            pos_foco, codigo_uc = arvore.query(shapely.points(x, y))
+            
+            # Teste exato só nos candidatos da STRtree, com as UCs preparadas e sem criar pontos
+            dentro = shapely.intersects_xy(geom_ucs[codigo_uc], x[pos_foco], y[pos_foco])
+            lotes_focos.append(pos_foco[dentro] + inicio)
+            lotes_ucs.append(codigo_uc[dentro])
+        
+        pos_foco = np.concatenate(lotes_focos) if lotes_focos else np.empty(0, dtype=np.intp)
+        codigo_uc = np.concatenate(lotes_ucs) if lotes_ucs else np.empty(0, dtype=np.intp)
+        ordem = np.lexsort((codigo_uc, pos_foco))
+        
+        return cls(
+            pos_foco[ordem],
+            codigo_uc[ordem].astype(np.int32),
+            df_focos.index.to_numpy(),
+            longitude.astype(np.float32),
+            latitude.astype(np.float32),
+            gdf_ucs.index.to_numpy()
+        )
+    
+    def posicoes(self, df_focos: pd.DataFrame, gdf_ucs: gpd.GeoDataFrame) -> Optional[np.ndarray]:
+        """Posições das linhas de df_focos na base, ou None se o recorte não vier desta base"""
+        if (not gdf_ucs.index.equals(self.rotulos_ucs) or not self.rotulos_focos.is_unique
+                or not df_focos.index.is_unique):
+            return None
+        posicoes = self.rotulos_focos.get_indexer(df_focos.index)
+        if (posicoes < 0).any():
+            return None
+        # Rótulos iguais não bastam: um quadro recarregado reaproveita o RangeIndex com outros pontos
+        mesmas_coordenadas = (
+            np.array_equal(self.longitude[posicoes], df_focos['Longitude'].to_numpy(dtype='float32', na_value=np.nan), equal_nan=True)
+            and np.array_equal(self.latitude[posicoes], df_focos['Latitude'].to_numpy(dtype='float32', na_value=np.nan), equal_nan=True)
+        )
+        return posicoes if mesmas_coordenadas else None
+    
+    def contar(self, posicoes: np.ndarray, gdf_ucs: gpd.GeoDataFrame) -> tuple:
+        # Mesma semântica do sjoin + groupby('nome_uc'): um foco em UCs sobrepostas conta uma vez em cada
+        selecionados = np.zeros(len(self.rotulos_focos), dtype=bool)
+        selecionados[posicoes] = True
+        codigos = self.codigo_uc[selecionados[self.pos_foco]]
+        
+        nomes = gdf_ucs['nome_uc'].iloc[codigos].reset_index(drop=True)
+        focos_por_uc = nomes.groupby(nomes, observed=False).size().reset_index(name='quantidade_focos')
+        return len(codigos), focos_por_uc
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _atribuicao_focos_cache(impressao_focos: str, impressao_ucs: str,
+                            _df_focos: pd.DataFrame, _gdf_ucs: gpd.GeoDataFrame) -> AtribuicaoFocos:
+    return AtribuicaoFocos.construir(_df_focos, _gdf_ucs)
+
+def obter_atribuicao_focos(df_focos: pd.DataFrame, gdf_ucs: gpd.GeoDataFrame) -> AtribuicaoFocos:
+    # Uma atribuição por versão da base de focos (impressão das coordenadas) e da camada de UCs
+    return _atribuicao_focos_cache(
+        impressao_digital_gdf(df_focos, colunas=['Latitude', 'Longitude']), impressao_digital_gdf(gdf_ucs, geometria=True),
+        df_focos, gdf_ucs
+    )
+
+def obter_focos_por_uc(df_focos: pd.DataFrame, gdf_ucs: gpd.GeoDataFrame,
+                       atribuicao: Optional[AtribuicaoFocos] = None) -> tuple:
+    # Pares (foco, UC) que se intersectam e a contagem por UC; df_focos pode ser um recorte
+    # da base com que a atribuição foi construída, senão uma atribuição própria é montada
+    if df_focos.empty or gdf_ucs.empty:
+        return 0, pd.DataFrame(columns=['nome_uc', 'quantidade_focos'])
+    
+    posicoes = atribuicao.posicoes(df_focos, gdf_ucs) if atribuicao is not None else None
+    if posicoes is None:
+        atribuicao = obter_atribuicao_focos(df_focos, gdf_ucs)
+        posicoes = np.arange(len(df_focos))
+    return atribuicao.contar(posicoes, gdf_ucs)
+
+class IndiceIncidencia:
+    
+    # Pares (alerta, UC) que se intersectam, em arrays colunares indexados pelos rótulos
+    # das camadas completas; filtros de estado/ano/tipo viram máscaras sobre esses arrays
+    def __init__(self, rotulo_alerta: np.ndarray, rotulo_uc: np.ndarray, intersecao_ha: np.ndarray,
+                 rotulos_alertas_base: np.ndarray, rotulos_ucs_base: np.ndarray):
+        self.rotulo_alerta = rotulo_alerta
+        self.rotulo_uc = rotulo_uc
+        self.intersecao_ha = intersecao_ha
+        self.rotulos_alertas_base = pd.Index(rotulos_alertas_base)
+        self.rotulos_ucs_base = pd.Index(rotulos_ucs_base)
+    
+    @classmethod
+    def construir(cls, gdf_alertas: gpd.GeoDataFrame, gdf_ucs: gpd.GeoDataFrame) -> 'IndiceIncidencia':
+        geom_alertas = _geometrias_validas(np.asarray(geometria_projetada(gdf_alertas).values))
+        geom_ucs = _geometrias_validas(np.asarray(geometria_projetada(gdf_ucs).values))
+        
+        pos_uc, pos_alerta = shapely.STRtree(geom_alertas).query(geom_ucs, predicate='intersects')
+        ordem = np.lexsort((pos_uc, pos_alerta))
+        pos_uc, pos_alerta = pos_uc[ordem], pos_alerta[ordem]
+        
+        intersecao_ha = _areas_intersecao(geom_ucs[pos_uc], geom_alertas[pos_alerta]) / 10000
+        
+        return cls(
+            gdf_alertas.index.to_numpy()[pos_alerta],
+            gdf_ucs.index.to_numpy()[pos_uc],
+            intersecao_ha,
+            gdf_alertas.index.to_numpy(),
+            gdf_ucs.index.to_numpy()
+        )
+    
+    def salvar(self, caminho: str) -> None:
+        np.savez_compressed(
+            caminho,
+            rotulo_alerta=self.rotulo_alerta,
+            rotulo_uc=self.rotulo_uc,
+            intersecao_ha=self.intersecao_ha,
+            rotulos_alertas_base=self.rotulos_alertas_base.to_numpy(),
+            rotulos_ucs_base=self.rotulos_ucs_base.to_numpy()
+        )
+    
+    @classmethod
+    def carregar(cls, caminho: str) -> 'IndiceIncidencia':
+        with np.load(caminho, allow_pickle=False) as dados:
+            return cls(dados['rotulo_alerta'], dados['rotulo_uc'], dados['intersecao_ha'],
+                       dados['rotulos_alertas_base'], dados['rotulos_ucs_base'])
+    
+    def cobre(self, gdf_alertas: gpd.GeoDataFrame, gdf_ucs: gpd.GeoDataFrame) -> bool:
+        return bool(gdf_alertas.index.isin(self.rotulos_alertas_base).all()
+                    and gdf_ucs.index.isin(self.rotulos_ucs_base).all())
+    
+    def pares(self, gdf_alertas: gpd.GeoDataFrame, gdf_ucs: gpd.GeoDataFrame) -> pd.DataFrame:
+        mascara = np.isin(self.rotulo_alerta, gdf_alertas.index.to_numpy()) & np.isin(self.rotulo_uc, gdf_ucs.index.to_numpy())
+        return pd.DataFrame({
+            'pos_alerta': gdf_alertas.index.get_indexer(self.rotulo_alerta[mascara]),
+            'pos_uc': gdf_ucs.index.get_indexer(self.rotulo_uc[mascara]),
+            'intersecao_ha': self.intersecao_ha[mascara]
+        })
+    
+    def agregar_por_uc(self, gdf_alertas: gpd.GeoDataFrame, gdf_ucs: gpd.GeoDataFrame) -> pd.DataFrame:
+        # Mesma semântica do sjoin + groupby('nome_uc'): soma do AREAHA dos alertas e contagem de pares
+        pares = self.pares(gdf_alertas, gdf_ucs)
+        if pares.empty:
+            return pd.DataFrame(columns=['nome_uc', 'AREAHA', 'contagem', 'intersecao_ha'])
+        
+        pares['nome_uc'] = gdf_ucs['nome_uc'].to_numpy()[pares['pos_uc'].to_numpy()]
+        pares['AREAHA'] = pd.to_numeric(gdf_alertas['AREAHA'], errors='coerce').to_numpy()[pares['pos_alerta'].to_numpy()]
+        return pares.groupby('nome_uc').agg(
+            AREAHA=('AREAHA', 'sum'),
+            contagem=('AREAHA', 'size'),
+            intersecao_ha=('intersecao_ha', 'sum')
+        ).reset_index()
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _indice_incidencia_cache(impressao_alertas: str, impressao_ucs: str,
+                             _gdf_alertas: gpd.GeoDataFrame, _gdf_ucs: gpd.GeoDataFrame) -> IndiceIncidencia:
+    caminho = os.path.join(DIRETORIO_CACHE_INCIDENCIA, f"{impressao_alertas}-{impressao_ucs}.npz")
+    if os.path.exists(caminho):
+        try:
+            return IndiceIncidencia.carregar(caminho)
+        except Exception:
+            pass
+    
+    indice = IndiceIncidencia.construir(_gdf_alertas, _gdf_ucs)
+    try:
+        os.makedirs(DIRETORIO_CACHE_INCIDENCIA, exist_ok=True)
+        indice.salvar(caminho)
+    except Exception:
+        pass
+    return indice
+
+def obter_indice_incidencia(gdf_alertas: gpd.GeoDataFrame, gdf_ucs: gpd.GeoDataFrame) -> Optional[IndiceIncidencia]:
+    if gdf_alertas.empty or gdf_ucs.empty or not gdf_alertas.index.is_unique or not gdf_ucs.index.is_unique:
+        return None
+    try:
+        return _indice_incidencia_cache(
+            impressao_digital_gdf(gdf_alertas, geometria=True), impressao_digital_gdf(gdf_ucs, geometria=True), gdf_alertas, gdf_ucs
+        )
+    except Exception:
+        return None
@@ -1,66 +1,127 @@
 import gc
+import logging
 import pandas as pd
-from typing import List, Tuple
-from configuracoes.config import TAMANHO_CHUNK
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import text
+from processadores.processador_dados import ProcessadorDados
+from configuracoes.config import CONFIGURACAO_BD, TAMANHO_CHUNK
 
-class ProcessadorRanking:
+logger = logging.getLogger(__name__)
+
+class AgregadorRanking:
     
-    @staticmethod
-    def _processar_agregacao_chunk(chunk: pd.DataFrame, tema: str) -> pd.DataFrame:
-        chunk_limpo = chunk.dropna(subset=['mun_corrigido']).copy()
+    # Estado combinável por município: a média é derivada de soma/contagem no final,
+    # evitando a média de médias quando os chunks têm tamanhos diferentes
+    _COMBINACAO_ESTADO = {
+        'count': 'sum',
+        'sum': 'sum',
+        'min': 'min',
+        'max': 'max',
+        'datahora_min': 'min',
+        'datahora_max': 'max'
+    }
+    
+    def __init__(self, configuracao: Dict[str, List[str]]):
+        self.configuracao = configuracao
+        self.coluna = next(col for col in configuracao if col != 'DataHora')
+        self._estado: Optional[pd.DataFrame] = None
+        self._tipo_origem = None
+    
+    def atualizar(self, chunk: pd.DataFrame) -> None:
+        chunk_limpo = chunk.dropna(subset=['mun_corrigido'])
+        if chunk_limpo.empty:
+            return
         
-        configs_agregacao = {
-            "Maior Risco de Fogo": {
-                'RiscoFogo': ['mean', 'max', 'count'],
-                'DataHora': ['min', 'max']
-            },
-            "Maior Precipitação (evento)": {
-                'Precipitacao': ['mean', 'max', 'sum', 'count'],
-                'DataHora': ['min', 'max']
-            },
-            "Máx. Dias Sem Chuva": {
-                'DiaSemChuva': ['mean', 'max', 'count'],
-                'DataHora': ['min', 'max']
-            }
-        }
+        if self._tipo_origem is None:
+            self._tipo_origem = chunk_limpo[self.coluna].dtype
         
-        if tema in configs_agregacao:
-            return chunk_limpo.groupby('mun_corrigido', observed=True).agg(configs_agregacao[tema])
+        valores = chunk_limpo[self.coluna].astype('float64')
+        parcial = valores.groupby(chunk_limpo['mun_corrigido'], observed=True).agg(['count', 'sum', 'min', 'max'])
+        datas = chunk_limpo['DataHora'].groupby(chunk_limpo['mun_corrigido'], observed=True).agg(['min', 'max'])
+        parcial['datahora_min'] = datas['min']
+        parcial['datahora_max'] = datas['max']
+        parcial.index = parcial.index.astype(object)
         
-        return pd.DataFrame()
+        if self._estado is None:
+            self._estado = parcial
+        else:
+            self._estado = pd.concat([self._estado, parcial]).groupby(level=0).agg(self._COMBINACAO_ESTADO)
     
-    @staticmethod
-    def _combinar_resultados_chunks(resultados: List[pd.DataFrame], tema: str) -> pd.DataFrame:
-        if not resultados:
+    def consumir(self, chunks: Iterable[pd.DataFrame]) -> 'AgregadorRanking':
+        for chunk in chunks:
+            self.atualizar(chunk)
+        return self
+    
+    def _converter_tipo(self, serie: pd.Series, funcao: str) -> pd.Series:
+        if funcao == 'count':
+            return serie.astype('int64')
+        if pd.api.types.is_float_dtype(self._tipo_origem):
+            return serie.astype(self._tipo_origem)
+        if funcao in ('min', 'max'):
+            return serie.astype(self._tipo_origem)
+        if funcao == 'sum':
+            return serie.astype('int64')
+        return serie
+    
+    def resultado(self) -> pd.DataFrame:
+        if self._estado is None or self._estado.empty:
             return pd.DataFrame()
         
-        configs_combinacao = {
-            "Maior Risco de Fogo": {
-                ('RiscoFogo', 'mean'): 'mean',
-                ('RiscoFogo', 'max'): 'max',
-                ('RiscoFogo', 'count'): 'sum',
-                ('DataHora', 'min'): 'min',
-                ('DataHora', 'max'): 'max'
-            },
-            "Maior Precipitação (evento)": {
-                ('Precipitacao', 'mean'): 'mean',
-                ('Precipitacao', 'max'): 'max',
-                ('Precipitacao', 'sum'): 'sum',
-                ('Precipitacao', 'count'): 'sum',
-                ('DataHora', 'min'): 'min',
-                ('DataHora', 'max'): 'max'
-            },
-            "Máx. Dias Sem Chuva": {
-                ('DiaSemChuva', 'mean'): 'mean',
-                ('DiaSemChuva', 'max'): 'max',
-                ('DiaSemChuva', 'count'): 'sum',
-                ('DataHora', 'min'): 'min',
-                ('DataHora', 'max'): 'max'
-            }
+        estado = self._estado.sort_index()
+        colunas = {}
+        for funcao in self.configuracao[self.coluna]:
+            if funcao == 'mean':
+                serie = estado['sum'] / estado['count'].where(estado['count'] > 0)
+            else:
+                serie = estado[funcao]
+            colunas[(self.coluna, funcao)] = self._converter_tipo(serie, funcao)
+        for funcao in self.configuracao['DataHora']:
+            colunas[('DataHora', funcao)] = estado[f'datahora_{funcao}']
+        
+        df_agregado = pd.DataFrame(colunas)
+        df_agregado.index = pd.CategoricalIndex(estado.index, name='mun_corrigido')
+        return df_agregado
+
+
+class ProcessadorRanking:
+    
+    _CONFIGS_AGREGACAO = {
+        "Maior Risco de Fogo": {
+            'RiscoFogo': ['mean', 'max', 'count'],
+            'DataHora': ['min', 'max']
+        },
+        "Maior Precipitação (evento)": {
+            'Precipitacao': ['mean', 'max', 'sum', 'count'],
+            'DataHora': ['min', 'max']
+        },
+        "Máx. Dias Sem Chuva": {
+            'DiaSemChuva': ['mean', 'max', 'count'],
+            'DataHora': ['min', 'max']
         }
+    }
+    
+    _FUNCOES_SQL = {
+        'mean': 'AVG',
+        'max': 'MAX',
+        'min': 'MIN',
+        'sum': 'SUM',
+        'count': 'COUNT'
+    }
+    
+    _COLUNAS_SQL = {
+        'RiscoFogo': 'riscofogo',
+        'Precipitacao': 'precipitacao',
+        'DiaSemChuva': 'diasemchuva',
+        'DataHora': 'datahora'
+    }
+    
+    @staticmethod
+    def _processar_agregacao_chunk(chunk: pd.DataFrame, tema: str) -> pd.DataFrame:
+        chunk_limpo = chunk.dropna(subset=['mun_corrigido']).copy()
+        configs_agregacao = ProcessadorRanking._CONFIGS_AGREGACAO
         
-        if tema in configs_combinacao:
-            return pd.concat(resultados).groupby(level=0, observed=True).agg(configs_combinacao[tema])
+        if tema in configs_agregacao:
+            return chunk_limpo.groupby('mun_corrigido', observed=True).agg(configs_agregacao[tema])
         
         return pd.DataFrame()
     
@@ -141,20 +202,13 @@ class ProcessadorRanking:
         
         try:
             if len(df) > TAMANHO_CHUNK:
-                chunks = [df[i:i + TAMANHO_CHUNK] for i in range(0, len(df), TAMANHO_CHUNK)]
-                resultados = []
+                if tema not in self._CONFIGS_AGREGACAO:
+                    return pd.DataFrame(), ''
                 
-                for chunk in chunks:
-                    resultado_chunk = self._processar_agregacao_chunk(chunk, tema)
-                    if not resultado_chunk.empty:
-                        resultados.append(resultado_chunk)
-                    
-                    del chunk
-                    gc.collect()
-                
-                df_agregado = self._combinar_resultados_chunks(resultados, tema)
-                del resultados
-                gc.collect()
+                agregador = AgregadorRanking(self._CONFIGS_AGREGACAO[tema])
+                agregador.consumir(df[i:i + TAMANHO_CHUNK] for i in range(0, len(df), TAMANHO_CHUNK))
+                df_agregado = agregador.resultado()
+                del agregador
             else:
                 df_agregado = self._processar_agregacao_chunk(df, tema)
             
@@ -167,3 +221,107 @@ class ProcessadorRanking:
             
         except Exception:
             return pd.DataFrame(), ''
+    
+    def _construir_consulta_ranking(self, tema: str, clausula_where: str) -> Tuple[str, List[Tuple[str, str]]]:
+        colunas = []
+        expressoes = []
+        for coluna, funcoes in self._CONFIGS_AGREGACAO[tema].items():
+            for funcao in funcoes:
+                alias = f"{self._COLUNAS_SQL[coluna]}_{funcao}"
+                expressoes.append(f"{self._FUNCOES_SQL[funcao]}({self._COLUNAS_SQL[coluna]}) AS {alias}")
+                colunas.append((coluna, funcao))
+        
+        consulta = f"""
+            SELECT
+                municipio,
+                {', '.join(expressoes)}
+            FROM "{CONFIGURACAO_BD['schema']}"."{CONFIGURACAO_BD['table']}"
+            WHERE {clausula_where}
+            AND municipio IS NOT NULL
+            AND datahora IS NOT NULL
+            GROUP BY municipio
+            ORDER BY municipio
+        """
+        return consulta, colunas
+    
+    @staticmethod
+    def _ajustar_tipos_agregado(df_agregado: pd.DataFrame) -> pd.DataFrame:
+        # Reproduz os tipos que o groupby gera sobre os dados otimizados pelo ProcessadorDados,
+        # para que o arredondamento e o ranking fiquem idênticos aos do caminho em pandas
+        for coluna, funcao in df_agregado.columns:
+            serie = df_agregado[(coluna, funcao)]
+            if coluna == 'DataHora':
+                df_agregado[(coluna, funcao)] = pd.to_datetime(serie)
+                continue
+            if funcao == 'count':
+                df_agregado[(coluna, funcao)] = serie.astype('int64')
+                continue
+            # O psycopg2 devolve AVG (e SUM de inteiros) como Decimal: em object o round() não atua
+            serie = serie.astype('float64')
+            if coluna in ('RiscoFogo', 'Precipitacao'):
+                serie = serie.astype('float32')
+            elif funcao in ('max', 'min'):
+                serie = pd.to_numeric(serie, downcast='integer')
+            df_agregado[(coluna, funcao)] = serie
+        return df_agregado
+    
+    def _agregar_no_banco(self, tema: str, ano: Optional[int] = None) -> Optional[pd.DataFrame]:
+        processador = ProcessadorDados()
+        engine = processador.gerenciador_bd.obter_engine()
+        if not engine:
+            return None
+        
+        clausula_where, parametros = processador._construir_clausula_where(ano)
+        consulta, colunas = self._construir_consulta_ranking(tema, clausula_where)
+        
+        with engine.connect() as conn:
+            df_agregado = pd.read_sql(text(consulta), conn, params=parametros, index_col='municipio')
+        
+        df_agregado.columns = pd.MultiIndex.from_tuples(colunas)
+        df_agregado.index = df_agregado.index.astype('category')
+        df_agregado.index.name = 'mun_corrigido'
+        return self._ajustar_tipos_agregado(df_agregado)
+    
+    def processar_ranking_sql(self, tema: str, periodo: str, ano: Optional[int] = None,
+                              df_fallback: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, str]:
+        if tema not in self._CONFIGS_AGREGACAO:
+            return pd.DataFrame(), ''
+        
+        try:
+            df_agregado = self._agregar_no_banco(tema, ano)
+        except Exception:
+            df_agregado = None
+        
+        if df_agregado is None:
+            # Sem a agregação no banco, a tabela completa passa em chunks pelo agregador (espelho DuckDB
+            # ou cursor); a base em memória do painel é uma amostra e fica como último recurso
+            df_rank, col_ordem = self.processar_ranking_streaming(tema, periodo, ano)
+            if not df_rank.empty:
+                return df_rank, col_ordem
+            return self.processar_ranking(df_fallback, tema, periodo)
+        
+        try:
+            return self._formatar_resultado_ranking(df_agregado, tema)
+        except Exception:
+            return pd.DataFrame(), ''
+    
+    def processar_ranking_streaming(self, tema: str, periodo: str, ano: Optional[int] = None) -> Tuple[pd.DataFrame, str]:
+        if tema not in self._CONFIGS_AGREGACAO:
+            return pd.DataFrame(), ''
+        
+        try:
+            agregador = AgregadorRanking(self._CONFIGS_AGREGACAO[tema])
+            agregador.consumir(ProcessadorDados().iterar_dados_inpe(ano))
+            df_agregado = agregador.resultado()
+            
+            df_rank, col_ordem = self._formatar_resultado_ranking(df_agregado, tema)
+            
+            del agregador, df_agregado
+            gc.collect()
+            
+            return df_rank, col_ordem
+            
+        except Exception:
+            # Inclui a leitura interrompida por falta de memória: um agregado parcial nunca é devolvido
+            logger.error("Ranking em streaming indisponível (%s, ano=%s)", tema, ano, exc_info=True)
+            return pd.DataFrame(), ''
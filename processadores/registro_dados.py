@@ -0,0 +1,429 @@
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from configuracoes.config import COLUNAS_CNUC, COLUNAS_SIGEF, VALIDADE_REGISTRO_DADOS, VERIFICAR_IMUTABILIDADE
+from utilitarios.shapefile import carregar_shapefile, carregar_shapefile_cloud_seguro, carregar_car_postgres, preparar_hectares
+from processadores.processador_alertas import AlertasParticionados, carregar_todos_alertas
+from processadores.normalizador_estados import mapear_unicos, normalizar_estado, normalizar_serie_estados
+from processadores.processador_espacial import atualizar_car_em_ucs, obter_indice_incidencia
+from utilitarios.carga_paralela import criar_executor, trabalhadores_disponiveis
+from utilitarios.impressao_digital import CHAVE_VERSAO_DADOS, definir_versao_dados, impressao_digital_gdf
+from utilitarios.geometria_dupla import adicionar_geometria_projetada
+from utilitarios.camadas_mapa import PiramideGeometrias
+
+logger = logging.getLogger(__name__)
+
+class Camada:
+
+    # Uma camada lida de arquivo (caminho + colunas) ou derivada das dependências,
+    # seguida das etapas de normalização aplicadas em ordem. Com alternativa, uma falha
+    # na materialização vira aviso do registro e a alternativa fornece o resultado
+    def __init__(self, nome: str, leitor: Callable, caminho: Optional[str] = None,
+                 colunas: Optional[List[str]] = None, normalizacao: Sequence[Callable] = (),
+                 dependencias: Sequence[str] = (), alternativa: Optional[Callable] = None):
+        self.nome = nome
+        self.leitor = leitor
+        self.caminho = caminho
+        self.colunas = colunas
+        self.normalizacao = tuple(normalizacao)
+        self.dependencias = tuple(dependencias)
+        self.alternativa = alternativa
+
+    def materializar(self, entradas: list) -> Any:
+        if self.caminho is not None:
+            dados = self.leitor(self.caminho, self.colunas)
+        else:
+            dados = self.leitor(*entradas)
+        for etapa in self.normalizacao:
+            dados = etapa(dados)
+        return dados
+
+def _assinatura(dados: Any) -> Optional[tuple]:
+    # Estrutura (sempre) e impressão digital do conteúdo (modo estrito) de uma camada tabular
+    if not isinstance(dados, pd.DataFrame):
+        return None
+    impressao = None
+    if VERIFICAR_IMUTABILIDADE:
+        colunas = [coluna for coluna in dados.columns if dados[coluna].dtype != 'geometry']
+        impressao = impressao_digital_gdf(dados, colunas=colunas, geometria=True)
+    return len(dados), tuple(dados.columns), impressao
+
+def _memoria_mb(dados: pd.DataFrame) -> float:
+    total = dados.memory_usage(deep=True, index=True).sum()
+    # memory_usage só enxerga o ponteiro das geometrias; soma 16 bytes por coordenada (x, y em float64)
+    for coluna in dados.columns[dados.dtypes == 'geometry']:
+        total += int(shapely.get_num_coordinates(np.asarray(dados[coluna].values)).sum()) * 16
+    return total / 1024 ** 2
+
+class RegistroDados:
+
+    # Contrato: os objetos devolvidos por obter() são compartilhados entre todas as sessões e
+    # são somente leitura. Filtros devem gerar novos objetos (máscara, assign, sort_values);
+    # colunas nunca são atribuídas sobre uma camada do registro
+
+    def __init__(self, validade: float = VALIDADE_REGISTRO_DADOS):
+        self.validade = validade
+        self.tempos: Dict[str, float] = {}
+        self.avisos: Dict[str, str] = {}
+        self._camadas: Dict[str, Camada] = {}
+        self._dados: Dict[str, tuple] = {}
+        self._travas: Dict[str, threading.Lock] = {}
+        self._trava_registro = threading.Lock()
+
+    def registrar(self, camada: Camada) -> Camada:
+        with self._trava_registro:
+            self._camadas[camada.nome] = camada
+            self._travas.setdefault(camada.nome, threading.Lock())
+            self._dados.pop(camada.nome, None)
+        return camada
+
+    def _atual(self, nome: str) -> bool:
+        registro = self._dados.get(nome)
+        if registro is None or time.time() - registro[0] >= self.validade:
+            return False
+        # Uma dependência rematerializada depois desta camada a torna obsoleta
+        return all(dep in self._dados and self._dados[dep][0] <= registro[0]
+                   for dep in self._camadas[nome].dependencias)
+
+    def obter(self, nome: str) -> Any:
+        camada = self._camadas[nome]
+        entradas = [self.obter(dep) for dep in camada.dependencias]
+
+        registro = self._dados.get(nome)
+        if registro is not None and self._atual(nome):
+            if self._integra(nome, registro):
+                return registro[1]
+
+        with self._travas[nome]:
+            # Outra sessão pode ter materializado a camada enquanto esta aguardava a trava
+            if not self._atual(nome):
+                inicio = time.perf_counter()
+                dados = self._materializar(camada, entradas)
+                self.tempos[nome] = time.perf_counter() - inicio
+                if isinstance(dados, pd.DataFrame) and not dados.attrs.get(CHAVE_VERSAO_DADOS):
+                    # Derivadas sem versão do carregador (o concat descarta attrs diferentes) ganham
+                    # uma por materialização, para as chaves de cache não precisarem das geometrias
+                    definir_versao_dados(dados, f"{nome}@{time.time_ns()}")
+                self._dados[nome] = (time.time(), dados, _assinatura(dados))
+            return self._dados[nome][1]
+
+    def _materializar(self, camada: Camada, entradas: list) -> Any:
+        # A camada é compartilhada por todas as sessões: a falha fica registrada em avisos para
+        # cada aba exibir, em vez de um st.warning que só a sessão que disparou a carga veria
+        try:
+            dados = camada.materializar(entradas)
+        except Exception as e:
+            if camada.alternativa is None:
+                raise
+            logger.warning("Camada '%s' materializada pela alternativa: %s", camada.nome, e, exc_info=True)
+            self.avisos[camada.nome] = str(e)
+            return camada.alternativa(*entradas)
+        self.avisos.pop(camada.nome, None)
+        return dados
+
+    def _integra(self, nome: str, registro: tuple) -> bool:
+        if registro[2] is None or _assinatura(registro[1]) == registro[2]:
+            return True
+        if VERIFICAR_IMUTABILIDADE:
+            raise RuntimeError(f"A camada '{nome}' foi alterada por um consumidor; camadas do registro são somente leitura")
+        # Fora do modo estrito a camada alterada é descartada e rematerializada na sequência
+        logger.warning("Camada '%s' alterada por um consumidor; rematerializando", nome)
+        self._dados.pop(nome, None)
+        return False
+
+    def _pendentes(self, nomes: Sequence[str]) -> List[str]:
+        # Fecho das dependências em ordem topológica, mantendo só o que precisa ser (re)materializado
+        ordem: List[str] = []
+        visitadas = set()
+
+        def visitar(nome):
+            if nome in visitadas:
+                return
+            visitadas.add(nome)
+            for dep in self._camadas[nome].dependencias:
+                visitar(dep)
+            ordem.append(nome)
+
+        for nome in nomes:
+            visitar(nome)
+
+        pendentes: List[str] = []
+        for nome in ordem:
+            if not self._atual(nome) or any(dep in pendentes for dep in self._camadas[nome].dependencias):
+                pendentes.append(nome)
+        return pendentes
+
+    def _materializar_em_paralelo(self, pendentes: List[str]) -> None:
+        # Cada camada entra no pool assim que suas dependências terminam; camadas independentes correm juntas
+        faltando = {nome: {dep for dep in self._camadas[nome].dependencias if dep in pendentes}
+                    for nome in pendentes}
+        futuros = {}
+        with criar_executor() as executor:
+            while faltando or futuros:
+                for nome in [nome for nome, deps in faltando.items() if not deps]:
+                    del faltando[nome]
+                    futuros[executor.submit(self.obter, nome)] = nome
+
+                concluidos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    nome = futuros.pop(futuro)
+                    futuro.result()
+                    for deps in faltando.values():
+                        deps.discard(nome)
+
+    def obter_varias(self, *nomes: str) -> tuple:
+        pendentes = self._pendentes(nomes)
+        if len(pendentes) > 1 and trabalhadores_disponiveis() > 1:
+            self._materializar_em_paralelo(pendentes)
+        return tuple(self.obter(nome) for nome in nomes)
+
+    def relatorio_tempos(self) -> pd.DataFrame:
+        # Término de cada camada se o pool fosse ilimitado: a própria duração somada à dependência mais lenta
+        termino: Dict[str, float] = {}
+
+        def calcular(nome):
+            if nome not in termino:
+                deps = self._camadas[nome].dependencias
+                termino[nome] = self.tempos.get(nome, 0.0) + max((calcular(dep) for dep in deps), default=0.0)
+            return termino[nome]
+
+        medidas = [nome for nome in self._camadas if nome in self.tempos]
+        if not medidas:
+            return pd.DataFrame(columns=['camada', 'segundos', 'termino', 'caminho_critico'])
+
+        for nome in medidas:
+            calcular(nome)
+
+        caminho = set()
+        atual = max(medidas, key=lambda nome: termino[nome])
+        while atual is not None:
+            caminho.add(atual)
+            deps = self._camadas[atual].dependencias
+            atual = max(deps, key=lambda dep: termino[dep]) if deps else None
+
+        return pd.DataFrame({
+            'camada': medidas,
+            'segundos': [round(self.tempos[nome], 3) for nome in medidas],
+            'termino': [round(termino[nome], 3) for nome in medidas],
+            'caminho_critico': [nome in caminho for nome in medidas]
+        }).sort_values('termino', ascending=False, ignore_index=True)
+
+    def materializadas(self) -> List[str]:
+        return [nome for nome in self._camadas if nome in self._dados]
+
+    def relatorio_memoria(self) -> pd.DataFrame:
+        # Memória das camadas compartilhadas: paga uma vez por processo, não por sessão
+        linhas = []
+        for nome in self.materializadas():
+            dados = self._dados[nome][1]
+            if isinstance(dados, pd.DataFrame):
+                linhas.append((nome, len(dados), round(_memoria_mb(dados), 1)))
+        return pd.DataFrame(linhas, columns=['camada', 'linhas', 'mb'])
+
+    def invalidar(self, nome: Optional[str] = None) -> None:
+        with self._trava_registro:
+            if nome is None:
+                self._dados.clear()
+            else:
+                self._dados.pop(nome, None)
+
+def _ler_shapefile(caminho: str, colunas: Optional[List[str]]) -> gpd.GeoDataFrame:
+    return carregar_shapefile(caminho, calcular_percentuais=False, colunas=colunas)
+
+def _ler_cnuc(caminho: str, colunas: Optional[List[str]]) -> gpd.GeoDataFrame:
+    return carregar_shapefile_cloud_seguro(caminho, colunas=colunas)
+
+def _ler_centro(caminho: str, colunas: Optional[List[str]]) -> dict:
+    limites = _ler_cnuc(caminho, colunas).total_bounds
+    return {"lat": (limites[1] + limites[3]) / 2, "lon": (limites[0] + limites[2]) / 2}
+
+def _ler_processos(caminho: str, colunas: Optional[List[str]]) -> pd.DataFrame:
+    return pd.read_csv(caminho, sep=";", encoding="windows-1252", usecols=colunas)
+
+def _ler_alertas() -> gpd.GeoDataFrame:
+    # carregar_todos_alertas já concatena com ignore_index; reset_index só copiaria o objeto do cache_resource
+    gdf_alertas = carregar_todos_alertas()
+    if not gdf_alertas.empty and not isinstance(gdf_alertas.index, pd.RangeIndex):
+        gdf_alertas = gdf_alertas.reset_index(drop=True)
+    return gdf_alertas
+
+def _ler_car() -> gpd.GeoDataFrame:
+    return carregar_car_postgres()
+
+def _definir_tipo_area(tipo_area: str) -> Callable:
+    def etapa(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        return gdf.assign(tipo_area=tipo_area) if not gdf.empty else gdf
+    return etapa
+
+def _estado_cnuc(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    if gdf.empty:
+        return gdf
+    if 'uf' in gdf.columns:
+        gdf = gdf.assign(ESTADO=normalizar_serie_estados(gdf['uf']))
+        return gdf[gdf['ESTADO'].notna()].reset_index(drop=True)
+    # cnuc.shp é do Pará, adicionar ESTADO manualmente
+    return gdf.assign(ESTADO='Pará')
+
+def _estado_ucs_filtradas(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    if gdf.empty or 'uf' not in gdf.columns:
+        return gdf
+    gdf = gdf.assign(ESTADO=normalizar_serie_estados(gdf['uf']))
+    gdf = gdf[gdf['ESTADO'].notna()].reset_index(drop=True)
+    if 'nome_uc' in gdf.columns:
+        gdf['invadindo'] = gdf['nome_uc']
+    return gdf
+
+def _padronizar_sigef(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    gdf = gdf.rename(columns={"id": "id_sigef"})
+    if not gdf.empty:
+        gdf['ESTADO'] = 'Pará'
+    if 'MUNICIPIO' in gdf.columns and 'municipio' not in gdf.columns:
+        gdf = gdf.rename(columns={'MUNICIPIO': 'municipio'})
+    elif 'municipio' not in gdf.columns:
+        gdf['municipio'] = None
+    return gdf
+
+def _estado_car(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    if gdf.empty or 'cod_estado' not in gdf.columns:
+        return gdf
+    gdf = gdf.assign(ESTADO=normalizar_serie_estados(gdf['cod_estado']))
+    return gdf[gdf['ESTADO'].notna()].reset_index(drop=True)
+
+def _estado_terras_indigenas(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    if gdf.empty or 'uf_sigla' not in gdf.columns:
+        return gdf
+
+    def processar_estados_ti(uf_sigla):
+        if pd.isna(uf_sigla):
+            return None
+        estados = str(uf_sigla).split(',')
+        estados_normalizados = [normalizar_estado(e.strip()) for e in estados]
+        estados_validos = [e for e in estados_normalizados if e is not None]
+        return estados_validos[0] if estados_validos else None
+
+    gdf = gdf.assign(ESTADO=mapear_unicos(gdf['uf_sigla'], processar_estados_ti))
+    gdf = gdf[gdf['ESTADO'].notna()].reset_index(drop=True)
+    gdf = gdf[gdf['ESTADO'].isin(['Mato Grosso', 'Paraná'])].reset_index(drop=True)
+
+    if 'terrai_nom' in gdf.columns:
+        gdf['invadindo'] = gdf['terrai_nom']
+    elif 'nome' in gdf.columns:
+        gdf['invadindo'] = gdf['nome']
+    else:
+        gdf['invadindo'] = 'Terra Indígena'
+    return gdf
+
+def _combinar_sigef_car(gdf_sigef: gpd.GeoDataFrame, gdf_car: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    gdf_sigef_combinado = pd.concat([gdf_sigef.reset_index(drop=True), gdf_car.reset_index(drop=True)], ignore_index=True)
+    if not gdf_sigef_combinado.empty and 'ESTADO' not in gdf_sigef_combinado.columns:
+        gdf_sigef_combinado['ESTADO'] = None
+    return gdf_sigef_combinado
+
+def _ucs_com_car(gdf_ucs: gpd.GeoDataFrame, gdf_car: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    # Calcular sigef_km2 e c_sigef para UCs filtradas através de intersecção com CAR
+    if gdf_ucs.empty or gdf_car.empty:
+        return gdf_ucs
+    return preparar_hectares(atualizar_car_em_ucs(gdf_ucs, gdf_car))
+
+def _ucs_sem_car(gdf_ucs: gpd.GeoDataFrame, gdf_car: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    return gdf_ucs
+
+def _combinar_ucs(gdf_cnuc: gpd.GeoDataFrame, gdf_ucs: gpd.GeoDataFrame,
+                  gdf_terras_indigenas: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    # Combinar UCs (Pará + Filtradas)
+    gdf_cnuc_combinado = pd.concat([gdf_cnuc.reset_index(drop=True), gdf_ucs.reset_index(drop=True)], ignore_index=True)
+
+    # Incluir Terras Indígenas
+    if not gdf_terras_indigenas.empty:
+        gdf_ti_como_uc = gdf_terras_indigenas.copy()
+
+        if 'nome_uc' not in gdf_ti_como_uc.columns:
+            if 'terrai_nom' in gdf_ti_como_uc.columns:
+                gdf_ti_como_uc['nome_uc'] = 'TI - ' + gdf_ti_como_uc['terrai_nom'].astype(str)
+            elif 'nome' in gdf_ti_como_uc.columns:
+                gdf_ti_como_uc['nome_uc'] = 'TI - ' + gdf_ti_como_uc['nome'].astype(str)
+            else:
+                gdf_ti_como_uc['nome_uc'] = 'Terra Indígena'
+        else:
+            gdf_ti_como_uc['nome_uc'] = 'TI - ' + gdf_ti_como_uc['nome_uc'].astype(str)
+
+        if 'municipio' not in gdf_ti_como_uc.columns:
+            gdf_ti_como_uc['municipio'] = None
+
+        gdf_ti_como_uc['tipo_area'] = 'T.I'
+        gdf_cnuc_combinado = pd.concat([gdf_cnuc_combinado.reset_index(drop=True), gdf_ti_como_uc.reset_index(drop=True)], ignore_index=True)
+
+    if not gdf_cnuc_combinado.empty and 'nome_uc' in gdf_cnuc_combinado.columns and 'tipo_area' in gdf_cnuc_combinado.columns:
+        gdf_cnuc_combinado = gdf_cnuc_combinado.drop_duplicates(subset=['nome_uc', 'tipo_area'])
+
+    if not gdf_cnuc_combinado.empty:
+        for col in ['ha_total', 'num_area', 'alerta_km2', 'sigef_km2', 'area_km2']:
+            if col in gdf_cnuc_combinado.columns:
+                gdf_cnuc_combinado[col] = pd.to_numeric(gdf_cnuc_combinado[col], errors='coerce').fillna(0)
+
+    return gdf_cnuc_combinado
+
+def _construir_indice(gdf_alertas: gpd.GeoDataFrame, gdf_cnuc_combinado: gpd.GeoDataFrame):
+    # Índice esparso alerta x UC, construído uma vez sobre as camadas completas
+    return obter_indice_incidencia(gdf_alertas, gdf_cnuc_combinado)
+
+def registrar_camadas_padrao(registro: RegistroDados) -> RegistroDados:
+    # Camadas espaciais terminam com a geometria projetada materializada ao lado da geográfica;
+    # nas derivadas a etapa só completa linhas de camadas que ainda não a tinham
+    camadas = [
+        Camada('alertas', _ler_alertas, normalizacao=[adicionar_geometria_projetada]),
+        Camada('cnuc', _ler_cnuc, "cnuc.shp", COLUNAS_CNUC,
+               [preparar_hectares, _estado_cnuc, _definir_tipo_area('UC'), adicionar_geometria_projetada]),
+        Camada('centro', _ler_centro, "cnuc.shp", COLUNAS_CNUC),
+        Camada('sigef', _ler_shapefile, "sigef.shp", COLUNAS_SIGEF, [_padronizar_sigef, adicionar_geometria_projetada]),
+        Camada('ucs_filtradas', _ler_shapefile, "Filtrado/UCs_filtradas.shp", None,
+               [_estado_ucs_filtradas, preparar_hectares, _definir_tipo_area('UC'), adicionar_geometria_projetada]),
+        Camada('car', _ler_car, normalizacao=[_estado_car, preparar_hectares, adicionar_geometria_projetada]),
+        Camada('terras_indigenas', _ler_shapefile, "Filtrado/TerraIn_filtrado.shp", None,
+               [_estado_terras_indigenas, preparar_hectares, _definir_tipo_area('T.I'), adicionar_geometria_projetada]),
+        Camada('processos', _ler_processos, "processos_tjpa_completo_atualizada_pronto.csv",
+               ['municipio', 'data_ajuizamento', 'classe', 'assuntos', 'orgao_julgador']),
+        Camada('sigef_combinado', _combinar_sigef_car, normalizacao=[adicionar_geometria_projetada],
+               dependencias=['sigef', 'car']),
+        Camada('ucs_filtradas_car', _ucs_com_car, dependencias=['ucs_filtradas', 'car'], alternativa=_ucs_sem_car),
+        Camada('cnuc_combinado', _combinar_ucs, normalizacao=[adicionar_geometria_projetada],
+               dependencias=['cnuc', 'ucs_filtradas_car', 'terras_indigenas']),
+        Camada('indice_incidencia', _construir_indice, dependencias=['alertas', 'cnuc_combinado']),
+        Camada('alertas_particionados', AlertasParticionados, dependencias=['alertas']),
+        # Versões simplificadas só para os mapas; as análises usam as camadas exatas acima
+        Camada('piramide_cnuc', PiramideGeometrias, dependencias=['cnuc']),
+        Camada('piramide_ucs', PiramideGeometrias, dependencias=['cnuc_combinado']),
+        Camada('piramide_sigef', PiramideGeometrias, dependencias=['sigef_combinado'])
+    ]
+    for camada in camadas:
+        registro.registrar(camada)
+    return registro
+
+_registro: Optional[RegistroDados] = None
+_trava_registro = threading.Lock()
+
+def obter_registro() -> RegistroDados:
+    # Um único registro por processo: as camadas já materializadas são compartilhadas entre sessões
+    global _registro
+    with _trava_registro:
+        if _registro is None:
+            _registro = registrar_camadas_padrao(RegistroDados())
+        return _registro
+
+if __name__ == "__main__":
+    from processadores.processador_alertas import tempos_carga_alertas
+
+    registro_principal = obter_registro()
+    inicio_total = time.perf_counter()
+    registro_principal.obter_varias(*registro_principal._camadas)
+    print(f"total: {time.perf_counter() - inicio_total:.2f} s")
+    print(registro_principal.relatorio_tempos().to_string(index=False))
+    print(registro_principal.relatorio_memoria().to_string(index=False))
+    for origem, segundos in tempos_carga_alertas.items():
+        print(f"alertas/{origem}: {segundos:.2f} s")
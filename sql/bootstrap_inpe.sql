@@ -0,0 +1,78 @@
+-- Índices e partições opcionais para "CPT".queimadas (focos do INPE)
+--
+-- As consultas de processadores/consultas_inpe.py filtram datahora por intervalo
+-- semiaberto [início, fim) e a caixa latitude/longitude por BETWEEN, ambos com
+-- parâmetros vinculados. Este script prepara um Postgres local (ou o servidor)
+-- para atender esses filtros por índice. Pode ser executado mais de uma vez:
+--
+--     psql -d <banco> -f sql/bootstrap_inpe.sql
+--
+-- Partições anuais só são criadas quando pedidas explicitamente:
+--
+--     PGOPTIONS='-c inpe.particionar=on' psql -d <banco> -f sql/bootstrap_inpe.sql
+--
+-- Conferência do plano depois da execução:
+--
+--     python -m processadores.consultas_inpe 2023
+
+-- 1. Btree em datahora: atende os intervalos de um ano ou de um período
+CREATE INDEX IF NOT EXISTS queimadas_datahora_idx
+    ON "CPT".queimadas (datahora);
+
+-- 2. BRIN em datahora para tabelas grandes, carregadas em ordem de data.
+--    Ocupa poucas páginas e descarta faixas inteiras da tabela; só é criado
+--    acima de 10 milhões de linhas estimadas, onde o btree pesa na escrita
+DO $$
+BEGIN
+    IF (SELECT reltuples FROM pg_class WHERE oid = '"CPT".queimadas'::regclass) > 10000000 THEN
+        CREATE INDEX IF NOT EXISTS queimadas_datahora_brin
+            ON "CPT".queimadas USING brin (datahora) WITH (pages_per_range = 32);
+    END IF;
+END $$;
+
+-- 3. Partições anuais (opcional, inpe.particionar=on). Cria "CPT".queimadas_particionada
+--    com uma partição por ano presente nos dados e uma partição padrão para o resto,
+--    e copia as linhas se ela estiver vazia. A troca de nomes com a tabela original
+--    fica a cargo de quem administra o banco, numa única transação:
+--
+--        BEGIN;
+--        ALTER TABLE "CPT".queimadas RENAME TO queimadas_antiga;
+--        ALTER TABLE "CPT".queimadas_particionada RENAME TO queimadas;
+--        COMMIT;
+DO $$
+DECLARE
+    ano integer;
+BEGIN
+    IF coalesce(current_setting('inpe.particionar', true), 'off') <> 'on' THEN
+        RETURN;
+    END IF;
+
+    CREATE TABLE IF NOT EXISTS "CPT".queimadas_particionada
+        (LIKE "CPT".queimadas INCLUDING DEFAULTS)
+        PARTITION BY RANGE (datahora);
+
+    FOR ano IN
+        SELECT generate_series(EXTRACT(YEAR FROM min(datahora))::integer,
+                               EXTRACT(YEAR FROM max(datahora))::integer)
+        FROM "CPT".queimadas
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS "CPT".%I PARTITION OF "CPT".queimadas_particionada FOR VALUES FROM (%L) TO (%L)',
+            'queimadas_' || ano, make_date(ano, 1, 1), make_date(ano + 1, 1, 1)
+        );
+    END LOOP;
+
+    CREATE TABLE IF NOT EXISTS "CPT".queimadas_padrao
+        PARTITION OF "CPT".queimadas_particionada DEFAULT;
+
+    -- Índice no pai: o Postgres cria o equivalente em cada partição
+    CREATE INDEX IF NOT EXISTS queimadas_particionada_datahora_idx
+        ON "CPT".queimadas_particionada (datahora);
+
+    IF NOT EXISTS (SELECT 1 FROM "CPT".queimadas_particionada) THEN
+        INSERT INTO "CPT".queimadas_particionada SELECT * FROM "CPT".queimadas;
+    END IF;
+END $$;
+
+-- Estatísticas atualizadas para o planejador estimar bem os intervalos
+ANALYZE "CPT".queimadas;
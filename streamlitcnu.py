@@ -1,7 +1,7 @@
 import streamlit as st
 import geopandas as gpd
 import pandas as pd
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 import plotly.express as px
 import plotly.graph_objects as go
 import plotly.io as pio
@@ -1502,8 +1502,10 @@ def fig_desmatamento_mapa_pontos(gdf_alertas_filtered: gpd.GeoDataFrame) -> go.F
 import gc
 import psycopg2
 from psycopg2 import Error
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
+from processadores.gerenciador_bd import obter_engine_compartilhado
+from processadores.consultas_inpe import montar_filtros_inpe
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -1523,45 +1525,32 @@ CHUNK_SIZE = 15000
 MEMORY_THRESHOLD = 85  
 
 class DatabaseManager:
+    # Same process-wide instrumented engine as the modular app: one pool, visible in relatorio_pools
     def __init__(self):
-        self._engine = None
         self._connection_string = self._build_connection_string()
     
     def _build_connection_string(self) -> str:
-        return (f"postgresql://{DB_CONFIG['user']}:{DB_CONFIG['password']}"
+        # Explicit driver: from SQLAlchemy 2.1 on, "postgresql://" loads psycopg 3, which is not installed
+        return (f"postgresql+psycopg2://{DB_CONFIG['user']}:{DB_CONFIG['password']}"
                 f"@{DB_CONFIG['host']}:{DB_CONFIG['port']}/{DB_CONFIG['database']}")
     
     def get_engine(self):
-        if self._engine is None:
-            try:
-                self._engine = create_engine(
-                    self._connection_string,
-                    pool_size=5,
-                    max_overflow=10,
-                    pool_pre_ping=True,
-                    pool_recycle=3600,
-                    echo=False
-                )
-            except Exception:
-                return None
-        return self._engine
-    
-    def dispose(self):
-        if self._engine:
-            self._engine.dispose()
-            self._engine = None
+        return obter_engine_compartilhado(self._connection_string)
 
 class DataProcessor:
     
+    _COLUMN_MAP = {
+        'datahora': 'DataHora',
+        'riscofogo': 'RiscoFogo',
+        'precipitacao': 'Precipitacao',
+        'mun_corrigido': 'mun_corrigido',
+        'diasemchuva': 'DiaSemChuva',
+        'latitude': 'Latitude',
+        'longitude': 'Longitude'
+    }
+    
     def __init__(self):
         self.db_manager = DatabaseManager()
-        self._base_filters = [
-            "riscofogo BETWEEN 0 AND 1",
-            "precipitacao >= 0",
-            "diasemchuva >= 0",
-            "latitude BETWEEN -15 AND 5",
-            "longitude BETWEEN -60 AND -45"
-        ]
     
     def _check_memory_usage(self) -> bool:
         return psutil.virtual_memory().percent < MEMORY_THRESHOLD
@@ -1585,20 +1574,6 @@ class DataProcessor:
         
         return df
     
-    def _get_row_count(self, engine, where_clause: str) -> int:
-        try:
-            count_query = text(f"""
-                SELECT COUNT(*) 
-                FROM "{DB_CONFIG['schema']}"."{DB_CONFIG['table']}"
-                WHERE {where_clause}
-            """)
-            
-            with engine.connect() as conn:
-                result = conn.execute(count_query)
-                return result.scalar() or 0
-        except Exception:
-            return 0
-    
     def _build_base_query(self) -> str:
         return f"""
             SELECT
@@ -1612,29 +1587,36 @@ class DataProcessor:
             FROM "{DB_CONFIG['schema']}"."{DB_CONFIG['table']}"
         """
     
-    def _load_data_chunks(self, engine, base_query: str, where_clause: str, 
-                         total_rows: int) -> Optional[pd.DataFrame]:
-        chunks = []
+    def _build_where_clause(self, year: Optional[int] = None) -> Tuple[str, dict]:
+        # Same index-friendly filters as the modular app: the year becomes a datahora range
+        # and every value is a bound parameter
+        return montar_filtros_inpe(year)
+    
+    def _iter_chunks(self, engine, base_query: str, where_clause: str,
+                     params: Optional[dict] = None) -> Iterator[pd.DataFrame]:
+        # stream_results uses a psycopg2 named (server-side) cursor, so Postgres scans
+        # the table once instead of re-reading the skipped rows on every OFFSET
+        query = text(f"""
+            {base_query}
+            WHERE {where_clause}
+        """)
         
-        try:
-            for offset in range(0, total_rows, CHUNK_SIZE):
+        with engine.connect() as conn:
+            conn = conn.execution_options(stream_results=True, max_row_buffer=CHUNK_SIZE)
+            for chunk_df in pd.read_sql(query, conn, params=params, parse_dates=['datahora'], chunksize=CHUNK_SIZE):
+                chunk_df = chunk_df.rename(columns=self._COLUMN_MAP)
+                yield self._optimize_dataframe(chunk_df)
+                
+                del chunk_df
                 if not self._check_memory_usage():
                     gc.collect()
                     if not self._check_memory_usage():
                         break
-                
-                chunk_query = text(f"""
-                    {base_query}
-                    WHERE {where_clause}
-                    LIMIT {CHUNK_SIZE} OFFSET {offset}
-                """)
-                
-                chunk_df = pd.read_sql(chunk_query, engine, parse_dates=['datahora'])
-                chunk_df = self._optimize_dataframe(chunk_df)
-                chunks.append(chunk_df)
-                
-                del chunk_df
-                gc.collect()
+    
+    def _load_data_chunks(self, engine, base_query: str, where_clause: str,
+                          params: Optional[dict] = None) -> Optional[pd.DataFrame]:
+        try:
+            chunks = list(self._iter_chunks(engine, base_query, where_clause, params))
             
             if chunks:
                 df = pd.concat(chunks, ignore_index=True)
@@ -1653,36 +1635,11 @@ class DataProcessor:
             return None
         
         try:
-            filters = self._base_filters.copy()
-            if year is not None:
-                filters.append(f"EXTRACT(YEAR FROM datahora) = {year}")
-            where_clause = " AND ".join(filters)
-            
-            total_rows = self._get_row_count(engine, where_clause)
-            if total_rows == 0:
-                return pd.DataFrame()
-            
-            base_query = self._build_base_query()
-            
-            if total_rows <= CHUNK_SIZE:
-                query = text(f"{base_query} WHERE {where_clause}")
-                df = pd.read_sql(query, engine, parse_dates=['datahora'])
-            else:
-                df = self._load_data_chunks(engine, base_query, where_clause, total_rows)
+            df = self._load_data_chunks(engine, self._build_base_query(), *self._build_where_clause(year))
             
             if df is None or df.empty:
                 return pd.DataFrame()
             
-            df = df.rename(columns={
-                'datahora': 'DataHora',
-                'riscofogo': 'RiscoFogo',
-                'precipitacao': 'Precipitacao',
-                'mun_corrigido': 'mun_corrigido',
-                'diasemchuva': 'DiaSemChuva',
-                'latitude': 'Latitude',
-                'longitude': 'Longitude'
-            })
-            
             df = self._optimize_dataframe(df)
             df = df.dropna(subset=['DataHora', 'mun_corrigido'])
             
@@ -1691,8 +1648,6 @@ class DataProcessor:
             
         except Exception:
             return None
-        finally:
-            self.db_manager.dispose()
     
     def get_available_years(self) -> List[int]:
         engine = self.db_manager.get_engine()
@@ -1715,8 +1670,6 @@ class DataProcessor:
             
         except Exception:
             return []
-        finally:
-            self.db_manager.dispose()
 
 class RankingProcessor:
     
@@ -0,0 +1,54 @@
+import os
+import uuid
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+# Testes contra Postgres só rodam com DSN_TESTE_POSTGRES apontando para um servidor local,
+# ex.: postgresql+psycopg2://postgres@localhost:5432/postgres. Cada sessão cria e remove um
+# banco próprio; os dados do servidor não são tocados
+DSN_TESTE_POSTGRES = os.environ.get('DSN_TESTE_POSTGRES')
+
+@pytest.fixture(scope='session')
+def engine_postgres():
+    if not DSN_TESTE_POSTGRES:
+        pytest.skip('DSN_TESTE_POSTGRES não definido')
+
+    administrador = create_engine(DSN_TESTE_POSTGRES, isolation_level='AUTOCOMMIT')
+    banco = f"teste_cnustream_{uuid.uuid4().hex[:8]}"
+    try:
+        with administrador.connect() as conn:
+            conn.execute(text(f'CREATE DATABASE "{banco}"'))
+    except Exception as e:
+        administrador.dispose()
+        pytest.skip(f'Postgres indisponível: {e}')
+
+    engine = create_engine(make_url(DSN_TESTE_POSTGRES).set(database=banco))
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        with administrador.connect() as conn:
+            conn.execute(text(f'DROP DATABASE IF EXISTS "{banco}" WITH (FORCE)'))
+        administrador.dispose()
+
+@pytest.fixture
+def tabela_queimadas(engine_postgres):
+    # "CPT".queimadas com as colunas e tipos que as consultas do painel usam
+    with engine_postgres.begin() as conn:
+        conn.execute(text('CREATE SCHEMA IF NOT EXISTS "CPT"'))
+        conn.execute(text('DROP TABLE IF EXISTS "CPT".queimadas'))
+        conn.execute(text("""
+            CREATE TABLE "CPT".queimadas (
+                datahora timestamp,
+                riscofogo double precision,
+                precipitacao double precision,
+                municipio text,
+                diasemchuva integer,
+                latitude double precision,
+                longitude double precision
+            )
+        """))
+    yield engine_postgres
+    with engine_postgres.begin() as conn:
+        conn.execute(text('DROP TABLE IF EXISTS "CPT".queimadas'))
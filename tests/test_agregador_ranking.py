@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from processadores import processador_dados, processador_ranking
+from processadores.processador_dados import ProcessadorDados
+from processadores.processador_ranking import AgregadorRanking, ProcessadorRanking
+
+TEMAS = list(ProcessadorRanking._CONFIGS_AGREGACAO)
+
+def _focos_sinteticos(n=5000, municipios=80, semente=0) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    # Municípios com frequências bem diferentes: alguns só aparecem em poucos chunks
+    pesos = rng.pareto(1.5, municipios) + 0.01
+    codigos = rng.choice(municipios, n, p=pesos / pesos.sum())
+    nomes = np.array([f'MUNICIPIO {i:03d}' for i in range(municipios)], dtype=object)[codigos]
+    nomes[rng.random(n) < 0.02] = None
+    df = pd.DataFrame({
+        'DataHora': pd.Timestamp('2022-01-01') + pd.to_timedelta(rng.integers(0, 2 * 365 * 24 * 3600, n), unit='s'),
+        'RiscoFogo': rng.uniform(0, 1, n),
+        'Precipitacao': rng.exponential(8, n),
+        'mun_corrigido': nomes,
+        'DiaSemChuva': rng.integers(0, 150, n),
+        'Latitude': rng.uniform(-10, 2, n),
+        'Longitude': rng.uniform(-58, -46, n)
+    })
+    return ProcessadorDados()._otimizar_dataframe(df)
+
+def _fatias(df: pd.DataFrame, cortes):
+    limites = [0] + sorted(cortes) + [len(df)]
+    return [df.iloc[inicio:fim] for inicio, fim in zip(limites[:-1], limites[1:])]
+
+def _cortes_irregulares(n: int, semente: int):
+    # Chunks de tamanhos muito diferentes, inclusive vazios e de uma linha só
+    rng = np.random.default_rng(semente)
+    cortes = sorted(set(rng.integers(1, n, 12).tolist()) | {1, 2, n - 1})
+    # Um corte repetido gera um chunk vazio
+    return cortes + [cortes[5]]
+
+def _groupby_unico(df: pd.DataFrame, tema: str) -> pd.DataFrame:
+    return ProcessadorRanking._processar_agregacao_chunk(df, tema)
+
+def _comparar_agregados(obtido: pd.DataFrame, esperado: pd.DataFrame):
+    assert list(obtido.columns) == list(esperado.columns)
+    assert list(obtido.index.astype(str)) == list(esperado.index.astype(str))
+    pd.testing.assert_frame_equal(obtido.reset_index(drop=True), esperado.reset_index(drop=True),
+                                  check_dtype=False, rtol=1e-6)
+
+@pytest.mark.parametrize('tema', TEMAS)
+@pytest.mark.parametrize('semente', [0, 1, 2])
+def test_chunks_irregulares_iguais_ao_groupby_unico(tema, semente):
+    df = _focos_sinteticos(semente=semente)
+    agregador = AgregadorRanking(ProcessadorRanking._CONFIGS_AGREGACAO[tema])
+    agregador.consumir(_fatias(df, _cortes_irregulares(len(df), semente)))
+
+    _comparar_agregados(agregador.resultado(), _groupby_unico(df, tema))
+
+@pytest.mark.parametrize('tema', TEMAS)
+def test_media_nao_e_media_de_medias(tema):
+    # Um chunk com uma linha e outro com o resto: a média das médias ficaria bem longe da média real
+    df = _focos_sinteticos(n=400, municipios=3)
+    coluna = next(col for col in ProcessadorRanking._CONFIGS_AGREGACAO[tema] if col != 'DataHora')
+    agregador = AgregadorRanking(ProcessadorRanking._CONFIGS_AGREGACAO[tema])
+    agregador.consumir(_fatias(df, [1]))
+
+    resultado = agregador.resultado()
+    esperado = df.dropna(subset=['mun_corrigido']).groupby('mun_corrigido', observed=True)[coluna].mean()
+    np.testing.assert_allclose(resultado[(coluna, 'mean')].to_numpy(dtype=float), esperado.to_numpy(dtype=float),
+                               rtol=1e-6)
+
+@pytest.mark.parametrize('tema', TEMAS)
+def test_ranking_em_chunks_igual_ao_ranking_de_uma_vez(tema, monkeypatch):
+    df = _focos_sinteticos(n=3000, semente=3)
+    esperado = ProcessadorRanking().processar_ranking(df, tema, 'Todos')
+
+    monkeypatch.setattr(processador_ranking, 'TAMANHO_CHUNK', 317)
+    obtido = ProcessadorRanking().processar_ranking(df, tema, 'Todos')
+
+    assert obtido[1] == esperado[1]
+    pd.testing.assert_frame_equal(obtido[0], esperado[0], check_dtype=False)
+
+def test_sem_chunks_resultado_vazio():
+    agregador = AgregadorRanking(ProcessadorRanking._CONFIGS_AGREGACAO[TEMAS[0]])
+    agregador.consumir([])
+    assert agregador.resultado().empty
+
+@pytest.mark.parametrize('tema', TEMAS)
+def test_ranking_sql_usa_streaming_quando_o_banco_falha(tema, monkeypatch):
+    df = _focos_sinteticos(n=4000, semente=4)
+    esperado = ProcessadorRanking().processar_ranking(df, tema, 'Todos')
+
+    monkeypatch.setattr(ProcessadorRanking, '_agregar_no_banco', lambda self, tema, ano=None: None)
+    monkeypatch.setattr(processador_ranking.ProcessadorDados, 'iterar_dados_inpe',
+                        lambda self, ano=None: iter(_fatias(df, _cortes_irregulares(len(df), 4))))
+    # A amostra em memória não pode ser usada enquanto o streaming tiver dados
+    obtido = ProcessadorRanking().processar_ranking_sql(tema, 'Todos', df_fallback=df.iloc[:10])
+
+    assert obtido[1] == esperado[1]
+    pd.testing.assert_frame_equal(obtido[0], esperado[0], check_dtype=False)
+
+def test_ranking_sql_cai_na_base_em_memoria_sem_streaming(monkeypatch):
+    df = _focos_sinteticos(n=1000, semente=5)
+    tema = TEMAS[0]
+    esperado = ProcessadorRanking().processar_ranking(df, tema, 'Todos')
+
+    monkeypatch.setattr(ProcessadorRanking, '_agregar_no_banco', lambda self, tema, ano=None: None)
+    monkeypatch.setattr(processador_ranking.ProcessadorDados, 'iterar_dados_inpe', lambda self, ano=None: iter(()))
+    obtido = ProcessadorRanking().processar_ranking_sql(tema, 'Todos', df_fallback=df)
+
+    pd.testing.assert_frame_equal(obtido[0], esperado[0])
+
+def test_streaming_interrompido_por_memoria_nao_vira_ranking(tmp_path, monkeypatch):
+    df = _focos_sinteticos(n=2000, semente=6)
+    tema = TEMAS[0]
+    amostra = df.iloc[:300]
+    esperado = ProcessadorRanking().processar_ranking(amostra, tema, 'Todos')
+
+    # Leitura real pelo cursor (SQLite) com o limite de memória estourado depois do primeiro chunk
+    engine = create_engine(f"sqlite:///{tmp_path / 'queimadas.db'}")
+    df.rename(columns={valor: chave for chave, valor in ProcessadorDados._MAPA_COLUNAS.items()}).astype(
+        {'municipio': object}).to_sql('queimadas', engine, index=False)
+    monkeypatch.setattr(processador_dados, 'TAMANHO_CHUNK', 500)
+    monkeypatch.setattr(ProcessadorDados, '_obter_espelho_queimadas', lambda self: None)
+    monkeypatch.setattr(ProcessadorDados, '_construir_consulta_base', ProcessadorDados._construir_consulta_espelho)
+    monkeypatch.setattr(ProcessadorDados, '_verificar_uso_memoria', lambda self: False)
+    monkeypatch.setattr(processador_dados.GerenciadorBancoDados, 'obter_engine', lambda self: engine)
+    monkeypatch.setattr(ProcessadorRanking, '_agregar_no_banco', lambda self, tema, ano=None: None)
+    try:
+        assert ProcessadorRanking().processar_ranking_streaming(tema, 'Todos')[0].empty
+        # Sem streaming completo, o ranking vem da base em memória e não do agregado parcial
+        obtido = ProcessadorRanking().processar_ranking_sql(tema, 'Todos', df_fallback=amostra)
+    finally:
+        engine.dispose()
+
+    pd.testing.assert_frame_equal(obtido[0], esperado[0])
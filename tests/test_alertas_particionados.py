@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+import pytest
+from processadores.processador_alertas import AlertasParticionados, ordenar_alertas
+from processadores.processador_espacial import IndiceIncidencia
+from utilitarios.geometria_dupla import adicionar_geometria_projetada
+
+def _alertas_fora_de_ordem(n=300, semente=0) -> gpd.GeoDataFrame:
+    rng = np.random.default_rng(semente)
+    lon = rng.uniform(-52.5, -51.5, n)
+    lat = rng.uniform(-4.5, -3.5, n)
+    gdf = gpd.GeoDataFrame({
+        'ESTADO': rng.choice(['PARÁ', 'AMAZONAS', 'MATO GROSSO'], n),
+        'ANODETEC': rng.choice([2021, 2022, 2023], n),
+        'AREAHA': rng.uniform(1, 50, n)
+    }, geometry=shapely.box(lon, lat, lon + 0.01, lat + 0.01), crs='EPSG:4326')
+    return adicionar_geometria_projetada(gdf)
+
+def _ucs() -> gpd.GeoDataFrame:
+    gdf = gpd.GeoDataFrame({'nome_uc': ['UC NORTE', 'UC SUL']},
+                           geometry=[shapely.box(-52.5, -4.0, -51.5, -3.5), shapely.box(-52.2, -4.5, -51.8, -4.0)],
+                           crs='EPSG:4326')
+    return adicionar_geometria_projetada(gdf)
+
+def _agregado_direto(gdf_alertas, gdf_ucs) -> pd.DataFrame:
+    # Referência sem índice: intersecções calculadas sobre o próprio recorte
+    return IndiceIncidencia.construir(gdf_alertas, gdf_ucs).agregar_por_uc(gdf_alertas, gdf_ucs)
+
+def test_fallback_de_ordenacao_mantem_rotulos_da_camada():
+    alertas = _alertas_fora_de_ordem()
+    particionados = AlertasParticionados(alertas)
+
+    assert particionados.gdf.index.sort_values().equals(alertas.index)
+    fatia = particionados.fatia('PARÁ', 2022)
+    assert (fatia['ESTADO'] == 'PARÁ').all() and (fatia['ANODETEC'] == 2022).all()
+    # Cada rótulo continua apontando para a mesma geometria da camada original
+    assert shapely.equals(fatia.geometry.values, alertas.loc[fatia.index].geometry.values).all()
+
+@pytest.mark.parametrize('estado,ano', [('PARÁ', 'Todos'), ('AMAZONAS', 2021), ('MATO GROSSO', 2023)])
+def test_indice_da_camada_original_serve_as_fatias(estado, ano):
+    alertas = _alertas_fora_de_ordem(semente=1)
+    ucs = _ucs()
+    indice = IndiceIncidencia.construir(alertas, ucs)
+    fatia = AlertasParticionados(alertas).fatia(estado, ano)
+
+    assert indice.cobre(fatia, ucs)
+    obtido = indice.agregar_por_uc(fatia, ucs).sort_values('nome_uc').reset_index(drop=True)
+    esperado = _agregado_direto(fatia, ucs).sort_values('nome_uc').reset_index(drop=True)
+    pd.testing.assert_frame_equal(obtido, esperado)
+
+def test_ordenar_alertas_renumera_por_padrao():
+    alertas = _alertas_fora_de_ordem(n=20)
+    assert ordenar_alertas(alertas).index.equals(pd.RangeIndex(20))
+    assert not ordenar_alertas(alertas, manter_indice=True).index.equals(pd.RangeIndex(20))
@@ -0,0 +1,83 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+from processadores import processador_espacial
+from processadores.processador_espacial import AtribuicaoFocos, obter_focos_por_uc
+
+def _ucs_sinteticas(semente=0) -> gpd.GeoDataFrame:
+    rng = np.random.default_rng(semente)
+    x, y = rng.uniform(-56, -48, 40), rng.uniform(-9, -1, 40)
+    lado = rng.uniform(0.2, 1.5, 40)
+    geometrias = list(shapely.box(x, y, x + lado, y + lado))
+    # Polígonos com buraco e UCs que se sobrepõem, como TIs dentro de APAs
+    geometrias[0] = shapely.Polygon([(-55, -8), (-50, -8), (-50, -3), (-55, -3)], [[(-54, -7), (-51, -7), (-51, -4), (-54, -4)]])
+    geometrias[1] = shapely.box(-53, -6, -52, -5)
+    geometrias[2] = shapely.MultiPolygon([shapely.box(-50.5, -2, -49.5, -1), shapely.box(-49, -2, -48, -1)])
+    nomes = pd.Categorical([f'UC {i:02d}' for i in range(40)] + ['UC sem focos'])
+    geometrias.append(shapely.box(10, 10, 11, 11))
+    return gpd.GeoDataFrame({'nome_uc': nomes}, geometry=geometrias, crs='EPSG:4326',
+                            index=[f'uc{i}' for i in range(41)])
+
+def _focos_sinteticos(n=20000, semente=0) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    longitude = rng.uniform(-57, -47, n)
+    latitude = rng.uniform(-10, 0, n)
+    # Pontos exatamente na borda e nos vértices contam, como no predicate='intersects'
+    longitude[:4], latitude[:4] = [-53, -52.5, -55, -50], [-5.5, -6, -8, -3]
+    longitude[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({'Longitude': longitude, 'Latitude': latitude, 'Estado': rng.choice(['PA', 'MT'], n)},
+                        index=pd.RangeIndex(n) * 2 + 7)
+
+def _pares_sjoin(df_focos: pd.DataFrame, gdf_ucs: gpd.GeoDataFrame) -> set:
+    # Referência: o sjoin que a atribuição substituiu, nas mesmas coordenadas nativas
+    gdf_focos = gpd.GeoDataFrame(geometry=gpd.points_from_xy(df_focos['Longitude'], df_focos['Latitude']),
+                                 crs='EPSG:4326')
+    unidos = gpd.sjoin(gdf_focos.reset_index(drop=True), gdf_ucs.reset_index(drop=True), how='inner',
+                       predicate='intersects')
+    return set(zip(unidos.index, unidos['index_right']))
+
+def _contagem_sjoin(df_focos: pd.DataFrame, gdf_ucs: gpd.GeoDataFrame) -> tuple:
+    gdf_focos = gpd.GeoDataFrame(geometry=gpd.points_from_xy(df_focos['Longitude'], df_focos['Latitude']),
+                                 crs='EPSG:4326')
+    unidos = gpd.sjoin(gdf_focos, gdf_ucs, how='inner', predicate='intersects')
+    return len(unidos), unidos.groupby('nome_uc', observed=False).size().reset_index(name='quantidade_focos')
+
+@pytest.mark.parametrize('tamanho_lote', [97, 1_000_000])
+def test_pares_iguais_ao_sjoin(tamanho_lote, monkeypatch):
+    monkeypatch.setattr(processador_espacial, 'TAMANHO_LOTE_FOCOS', tamanho_lote)
+    df_focos, gdf_ucs = _focos_sinteticos(), _ucs_sinteticas()
+
+    atribuicao = AtribuicaoFocos.construir(df_focos, gdf_ucs)
+    pares = set(zip(atribuicao.pos_foco.tolist(), atribuicao.codigo_uc.tolist()))
+    assert pares == _pares_sjoin(df_focos, gdf_ucs)
+    # Focos em UCs sobrepostas aparecem uma vez por UC
+    assert len(pares) > len(set(atribuicao.pos_foco.tolist()))
+    assert {(0, 1), (1, 1), (2, 0), (3, 0)} <= pares
+
+def test_recortes_contam_como_sjoin_do_recorte():
+    df_focos, gdf_ucs = _focos_sinteticos(), _ucs_sinteticas()
+    atribuicao = AtribuicaoFocos.construir(df_focos, gdf_ucs)
+
+    for recorte in [df_focos, df_focos[df_focos['Estado'] == 'PA'], df_focos.iloc[::7], df_focos.iloc[:0]]:
+        posicoes = atribuicao.posicoes(recorte, gdf_ucs)
+        total, focos_por_uc = atribuicao.contar(posicoes, gdf_ucs)
+        total_esperado, esperado = _contagem_sjoin(recorte, gdf_ucs)
+        assert total == total_esperado
+        pd.testing.assert_frame_equal(focos_por_uc, esperado)
+
+def test_quadro_de_outra_base_nao_reaproveita_a_atribuicao():
+    df_focos, gdf_ucs = _focos_sinteticos(), _ucs_sinteticas()
+    atribuicao = AtribuicaoFocos.construir(df_focos, gdf_ucs)
+
+    # Mesmo índice, outros pontos: um quadro recarregado
+    recarregado = _focos_sinteticos(semente=1)
+    assert atribuicao.posicoes(recarregado, gdf_ucs) is None
+    assert atribuicao.posicoes(pd.concat([df_focos.iloc[:5], df_focos.iloc[:5]]), gdf_ucs) is None
+    assert atribuicao.posicoes(df_focos, gdf_ucs.iloc[1:]) is None
+
+    total, focos_por_uc = obter_focos_por_uc(recarregado, gdf_ucs, atribuicao)
+    total_esperado, esperado = _contagem_sjoin(recarregado, gdf_ucs)
+    assert total == total_esperado
+    pd.testing.assert_frame_equal(focos_por_uc, esperado)
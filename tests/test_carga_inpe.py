@@ -0,0 +1,155 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from processadores import processador_dados
+from processadores.processador_dados import MemoriaInsuficienteError, ProcessadorDados
+
+COLUNAS = ['datahora', 'riscofogo', 'precipitacao', 'municipio', 'diasemchuva', 'latitude', 'longitude']
+
+def _linhas_sinteticas(n=2000, semente=0):
+    rng = np.random.default_rng(semente)
+    municipios = np.array(['BELÉM', 'MARABÁ', 'SANTARÉM', 'NA', '', None, 'SÃO FÉLIX, DO XINGU'], dtype=object)
+    datas = pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, n), unit='s')
+    return pd.DataFrame({
+        'datahora': [d.strftime('%Y-%m-%d %H:%M:%S') for d in datas],
+        'riscofogo': np.round(rng.uniform(0, 1, n), 3),
+        'precipitacao': np.round(rng.uniform(0, 50, n), 2),
+        'municipio': municipios[rng.integers(0, len(municipios), n)],
+        'diasemchuva': rng.integers(0, 120, n),
+        'latitude': np.round(rng.uniform(-10, 2, n), 4),
+        'longitude': np.round(rng.uniform(-58, -46, n), 4)
+    })
+
+def _campo_copy(valor):
+    # Convenções do COPY ... (FORMAT csv): NULL é o campo vazio; texto vazio, vírgulas e aspas vão entre aspas
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        return ''
+    texto = str(valor)
+    if texto == '' or any(c in texto for c in ',"\n\r'):
+        return '"' + texto.replace('"', '""') + '"'
+    return texto
+
+def _csv_copy(linhas: pd.DataFrame) -> io.BytesIO:
+    corpo = [','.join(COLUNAS)]
+    corpo += [','.join(_campo_copy(valor) for valor in linha) for linha in linhas[COLUNAS].itertuples(index=False)]
+    return io.BytesIO(('\n'.join(corpo) + '\n').encode('utf-8'))
+
+def _finalizar(processador, df):
+    # Mesmas etapas finais de carregar_dados_inpe, para os dois caminhos
+    df = processador._otimizar_dataframe(df)
+    return df.dropna(subset=['DataHora', 'mun_corrigido']).reset_index(drop=True)
+
+def _carregar_via_cursor(processador, linhas, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queimadas.db'}")
+    linhas.to_sql('queimadas', engine, index=False)
+    try:
+        return processador._carregar_dados_em_chunks(engine, processador._construir_consulta_espelho(), '1 = 1')
+    finally:
+        engine.dispose()
+
+def _comparar(copy_df, cursor_df):
+    assert list(copy_df.columns) == list(cursor_df.columns)
+    assert len(copy_df) == len(cursor_df)
+    pd.testing.assert_series_equal(copy_df['DataHora'], cursor_df['DataHora'])
+    pd.testing.assert_series_equal(copy_df['mun_corrigido'].astype(str), cursor_df['mun_corrigido'].astype(str))
+    for col in ['RiscoFogo', 'Precipitacao', 'DiaSemChuva', 'Latitude', 'Longitude']:
+        np.testing.assert_allclose(copy_df[col].astype('float64'), cursor_df[col].astype('float64'), rtol=1e-6)
+
+@pytest.mark.parametrize('com_pyarrow', [True, False])
+def test_copy_e_cursor_entregam_o_mesmo_frame(tmp_path, monkeypatch, com_pyarrow):
+    if com_pyarrow and processador_dados.pa_csv is None:
+        pytest.skip('pyarrow indisponível')
+    if not com_pyarrow:
+        monkeypatch.setattr(processador_dados, 'pa_csv', None)
+
+    processador = ProcessadorDados()
+    linhas = _linhas_sinteticas()
+    if not com_pyarrow:
+        # Sem pyarrow o pandas não distingue "" de NULL no CSV: só o caminho Arrow preserva o texto vazio
+        linhas = linhas[linhas['municipio'] != '']
+
+    copy_df = _finalizar(processador, processador._ler_csv_copy(_csv_copy(linhas)))
+    cursor_df = _finalizar(processador, _carregar_via_cursor(processador, linhas, tmp_path))
+    _comparar(copy_df, cursor_df)
+
+def test_copy_descarta_municipio_nulo_e_mantem_texto_literal():
+    processador = ProcessadorDados()
+    linhas = _linhas_sinteticas(n=50)
+    linhas['municipio'] = [None, 'NA', ''] * 16 + ['BELÉM', 'BELÉM']
+
+    df = _finalizar(processador, processador._ler_csv_copy(_csv_copy(linhas)))
+
+    assert len(df) == 50 - 16
+    assert 'NA' in set(df['mun_corrigido'])
+    assert df['mun_corrigido'].notna().all()
+
+def test_carregar_dados_inpe_copy_igual_ao_cursor_no_postgres(tabela_queimadas, monkeypatch):
+    linhas = _linhas_sinteticas(n=5000, semente=1)
+    linhas.assign(datahora=pd.to_datetime(linhas['datahora'])).to_sql(
+        'queimadas', tabela_queimadas, schema='CPT', if_exists='append', index=False
+    )
+    monkeypatch.setattr(processador_dados, 'USAR_ESPELHO_DUCKDB', False)
+    monkeypatch.setattr(processador_dados.GerenciadorBancoDados, 'obter_engine', lambda self: tabela_queimadas)
+
+    processador = ProcessadorDados()
+    # Sem o cursor disponível, uma falha do COPY apareceria aqui em vez de cair no fallback
+    with monkeypatch.context() as contexto:
+        contexto.setattr(ProcessadorDados, '_carregar_dados_em_chunks', lambda *args: pytest.fail('COPY falhou'))
+        copy_df = processador.carregar_dados_inpe(2023, modo='copy').reset_index(drop=True)
+    cursor_df = processador.carregar_dados_inpe(2023, modo='cursor').reset_index(drop=True)
+
+    assert len(copy_df) == linhas['municipio'].notna().sum()
+    _comparar(copy_df, cursor_df)
+
+def _engine_sqlite(linhas, tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'queimadas.db'}")
+    linhas.to_sql('queimadas', engine, index=False)
+    return engine
+
+def test_limite_de_memoria_interrompe_com_erro(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(processador_dados, 'TAMANHO_CHUNK', 100)
+    monkeypatch.setattr(ProcessadorDados, '_verificar_uso_memoria', lambda self: False)
+    processador = ProcessadorDados()
+    engine = _engine_sqlite(_linhas_sinteticas(n=1000), tmp_path)
+    try:
+        chunks = processador._iterar_chunks(engine, processador._construir_consulta_espelho(), '1 = 1')
+        assert len(next(chunks)) == 100
+        with pytest.raises(MemoriaInsuficienteError):
+            next(chunks)
+
+        # A carga completa não devolve o pedaço já lido como se fosse a tabela inteira
+        assert processador._carregar_dados_em_chunks(engine, processador._construir_consulta_espelho(), '1 = 1') is None
+        assert 'Carga dos focos descartada' in caplog.text
+    finally:
+        engine.dispose()
+
+def test_erro_de_leitura_fica_registrado(tmp_path, caplog):
+    processador = ProcessadorDados()
+    engine = _engine_sqlite(_linhas_sinteticas(n=10), tmp_path)
+    try:
+        assert processador._carregar_dados_em_chunks(engine, 'SELECT * FROM tabela_inexistente', '1 = 1') is None
+    finally:
+        engine.dispose()
+    assert 'Falha na leitura dos focos pelo cursor' in caplog.text
+
+def test_modo_explicito_nao_passa_pelo_espelho(tmp_path, monkeypatch):
+    linhas = _linhas_sinteticas(n=500, semente=2)
+    engine = _engine_sqlite(linhas, tmp_path)
+    monkeypatch.setattr(processador_dados.GerenciadorBancoDados, 'obter_engine', lambda self: engine)
+    monkeypatch.setattr(ProcessadorDados, '_construir_consulta_base', ProcessadorDados._construir_consulta_espelho)
+    monkeypatch.setattr(ProcessadorDados, '_carregar_do_espelho', lambda self, ano=None: pytest.fail('espelho consultado'))
+    try:
+        df = ProcessadorDados().carregar_dados_inpe(None, modo='cursor')
+    finally:
+        engine.dispose()
+
+    assert len(df) == linhas['municipio'].notna().sum()
+
+def test_sem_modo_o_espelho_responde_primeiro(monkeypatch):
+    esperado = pd.DataFrame({'DataHora': [pd.Timestamp('2023-01-01')], 'mun_corrigido': ['BELÉM']})
+    monkeypatch.setattr(ProcessadorDados, '_carregar_do_espelho', lambda self, ano=None: esperado)
+    monkeypatch.setattr(processador_dados.GerenciadorBancoDados, 'obter_engine', lambda self: pytest.fail('Postgres consultado'))
+
+    assert ProcessadorDados().carregar_dados_inpe(2023) is esperado
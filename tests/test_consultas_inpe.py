@@ -0,0 +1,103 @@
+from datetime import datetime
+from pathlib import Path
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from configuracoes.config import LIMITES_INPE
+from processadores.consultas_inpe import explicar_consulta_inpe, montar_filtros_inpe, plano_usa_indice
+from utilitarios import dados_auxiliares
+
+BOOTSTRAP_SQL = Path(__file__).resolve().parent.parent / 'sql' / 'bootstrap_inpe.sql'
+
+def test_ano_vira_intervalo_semiaberto_parametrizado():
+    clausula, parametros = montar_filtros_inpe(2023)
+
+    assert 'EXTRACT' not in clausula.upper()
+    assert 'datahora >= :inicio' in clausula and 'datahora < :fim' in clausula
+    assert parametros['inicio'] == datetime(2023, 1, 1)
+    assert parametros['fim'] == datetime(2024, 1, 1)
+
+@pytest.mark.parametrize('estilo,marcador', [('sqlalchemy', ':lat_min'), ('psycopg2', '%(lat_min)s'), ('duckdb', '$lat_min')])
+def test_caixa_vem_de_limites_inpe(estilo, marcador):
+    clausula, parametros = montar_filtros_inpe(estilo=estilo)
+
+    assert marcador in clausula
+    lon_min, lat_min, lon_max, lat_max = LIMITES_INPE
+    assert (parametros['lon_min'], parametros['lat_min'], parametros['lon_max'], parametros['lat_max']) == LIMITES_INPE
+    assert str(lat_min) not in clausula and str(lon_min) not in clausula
+
+def test_resumo_usa_os_filtros_do_construtor():
+    consulta, parametros = dados_auxiliares._consulta_estatisticas_resumo('queimadas', 'duckdb')
+
+    assert 'BETWEEN -15 AND 5' not in consulta and 'BETWEEN -60 AND -45' not in consulta
+    assert '$lat_min' in consulta
+    assert parametros == montar_filtros_inpe(estilo='duckdb')[1]
+
+def test_resumo_executa_no_duckdb():
+    conexao = duckdb.connect()
+    conexao.execute("""
+        CREATE TABLE queimadas AS SELECT * FROM (VALUES
+            (TIMESTAMP '2023-01-01 10:00', 0.5, 1.0, 'BELÉM', 3, -1.4, -48.5),
+            (TIMESTAMP '2023-06-01 10:00', 0.7, 0.0, 'MARABÁ', 9, -5.4, -49.1),
+            (TIMESTAMP '2023-07-01 10:00', 0.9, 0.0, 'FORA', 9, 10.0, -49.1),
+            (TIMESTAMP '2023-08-01 10:00', 1.5, 0.0, 'INVÁLIDO', 9, -5.4, -49.1)
+        ) AS t(datahora, riscofogo, precipitacao, municipio, diasemchuva, latitude, longitude)
+    """)
+    resultado = conexao.execute(*dados_auxiliares._consulta_estatisticas_resumo('queimadas', 'duckdb')).fetchone()
+    resumo = dados_auxiliares._montar_estatisticas_resumo(resultado)
+
+    assert resumo['total_registros'] == 2
+    assert resumo['total_municipios'] == 2
+    assert resumo['risco_medio'] == pytest.approx(0.6)
+
+@pytest.fixture
+def queimadas_indexadas(tabela_queimadas):
+    # 20 anos de focos: um ano é ~5% da tabela, faixa em que o planner escolhe o índice
+    with tabela_queimadas.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO "CPT".queimadas
+            SELECT
+                timestamp '2005-01-01' + random() * interval '20 years',
+                random(),
+                random() * 50,
+                'MUNICIPIO ' || (random() * 143)::int,
+                (random() * 120)::int,
+                -15 + random() * 20,
+                -60 + random() * 15
+            FROM generate_series(1, 200000)
+        """))
+    conexao = tabela_queimadas.raw_connection()
+    try:
+        with conexao.cursor() as cursor:
+            cursor.execute(BOOTSTRAP_SQL.read_text(encoding='utf-8'))
+        conexao.commit()
+    finally:
+        conexao.close()
+    return tabela_queimadas
+
+def test_plano_do_ano_usa_indice_em_datahora(queimadas_indexadas):
+    plano = explicar_consulta_inpe(queimadas_indexadas, 2023)
+    assert plano_usa_indice(plano), '\n'.join(plano)
+
+def test_extract_year_nao_usaria_o_indice(queimadas_indexadas):
+    # Referência do que a conversão evita: a função sobre a coluna impede o uso do btree
+    with queimadas_indexadas.connect() as conn:
+        plano = [linha[0] for linha in conn.execute(text(
+            'EXPLAIN SELECT datahora FROM "CPT".queimadas WHERE EXTRACT(YEAR FROM datahora) = 2023'
+        )).fetchall()]
+    assert not plano_usa_indice(plano), '\n'.join(plano)
+
+def test_resumo_no_postgres_confere_com_pandas(queimadas_indexadas):
+    consulta, parametros = dados_auxiliares._consulta_estatisticas_resumo('"CPT".queimadas')
+    with queimadas_indexadas.connect() as conn:
+        resumo = dados_auxiliares._montar_estatisticas_resumo(conn.execute(text(consulta), parametros).fetchone())
+        df = pd.read_sql(text('SELECT * FROM "CPT".queimadas'), conn)
+
+    lon_min, lat_min, lon_max, lat_max = LIMITES_INPE
+    validos = df[df['riscofogo'].between(0, 1) & (df['precipitacao'] >= 0) & (df['diasemchuva'] >= 0)
+                 & df['latitude'].between(lat_min, lat_max) & df['longitude'].between(lon_min, lon_max)]
+    assert resumo['total_registros'] == len(validos)
+    assert float(resumo['risco_medio']) == pytest.approx(validos['riscofogo'].mean())
+    assert np.isclose(float(resumo['precip_media']), validos['precipitacao'].mean())
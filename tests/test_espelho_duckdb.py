@@ -0,0 +1,120 @@
+import threading
+import time
+import pandas as pd
+import pytest
+from sqlalchemy import text
+from processadores import espelho_duckdb
+from processadores.espelho_duckdb import EspelhoDuckDB
+
+def _aguardar_sincronizacao():
+    for thread in threading.enumerate():
+        if thread.name == 'sincronizacao_espelho':
+            thread.join(timeout=5)
+
+@pytest.fixture
+def espelho(tmp_path, monkeypatch):
+    espelho = EspelhoDuckDB(str(tmp_path / 'espelho.duckdb'))
+    monkeypatch.setattr(espelho, 'sincronizar_cpt', lambda: 0)
+    yield espelho
+    _aguardar_sincronizacao()
+
+def test_primeira_copia_nao_bloqueia_a_pagina(espelho, monkeypatch):
+    liberar = threading.Event()
+
+    def copia_lenta(completa=False):
+        liberar.wait(5)
+        espelho._cursor().execute("CREATE TABLE queimadas AS SELECT TIMESTAMP '2023-01-01' AS datahora")
+        return 1
+
+    monkeypatch.setattr(espelho, 'sincronizar_queimadas', copia_lenta)
+    inicio = time.perf_counter()
+    assert espelho.preparar_queimadas() is False
+    # Chamadas durante a cópia também voltam na hora, sem disparar outra thread
+    assert espelho.preparar_queimadas() is False
+    assert time.perf_counter() - inicio < 1
+    assert sum(thread.name == 'sincronizacao_espelho' for thread in threading.enumerate()) == 1
+
+    liberar.set()
+    _aguardar_sincronizacao()
+    assert espelho.preparar_queimadas() is True
+
+def test_falha_espera_antes_de_tentar_de_novo(espelho, monkeypatch):
+    tentativas = []
+
+    def banco_fora_do_ar(completa=False):
+        tentativas.append(time.time())
+        raise ConnectionError('servidor indisponível')
+
+    monkeypatch.setattr(espelho, 'sincronizar_queimadas', banco_fora_do_ar)
+    for _ in range(5):
+        assert espelho.preparar_queimadas() is False
+        _aguardar_sincronizacao()
+    assert len(tentativas) == 1
+    assert espelho.sincronizar(forcar=True) is False
+    assert len(tentativas) == 1
+
+    # Passada a espera, a cópia volta a ser tentada
+    monkeypatch.setattr(espelho, '_ultima_falha', time.time() - espelho_duckdb.ESPERA_APOS_FALHA_ESPELHO - 1)
+    espelho.preparar_queimadas()
+    _aguardar_sincronizacao()
+    assert len(tentativas) == 2
+
+def test_abertura_que_falha_espera_antes_de_tentar_de_novo(monkeypatch):
+    tentativas = []
+
+    def arquivo_travado():
+        tentativas.append(time.time())
+        raise OSError('arquivo em uso por outro processo')
+
+    monkeypatch.setattr(espelho_duckdb, '_espelho', None)
+    monkeypatch.setattr(espelho_duckdb, '_falha_abertura', 0.0)
+    monkeypatch.setattr(espelho_duckdb, 'EspelhoDuckDB', arquivo_travado)
+    for _ in range(5):
+        assert espelho_duckdb.obter_espelho() is None
+    assert len(tentativas) == 1
+
+    monkeypatch.setattr(espelho_duckdb, '_falha_abertura', time.time() - espelho_duckdb.ESPERA_APOS_FALHA_ESPELHO - 1)
+    assert espelho_duckdb.obter_espelho() is None
+    assert len(tentativas) == 2
+
+def _contagens(espelho, engine):
+    with engine.connect() as conn:
+        remoto = conn.execute(text('SELECT COUNT(*), SUM(riscofogo) FROM "CPT".queimadas')).fetchone()
+    local = espelho._cursor().execute("SELECT COUNT(*), SUM(riscofogo) FROM queimadas").fetchone()
+    return tuple(remoto), tuple(local)
+
+@pytest.fixture
+def espelho_postgres(espelho, tabela_queimadas, monkeypatch):
+    pd.DataFrame({
+        'datahora': pd.date_range('2023-01-01', periods=500, freq='D'),
+        'riscofogo': 0.5, 'precipitacao': 1.0, 'municipio': 'BELÉM', 'diasemchuva': 3,
+        'latitude': -1.4, 'longitude': -48.5
+    }).to_sql('queimadas', tabela_queimadas, schema='CPT', if_exists='append', index=False)
+    monkeypatch.setattr(espelho.gerenciador_bd, 'obter_engine', lambda: tabela_queimadas)
+    espelho.sincronizar_queimadas()
+    return espelho, tabela_queimadas
+
+def test_linhas_apagadas_antes_da_marca_chegam_ao_espelho(espelho_postgres):
+    espelho, engine = espelho_postgres
+    with engine.begin() as conn:
+        conn.execute(text('DELETE FROM "CPT".queimadas WHERE datahora < \'2023-03-01\''))
+
+    espelho.sincronizar_queimadas()
+    remoto, local = _contagens(espelho, engine)
+    assert local == remoto
+
+def test_correcao_antiga_chega_na_recopia_integral(espelho_postgres, monkeypatch):
+    espelho, engine = espelho_postgres
+    with engine.begin() as conn:
+        conn.execute(text('UPDATE "CPT".queimadas SET riscofogo = 0.9 WHERE datahora < \'2023-03-01\''))
+
+    # A contagem não muda: a cópia incremental não vê a correção
+    espelho.sincronizar()
+    remoto, local = _contagens(espelho, engine)
+    assert local[0] == remoto[0] and local[1] != pytest.approx(remoto[1])
+
+    monkeypatch.setattr(espelho, '_ultima_sincronizacao_completa',
+                        time.time() - espelho_duckdb.INTERVALO_SINCRONIZACAO_COMPLETA_ESPELHO - 1)
+    assert espelho.sincronizar(forcar=True) is True
+    remoto, local = _contagens(espelho, engine)
+    assert local[0] == remoto[0] and local[1] == pytest.approx(remoto[1])
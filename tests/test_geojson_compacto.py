@@ -0,0 +1,83 @@
+import json
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+from configuracoes.config import CASAS_DECIMAIS_MAPA
+from utilitarios.camadas_mapa import PiramideGeometrias
+from utilitarios.geojson_compacto import codificar_geojson, geojson_compacto
+
+def _camada(n=40, semente=0) -> gpd.GeoDataFrame:
+    rng = np.random.default_rng(semente)
+    x, y = rng.uniform(-56, -48, n), rng.uniform(-9, -1, n)
+    geometrias = list(shapely.buffer(shapely.points(x, y), rng.uniform(0.01, 0.3, n), quad_segs=16))
+    geometrias[0] = shapely.Polygon([(-55, -8), (-50, -8), (-50, -3), (-55, -3)],
+                                    [[(-54.123456789, -7), (-51, -7), (-51, -4), (-54, -4)]])
+    geometrias[1] = shapely.MultiPolygon([shapely.box(-50.5, -2, -49.5, -1), shapely.box(-49, -2, -48, -1)])
+    geometrias[2] = None
+    return gpd.GeoDataFrame({'nome_uc': [f'UC "{i}" – São Félix' for i in range(n)], 'area_ha': rng.uniform(0, 1e5, n)},
+                            geometry=geometrias, crs='EPSG:4326', index=[f'uc{i}' for i in range(n - 1)] + [99])
+
+def _arredondar(coordenadas):
+    # Referência: as coordenadas de __geo_interface__ arredondadas como o mapa as recebe
+    if isinstance(coordenadas, (tuple, list)) and coordenadas and isinstance(coordenadas[0], (int, float)):
+        return [round(float(valor), CASAS_DECIMAIS_MAPA) for valor in coordenadas]
+    return [_arredondar(parte) for parte in coordenadas]
+
+def _comparar_com_geo_interface(codificado: dict, gdf: gpd.GeoDataFrame):
+    referencia = gdf.geometry.__geo_interface__
+    assert codificado['type'] == 'FeatureCollection'
+    assert len(codificado['features']) == len(referencia['features'])
+    for feature, esperada in zip(codificado['features'], referencia['features']):
+        assert feature['id'] == esperada['id']
+        if esperada['geometry'] is None:
+            assert feature['geometry'] is None
+            continue
+        assert feature['geometry']['type'] == esperada['geometry']['type']
+        assert feature['geometry']['coordinates'] == _arredondar(esperada['geometry']['coordinates'])
+
+def test_geometrias_e_ids_iguais_ao_geo_interface():
+    camada = _camada()
+    codificado = json.loads(codificar_geojson(camada))
+
+    _comparar_com_geo_interface(codificado, camada)
+    assert all(feature['properties'] == {} for feature in codificado['features'])
+    # Os ids continuam casando com as locations do Plotly, que vêm do índice
+    assert [feature['id'] for feature in codificado['features']] == [str(rotulo) for rotulo in camada.index]
+
+def test_camada_projetada_volta_para_graus():
+    camada = _camada()
+    projetada = camada.to_crs('EPSG:5880')
+
+    _comparar_com_geo_interface(json.loads(codificar_geojson(projetada)), projetada.to_crs('EPSG:4326'))
+
+def test_so_as_propriedades_pedidas():
+    camada = _camada()
+    codificado = json.loads(codificar_geojson(camada, ['nome_uc', 'inexistente']))
+
+    assert [feature['properties'] for feature in codificado['features']] == camada[['nome_uc']].to_dict('records')
+
+@pytest.mark.parametrize('casas', [3, CASAS_DECIMAIS_MAPA])
+def test_precisao_limita_o_tamanho(casas):
+    camada = _camada()
+    compacto = codificar_geojson(camada, casas=casas)
+    completo = json.dumps(camada.geometry.__geo_interface__)
+
+    assert len(compacto) < len(completo)
+    coordenadas = shapely.get_coordinates(gpd.read_file(compacto).geometry.values)
+    assert np.array_equal(coordenadas, np.round(coordenadas, casas))
+
+def test_cache_por_nivel_da_piramide():
+    camada = _camada(semente=3)
+    piramide = PiramideGeometrias(camada)
+
+    # Zooms que caem no mesmo nível dividem o objeto; outro nível codifica de novo
+    assert piramide.tolerancia(6) == piramide.tolerancia(7)
+    assert geojson_compacto(camada, 'teste', 6, piramide) is geojson_compacto(camada, 'teste', 7, piramide)
+    assert geojson_compacto(camada, 'teste', 10, piramide) is not geojson_compacto(camada, 'teste', 7, piramide)
+    # Um recorte tem a própria entrada
+    recorte = geojson_compacto(camada.iloc[:5], 'teste', 7, piramide)
+    assert [feature['id'] for feature in recorte['features']] == [str(rotulo) for rotulo in camada.index[:5]]
+
+    sem_piramide = geojson_compacto(camada, 'teste', 7)
+    _comparar_com_geo_interface(sem_piramide, camada)
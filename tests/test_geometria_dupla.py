@@ -0,0 +1,83 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+from configuracoes.config import CRS_PROJETADO, COLUNA_GEOMETRIA_PROJETADA
+from processadores.registro_dados import Camada, RegistroDados
+from utilitarios.geometria_dupla import (adicionar_geometria_projetada, geometria_projetada, projetar,
+                                         somente_geografica)
+
+def _camada(n=30, deslocamento=0.0, semente=0) -> gpd.GeoDataFrame:
+    rng = np.random.default_rng(semente)
+    x, y = rng.uniform(-56, -48, n) + deslocamento, rng.uniform(-9, -1, n)
+    geometrias = shapely.buffer(shapely.points(x, y), rng.uniform(0.01, 0.3, n))
+    geometrias[3] = None
+    return gpd.GeoDataFrame({'nome_uc': [f'UC {i:02d}' for i in range(n)], 'area_ha': rng.uniform(0, 1e5, n)},
+                            geometry=geometrias, crs='EPSG:4326')
+
+def _sem_reprojecao(monkeypatch):
+    monkeypatch.setattr(gpd.GeoSeries, 'to_crs', lambda *args, **kwargs: pytest.fail('geometria reprojetada'))
+
+def _assert_igual_a_to_crs(projetada: gpd.GeoSeries, gdf: gpd.GeoDataFrame):
+    # Referência: o to_crs que cada análise fazia antes sobre a própria fatia
+    esperada = gdf.geometry.to_crs(CRS_PROJETADO)
+    assert projetada.crs == CRS_PROJETADO
+    assert projetada.index.equals(gdf.index)
+    assert (projetada.geom_equals_exact(esperada, tolerance=1e-6) | (projetada.isna() & esperada.isna())).all()
+
+def test_recortes_trazem_a_projecao_alinhada(monkeypatch):
+    camada = adicionar_geometria_projetada(_camada())
+    assert camada.geometry.crs == 'EPSG:4326'
+    recortes = [camada, camada[camada['area_ha'] > 5e4], camada.iloc[::-3], camada.sample(frac=1, random_state=0)]
+    esperados = [gpd.GeoDataFrame(somente_geografica(recorte)) for recorte in recortes]
+
+    _sem_reprojecao(monkeypatch)
+    projetadas = [geometria_projetada(recorte) for recorte in recortes]
+    monkeypatch.undo()
+    for projetada, esperado in zip(projetadas, esperados):
+        _assert_igual_a_to_crs(projetada, esperado)
+
+def test_concatenacao_projeta_so_as_linhas_novas(monkeypatch):
+    com_projecao = adicionar_geometria_projetada(_camada())
+    sem_projecao = _camada(n=10, deslocamento=1, semente=1)
+    combinada = pd.concat([com_projecao, sem_projecao], ignore_index=True)
+
+    # Sem a etapa de normalização a geometria é reprojetada inteira, nunca lida pela metade
+    _assert_igual_a_to_crs(geometria_projetada(combinada), combinada)
+
+    reprojetadas = []
+    original = gpd.GeoSeries.to_crs
+    monkeypatch.setattr(gpd.GeoSeries, 'to_crs', lambda serie, *args, **kwargs: reprojetadas.append(len(serie))
+                        or original(serie, *args, **kwargs))
+    normalizada = adicionar_geometria_projetada(combinada)
+    assert reprojetadas == [9]
+    _assert_igual_a_to_crs(normalizada[COLUNA_GEOMETRIA_PROJETADA], normalizada)
+
+def test_projetar_equivale_a_to_crs():
+    camada = adicionar_geometria_projetada(_camada())
+    esperado = somente_geografica(camada).to_crs(CRS_PROJETADO)
+
+    projetada = projetar(camada)
+    assert list(projetada.columns) == list(esperado.columns)
+    assert projetada.geometry.name == 'geometry' and projetada.crs == CRS_PROJETADO
+    _assert_igual_a_to_crs(projetada.geometry, somente_geografica(camada))
+    assert list(projetar(camada, ['nome_uc']).columns) == ['nome_uc', 'geometry']
+
+def test_registro_materializa_a_projecao_uma_vez(monkeypatch):
+    leituras = []
+
+    def ler():
+        leituras.append(1)
+        return _camada()
+
+    registro = RegistroDados()
+    registro.registrar(Camada('ucs', ler, normalizacao=[adicionar_geometria_projetada]))
+    camada = registro.obter('ucs')
+    assert COLUNA_GEOMETRIA_PROJETADA in camada.columns
+
+    _sem_reprojecao(monkeypatch)
+    assert registro.obter('ucs') is camada and len(leituras) == 1
+    geometria_projetada(camada[camada['area_ha'] > 1e4])
+    # A serialização para o mapa só leva a geometria geográfica
+    assert somente_geografica(camada).geometry.__geo_interface__['features'][0]['geometry']['type'] == 'Polygon'
@@ -0,0 +1,45 @@
+import geopandas as gpd
+import pandas as pd
+import shapely
+import pytest
+from processadores.registro_dados import Camada, RegistroDados
+from utilitarios import impressao_digital
+from utilitarios.impressao_digital import CHAVE_VERSAO_DADOS, definir_versao_dados, impressao_digital_gdf
+
+def _camada(n=50, deslocamento=0.0) -> gpd.GeoDataFrame:
+    x = [float(i) + deslocamento for i in range(n)]
+    return gpd.GeoDataFrame({'ESTADO': ['PARÁ'] * n, 'nome_uc': [f'UC {i}' for i in range(n)]},
+                            geometry=shapely.box(x, 0, [v + 1 for v in x], 1), crs='EPSG:4326')
+
+def _sem_wkb(monkeypatch):
+    monkeypatch.setattr(impressao_digital.shapely, 'to_wkb', lambda *args, **kwargs: pytest.fail('geometria serializada'))
+
+def test_com_versao_nao_serializa_geometrias(monkeypatch):
+    camada = definir_versao_dados(_camada(), 'v1')
+    _sem_wkb(monkeypatch)
+
+    impressao = impressao_digital_gdf(camada, geometria=True)
+    # Recortes herdam a versão: o índice distingue cada um
+    assert impressao_digital_gdf(camada[camada.index < 10], geometria=True) != impressao
+    assert impressao_digital_gdf(camada.copy(), geometria=True) == impressao
+    assert impressao_digital_gdf(definir_versao_dados(_camada(), 'v2'), geometria=True) != impressao
+
+def test_sem_versao_a_geometria_entra_na_impressao():
+    assert impressao_digital_gdf(_camada(), geometria=True) == impressao_digital_gdf(_camada(), geometria=True)
+    assert impressao_digital_gdf(_camada(), geometria=True) != impressao_digital_gdf(_camada(deslocamento=0.5), geometria=True)
+
+def test_registro_versiona_camadas_derivadas(monkeypatch):
+    registro = RegistroDados()
+    registro.registrar(Camada('a', lambda: definir_versao_dados(_camada(), 'va')))
+    registro.registrar(Camada('b', lambda: definir_versao_dados(_camada(deslocamento=100), 'vb')))
+    # Versões diferentes: o concat descarta attrs e a derivada sairia sem versão
+    registro.registrar(Camada('ab', lambda a, b: pd.concat([a, b], ignore_index=True), dependencias=['a', 'b']))
+
+    combinada = registro.obter('ab')
+    assert combinada.attrs[CHAVE_VERSAO_DADOS].startswith('ab@')
+    assert registro.obter('a').attrs[CHAVE_VERSAO_DADOS] == 'va'
+
+    # Uma nova materialização recebe outra versão, e a chave de cache muda junto
+    impressao = impressao_digital_gdf(combinada, geometria=True)
+    registro.registrar(registro._camadas['ab'])
+    assert impressao_digital_gdf(registro.obter('ab'), geometria=True) != impressao
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processadores.normalizador_estados import (SIGLAS_ESTADOS, mapear_unicos, normalizar_estado,
+                                                normalizar_estado_tolerante, normalizar_serie_estados)
+
+# Referências: as funções linha a linha que o normalizador substituiu, copiadas como estavam
+_SIGLAS_ANTIGAS = {
+    'AC': 'Acre', 'AL': 'Alagoas', 'AP': 'Amapá', 'AM': 'Amazonas',
+    'BA': 'Bahia', 'CE': 'Ceará', 'DF': 'Distrito Federal',
+    'ES': 'Espírito Santo', 'GO': 'Goiás', 'MA': 'Maranhão',
+    'MT': 'Mato Grosso', 'MS': 'Mato Grosso do Sul', 'MG': 'Minas Gerais',
+    'PA': 'Pará', 'PB': 'Paraíba', 'PR': 'Paraná', 'PE': 'Pernambuco',
+    'PI': 'Piauí', 'RJ': 'Rio de Janeiro', 'RN': 'Rio Grande do Norte',
+    'RS': 'Rio Grande do Sul', 'RO': 'Rondônia', 'RR': 'Roraima',
+    'SC': 'Santa Catarina', 'SP': 'São Paulo', 'SE': 'Sergipe',
+    'TO': 'Tocantins'
+}
+
+_CORRECOES_ANTIGAS = {
+    'PARA': 'Pará', 'CEARA': 'Ceará', 'ESPIRITO SANTO': 'Espírito Santo',
+    'GOIAS': 'Goiás', 'MARANHAO': 'Maranhão', 'PARAIBA': 'Paraíba',
+    'PARANA': 'Paraná', 'PIAUI': 'Piauí', 'RONDONIA': 'Rondônia',
+    'SAO PAULO': 'São Paulo'
+}
+
+def _normalizar_estado_antigo(sigla):
+    mapa_estados = {**_SIGLAS_ANTIGAS, **{nome.upper(): nome for nome in _SIGLAS_ANTIGAS.values()}}
+    if pd.isna(sigla):
+        return None
+    return mapa_estados.get(str(sigla).strip().upper(), None)
+
+def _clean_state_data_antigo(estado_value):
+    if pd.isna(estado_value):
+        return None
+    estado_str = str(estado_value).strip().upper()
+    if estado_str in ['UF', 'NAN', 'NONE', 'NULL', '']:
+        return None
+    if estado_str.isdigit():
+        return None
+    if any(char.isdigit() for char in estado_str):
+        return None
+    if not all(char.isalpha() or char.isspace() for char in estado_str):
+        return None
+    if len(estado_str.replace(' ', '')) < 2:
+        return None
+    if estado_str in _SIGLAS_ANTIGAS:
+        return _SIGLAS_ANTIGAS[estado_str]
+    for nome_completo in _SIGLAS_ANTIGAS.values():
+        if estado_str == nome_completo.upper():
+            return nome_completo
+    if estado_str in _CORRECOES_ANTIGAS:
+        return _CORRECOES_ANTIGAS[estado_str]
+    for nome_valido in _SIGLAS_ANTIGAS.values():
+        if estado_str == nome_valido.upper() or estado_str.replace(' ', '') == nome_valido.upper().replace(' ', ''):
+            return nome_valido
+    return None
+
+def _valores_estados(n=5000, semente=0) -> pd.Series:
+    rng = np.random.default_rng(semente)
+    nomes = list(SIGLAS_ESTADOS.values())
+    base = (list(SIGLAS_ESTADOS) + nomes + [nome.upper() for nome in nomes] + [nome.lower() for nome in nomes]
+            + list(_CORRECOES_ANTIGAS) + [nome.upper().replace(' ', '') for nome in nomes]
+            + ['UF', 'NULL', 'nan', 'None', '', ' ', 'P', 'PA1', '15', 'P.A', 'MATO-GROSSO', 'Pará/PA', 'XX'])
+    valores = rng.choice(np.array(base, dtype=object), n)
+    # Espaços nas pontas, caixa misturada e nulos
+    preenchidos = rng.random(n) < 0.2
+    valores[preenchidos] = ['  ' + str(v) + '\t' for v in valores[preenchidos]]
+    trocados = rng.random(n) < 0.1
+    valores[trocados] = [str(v).swapcase() for v in valores[trocados]]
+    valores[rng.random(n) < 0.05] = None
+    valores[rng.random(n) < 0.05] = np.nan
+    return pd.Series(valores, index=pd.RangeIndex(10, 10 + n) * 3, name='ESTADO')
+
+@pytest.mark.parametrize('semente', [0, 1])
+def test_serie_estrita_igual_a_funcao_antiga(semente):
+    serie = _valores_estados(semente=semente)
+    esperado = serie.apply(_normalizar_estado_antigo)
+
+    obtido = normalizar_serie_estados(serie)
+    pd.testing.assert_series_equal(obtido, esperado.astype(object))
+    assert [normalizar_estado(valor) for valor in serie] == esperado.tolist()
+
+@pytest.mark.parametrize('semente', [0, 1])
+def test_serie_tolerante_igual_a_limpeza_antiga_da_cpt(semente):
+    serie = _valores_estados(semente=semente)
+    esperado = serie.apply(_clean_state_data_antigo)
+
+    obtido = normalizar_serie_estados(serie, tolerante=True)
+    pd.testing.assert_series_equal(obtido, esperado.astype(object))
+    assert [normalizar_estado_tolerante(valor) for valor in serie] == esperado.tolist()
+
+@pytest.mark.parametrize('tolerante', [False, True])
+def test_entrada_categorica_igual_a_texto(tolerante):
+    serie = _valores_estados(n=1000, semente=2)
+    categorica = serie.astype('category')
+
+    obtido = normalizar_serie_estados(categorica, tolerante=tolerante)
+    pd.testing.assert_series_equal(obtido, normalizar_serie_estados(serie, tolerante=tolerante))
+    assert obtido.dtype == object
+
+def test_nulos_e_espacos():
+    serie = pd.Series([None, np.nan, pd.NA, ' pa ', 'pará', '\tMATO GROSSO\n', 'matogrosso'])
+
+    assert normalizar_serie_estados(serie).tolist() == [None, None, None, 'Pará', 'Pará', 'Mato Grosso', None]
+    assert normalizar_serie_estados(serie, tolerante=True).tolist()[-1] == 'Mato Grosso'
+
+def test_cada_valor_distinto_e_normalizado_uma_vez():
+    chamadas = []
+
+    def contar(valor):
+        chamadas.append(valor)
+        return valor
+
+    serie = pd.Series(['PA', 'MT', None, 'PA', 'MT', None] * 100)
+    mapear_unicos(serie, contar)
+    # Um por valor distinto e um para os nulos
+    assert len(chamadas) == 3
+
+def test_serie_vazia():
+    obtido = normalizar_serie_estados(pd.Series([], dtype=object, name='ESTADO'))
+    assert obtido.empty and obtido.name == 'ESTADO'
@@ -0,0 +1,71 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+from configuracoes.config import NIVEIS_PIRAMIDE
+from utilitarios.camadas_mapa import PiramideGeometrias, geometrias_para_zoom, tolerancia_para_zoom
+
+def _camada_detalhada(n=30, semente=0) -> gpd.GeoDataFrame:
+    # Contornos com muitos vértices pequenos, como os limites de UCs digitalizados
+    rng = np.random.default_rng(semente)
+    angulos = np.linspace(0, 2 * np.pi, 2000, endpoint=False)
+    geometrias = []
+    for cx, cy in zip(rng.uniform(-56, -48, n), rng.uniform(-9, -1, n)):
+        raio = 0.3 + 0.01 * rng.standard_normal(len(angulos))
+        geometrias.append(shapely.Polygon(np.column_stack([cx + raio * np.cos(angulos), cy + raio * np.sin(angulos)])))
+    return gpd.GeoDataFrame({'nome_uc': [f'UC {i:02d}' for i in range(n)]}, geometry=geometrias, crs='EPSG:4326',
+                            index=np.arange(n) * 3 + 1)
+
+@pytest.mark.parametrize('zoom,esperado', [(3, 0.008), (5, 0.008), (6, 0.002), (7, 0.002), (8, 0.0005),
+                                           (9, 0.0005), (10, 0.0001), (11, 0.0001), (12, None), (16, None)])
+def test_tolerancia_escolhida_pelo_zoom(zoom, esperado):
+    piramide = PiramideGeometrias(_camada_detalhada(n=2))
+    assert piramide.tolerancia(zoom) == esperado
+
+@pytest.mark.parametrize('zoom', np.arange(0, 16, 0.5))
+def test_nivel_mais_simplificado_abaixo_de_um_pixel(zoom):
+    piramide = PiramideGeometrias(_camada_detalhada(n=2))
+    tolerancia = piramide.tolerancia(zoom)
+    limite = tolerancia_para_zoom(zoom)
+
+    acima = [nivel for nivel in NIVEIS_PIRAMIDE if nivel > limite]
+    abaixo = [nivel for nivel in NIVEIS_PIRAMIDE if nivel <= limite]
+    assert tolerancia == (max(abaixo) if abaixo else None)
+    # Aproximar o mapa nunca troca por um nível mais grosseiro
+    assert all(nivel > (tolerancia or 0) for nivel in acima)
+    assert piramide.tolerancia(zoom + 0.5) is None or piramide.tolerancia(zoom + 0.5) <= tolerancia
+
+def test_niveis_ficam_dentro_da_tolerancia_e_perdem_vertices():
+    camada = _camada_detalhada(n=4)
+    piramide = PiramideGeometrias(camada)
+    exatas = np.asarray(camada.geometry.values)
+
+    vertices = piramide.vertices().set_index('nivel')['vertices']
+    assert vertices.is_monotonic_decreasing
+    for tolerancia, geometrias in piramide.niveis.items():
+        # Preservar a topologia pode passar um pouco da tolerância; a folga de zoom cobre esse excesso
+        assert (shapely.hausdorff_distance(exatas, geometrias) <= 2 * tolerancia).all()
+        assert shapely.is_valid(geometrias).all()
+
+def test_recorte_da_camada_usa_o_nivel_pronto(monkeypatch):
+    camada = _camada_detalhada()
+    piramide = PiramideGeometrias(camada)
+    recorte = camada.iloc[[7, 2, 11]]
+
+    monkeypatch.setattr(shapely, 'simplify', lambda *args, **kwargs: pytest.fail('simplificado de novo'))
+    simplificada = geometrias_para_zoom(recorte, 8, piramide)
+    assert simplificada.index.equals(recorte.index)
+    assert all(a is b for a, b in zip(simplificada.geometry.values, piramide.niveis[0.0005][[7, 2, 11]]))
+    # Perto o bastante, as geometrias exatas vão para o mapa
+    assert all(a is b for a, b in zip(geometrias_para_zoom(recorte, 14, piramide).geometry.values, recorte.geometry.values))
+
+def test_camada_recarregada_e_simplificada_na_hora():
+    camada = _camada_detalhada()
+    piramide = PiramideGeometrias(camada)
+    # Mesmos rótulos, outros objetos de geometria
+    recarregada = _camada_detalhada(semente=1)
+
+    simplificada = geometrias_para_zoom(recarregada, 8, piramide)
+    esperado = shapely.simplify(np.asarray(recarregada.geometry.values), 0.0005, preserve_topology=True)
+    assert shapely.equals_exact(np.asarray(simplificada.geometry.values), esperado, tolerance=0).all()
+    assert geometrias_para_zoom(recarregada, 8).geometry.equals(recarregada.geometry)
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import pytest
+from processadores.normalizador_estados import normalizar_serie_estados
+from processadores.processador_cpt import (CONFIG_TABELAS_CPT, COLUNAS_ESTADO_CPT, encontrar_coluna_valida,
+                                           processar_dados_cpt_por_municipios)
+
+# Referência: o resumo linha a linha que os agrupamentos substituíram, copiado como estava
+# (sem os avisos de tela, que não entram no resultado)
+def _resumo_cpt_antigo(dados_cpt):
+    dados_municipios = {}
+    dados_temporais = []
+
+    for chave_tabela, config in CONFIG_TABELAS_CPT.items():
+        if chave_tabela not in dados_cpt or dados_cpt[chave_tabela].empty:
+            continue
+
+        df = dados_cpt[chave_tabela].copy()
+        col_municipio = encontrar_coluna_valida(df, config['municipio_col'])
+        col_ano = encontrar_coluna_valida(df, config['ano_col'])
+        if not col_municipio or not col_ano:
+            continue
+
+        df[col_municipio] = df[col_municipio].astype(str).str.strip().str.title()
+        df = df[df[col_municipio].notna() &
+               (df[col_municipio] != 'Nan') &
+               (df[col_municipio] != 'None') &
+               (df[col_municipio] != '') &
+               (df[col_municipio] != 'Null') &
+               (df[col_municipio] != 'Na') &
+               (df[col_municipio].str.len() > 2)]
+
+        coluna_estado_encontrada = next((col for col in COLUNAS_ESTADO_CPT if col in df.columns), None)
+        if coluna_estado_encontrada:
+            df[coluna_estado_encontrada] = normalizar_serie_estados(df[coluna_estado_encontrada], tolerante=True)
+            df = df[df[coluna_estado_encontrada].notna()]
+
+        df[col_ano] = pd.to_numeric(df[col_ano], errors='coerce')
+        df = df[df[col_ano].notna() & (df[col_ano] > 1980) & (df[col_ano] < 2030)]
+        if df.empty:
+            continue
+
+        if chave_tabela == 'conflitos':
+            resumo_municipio = df.groupby(col_municipio, observed=False).agg({
+                col_ano: ['count', 'min', 'max']
+            }).reset_index()
+            resumo_municipio.columns = [col_municipio, 'total_ocorrencias', 'ano_min', 'ano_max']
+            col_familias = encontrar_coluna_valida(df, config['valor_col'])
+            if col_familias:
+                df[col_familias] = pd.to_numeric(df[col_familias], errors='coerce')
+                resumo_familias = df.groupby(col_municipio, observed=False)[col_familias].sum().reset_index()
+                resumo_municipio = resumo_municipio.merge(resumo_familias, on=col_municipio, how='left')
+                resumo_municipio[col_familias] = resumo_municipio[col_familias].fillna(0)
+        elif chave_tabela in ['assassinatos', 'trabalho_escravo'] and encontrar_coluna_valida(df, config['valor_col']):
+            col_valor = encontrar_coluna_valida(df, config['valor_col'])
+            df[col_valor] = pd.to_numeric(df[col_valor], errors='coerce').fillna(1)
+            resumo_municipio = df.groupby(col_municipio, observed=False).agg({
+                col_ano: ['count', 'min', 'max'],
+                col_valor: 'sum'
+            }).reset_index()
+            resumo_municipio.columns = [col_municipio, 'total_ocorrencias', 'ano_min', 'ano_max', 'valor_total']
+        else:
+            resumo_municipio = df.groupby(col_municipio, observed=False).agg({
+                col_ano: ['count', 'min', 'max']
+            }).reset_index()
+            resumo_municipio.columns = [col_municipio, 'total_ocorrencias', 'ano_min', 'ano_max']
+
+        for _, linha in resumo_municipio.iterrows():
+            municipio = linha[col_municipio]
+            if pd.isna(municipio) or str(municipio).strip() == '' or str(municipio).strip().lower() in ['nan', 'none', 'null', 'na']:
+                continue
+            municipio = str(municipio).strip().title()
+            if municipio not in dados_municipios:
+                dados_municipios[municipio] = {
+                    'Município': municipio, 'Areas_Conflito': 0, 'Assassinatos': 0, 'Conflitos_Terra': 0,
+                    'Trabalho_Escravo': 0, 'Total_Ocorrencias': 0, 'Total_Familias': 0
+                }
+            if chave_tabela in ['assassinatos', 'trabalho_escravo'] and 'valor_total' in resumo_municipio.columns:
+                valor_usar = int(linha['valor_total']) if pd.notna(linha['valor_total']) else int(linha['total_ocorrencias'])
+            else:
+                valor_usar = int(linha['total_ocorrencias'])
+            dados_municipios[municipio][config['tipo']] = valor_usar
+            dados_municipios[municipio]['Total_Ocorrencias'] += valor_usar
+            if chave_tabela == 'conflitos':
+                col_familias = encontrar_coluna_valida(df, config['valor_col'])
+                if col_familias and col_familias in resumo_municipio.columns:
+                    familias = linha[col_familias] if pd.notna(linha[col_familias]) else 0
+                    dados_municipios[municipio]['Total_Familias'] += int(familias)
+
+        resumo_temporal = df.groupby(col_ano, observed=False).size().reset_index()
+        resumo_temporal.columns = ['ano', 'quantidade']
+        resumo_temporal['tipo'] = config['tipo'].replace('_', ' ')
+        dados_temporais.append(resumo_temporal)
+
+    df_temporal = pd.concat(dados_temporais, ignore_index=True) if dados_temporais else pd.DataFrame()
+    df_municipios = pd.DataFrame(list(dados_municipios.values()))
+    if not df_municipios.empty:
+        df_municipios = df_municipios.sort_values('Total_Ocorrencias', ascending=False)
+    return df_municipios, df_temporal
+
+def _tabela_cpt(n, semente, col_valor=None) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    nomes = [f'Municipio {i:02d}' for i in range(25)]
+    municipios = rng.choice(np.array(nomes + [nome.upper() for nome in nomes] + ['  marabá ', 'nan', 'None', 'Na', 'Ab', ''],
+                                     dtype=object), n)
+    municipios[rng.random(n) < 0.03] = None
+    estados = rng.choice(np.array(['PA', 'pa', 'Pará', 'PARA', ' MT ', 'UF', 'P1', None], dtype=object), n)
+    # Anos como texto, fora da faixa e ilegíveis, como chegam das planilhas
+    anos = rng.choice(np.array([1975, 1999, 2005, 2020, '2021', '2023.0', 'sem data', 2031, None], dtype=object), n)
+    df = pd.DataFrame({'municipio': municipios, 'estado': estados, 'ano': anos},
+                      index=rng.integers(0, n // 4, n))
+    if col_valor:
+        valores = rng.integers(0, 40, n).astype(object)
+        valores[rng.random(n) < 0.15] = None
+        valores[rng.random(n) < 0.05] = 'n/d'
+        df[col_valor] = valores
+    return df
+
+def _dados_cpt(semente=0, n=3000):
+    return {
+        'areas_conflito': _tabela_cpt(n, semente),
+        'assassinatos': _tabela_cpt(n // 10, semente + 1, 'mortos'),
+        'conflitos': _tabela_cpt(n, semente + 2, 'familias'),
+        'trabalho_escravo': _tabela_cpt(n // 3, semente + 3, 'trabalhadores').rename(columns={'ano': 'Ano'})
+    }
+
+@pytest.mark.parametrize('semente', [0, 1, 2])
+def test_resumo_igual_ao_calculo_linha_a_linha(semente):
+    dados = _dados_cpt(semente)
+    esperado_municipios, esperado_temporal = _resumo_cpt_antigo(dados)
+
+    resultado = processar_dados_cpt_por_municipios(dados)
+    pd.testing.assert_frame_equal(resultado['municipios_summary'], esperado_municipios)
+    pd.testing.assert_frame_equal(resultado['temporal_data'], esperado_temporal)
+    assert resultado['total_municipios'] == len(esperado_municipios)
+    assert resultado['total_ocorrencias'] == esperado_municipios['Total_Ocorrencias'].sum()
+
+def test_tabelas_ausentes_ou_sem_colunas():
+    dados = _dados_cpt(n=400)
+    dados['conflitos'] = pd.DataFrame()
+    dados['assassinatos'] = dados['assassinatos'].drop(columns='ano')
+    del dados['trabalho_escravo']
+    esperado_municipios, _ = _resumo_cpt_antigo(dados)
+
+    resultado = processar_dados_cpt_por_municipios(dados)
+    pd.testing.assert_frame_equal(resultado['municipios_summary'], esperado_municipios)
+    assert (resultado['municipios_summary'][['Assassinatos', 'Conflitos_Terra', 'Trabalho_Escravo']] == 0).all().all()
+    assert resultado['detailed_data']['conflitos'].empty
+
+def test_vitimas_sem_valor_contam_uma_cada():
+    df = pd.DataFrame({'municipio': ['Marabá'] * 3 + ['Altamira'], 'ano': [2020, 2021, 2021, 2022],
+                       'mortos': [2, None, 'n/d', 5]})
+
+    resumo = processar_dados_cpt_por_municipios({'assassinatos': df})['municipios_summary']
+    assert resumo.set_index('Município')['Assassinatos'].to_dict() == {'Marabá': 4, 'Altamira': 5}
+    assert resumo['Município'].tolist() == ['Altamira', 'Marabá']
+
+def test_nada_valido_resulta_vazio():
+    df = pd.DataFrame({'municipio': ['nan', 'Ab', None], 'ano': [2020, 2021, 2022]})
+
+    resultado = processar_dados_cpt_por_municipios({'areas_conflito': df})
+    assert resultado['municipios_summary'].empty and resultado['temporal_data'].empty
+    assert resultado['total_ocorrencias'] == 0
@@ -0,0 +1,74 @@
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+import pytest
+from processadores import processador_dados
+from processadores.processador_dados import ProcessadorDados
+from processadores.processador_ranking import ProcessadorRanking
+
+TEMAS = list(ProcessadorRanking._CONFIGS_AGREGACAO)
+
+def _focos_sinteticos(n=3000, municipios=60, semente=0) -> pd.DataFrame:
+    rng = np.random.default_rng(semente)
+    df = pd.DataFrame({
+        'DataHora': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, n), unit='s'),
+        'RiscoFogo': np.round(rng.uniform(0, 1, n), 3),
+        'Precipitacao': np.round(rng.uniform(0, 50, n), 2),
+        'mun_corrigido': [f'MUNICIPIO {i:03d}' for i in rng.integers(0, municipios, n)],
+        'DiaSemChuva': rng.integers(0, 120, n),
+        'Latitude': rng.uniform(-10, 2, n),
+        'Longitude': rng.uniform(-58, -46, n)
+    })
+    # Mesmos tipos que o ProcessadorDados entrega ao painel
+    return ProcessadorDados()._otimizar_dataframe(df)
+
+def _como_decimal(df_agregado: pd.DataFrame) -> pd.DataFrame:
+    # O que o psycopg2 devolve: AVG e SUM de numeric/inteiros chegam como Decimal (coluna object)
+    df_agregado = df_agregado.copy()
+    for coluna, funcao in df_agregado.columns:
+        if coluna != 'DataHora' and funcao in ('mean', 'sum'):
+            df_agregado[(coluna, funcao)] = [Decimal(repr(float(valor))) for valor in df_agregado[(coluna, funcao)]]
+    return df_agregado
+
+@pytest.mark.parametrize('tema', TEMAS)
+def test_agregado_decimal_formata_igual_ao_pandas(tema):
+    df = _focos_sinteticos()
+    ranking = ProcessadorRanking()
+    esperado, coluna = ranking.processar_ranking(df, tema, 'Todos')
+
+    agregado = _como_decimal(ranking._processar_agregacao_chunk(df, tema))
+    obtido, coluna_obtida = ranking._formatar_resultado_ranking(ranking._ajustar_tipos_agregado(agregado), tema)
+
+    assert coluna_obtida == coluna
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+
+def test_dias_sem_chuva_decimal_sai_arredondado():
+    df = _focos_sinteticos()
+    ranking = ProcessadorRanking()
+    agregado = _como_decimal(ranking._processar_agregacao_chunk(df, 'Máx. Dias Sem Chuva'))
+
+    obtido, _ = ranking._formatar_resultado_ranking(ranking._ajustar_tipos_agregado(agregado), 'Máx. Dias Sem Chuva')
+
+    for coluna in ['Máx. Dias Sem Chuva', 'Média Dias Sem Chuva']:
+        assert pd.api.types.is_numeric_dtype(obtido[coluna])
+        valores = obtido[coluna].to_numpy(dtype=float)
+        np.testing.assert_array_equal(valores, np.round(valores, 1))
+
+@pytest.mark.parametrize('tema', TEMAS)
+def test_ranking_sql_igual_ao_pandas_no_postgres(tabela_queimadas, monkeypatch, tema):
+    df = _focos_sinteticos(semente=2)
+    df.rename(columns={valor: chave for chave, valor in ProcessadorDados._MAPA_COLUNAS.items()}).to_sql(
+        'queimadas', tabela_queimadas, schema='CPT', if_exists='append', index=False
+    )
+    monkeypatch.setattr(processador_dados, 'USAR_ESPELHO_DUCKDB', False)
+    monkeypatch.setattr(processador_dados.GerenciadorBancoDados, 'obter_engine', lambda self: tabela_queimadas)
+
+    ranking = ProcessadorRanking()
+    base = ProcessadorDados().carregar_dados_inpe(None, modo='cursor')
+    esperado, coluna = ranking.processar_ranking(base, tema, 'Todos')
+    # Sem fallback: se a consulta falhar o resultado sai vazio e o teste acusa
+    obtido, coluna_obtida = ranking.processar_ranking_sql(tema, 'Todos')
+
+    assert not obtido.empty
+    assert coluna_obtida == coluna
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
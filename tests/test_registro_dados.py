@@ -0,0 +1,42 @@
+import logging
+import pandas as pd
+import pytest
+from processadores import registro_dados
+from processadores.registro_dados import Camada, RegistroDados
+
+def _registro_com_falha(falhar):
+    registro = RegistroDados()
+    registro.registrar(Camada('ucs', lambda: pd.DataFrame({'nome_uc': ['A', 'B']})))
+
+    def com_car(ucs):
+        if falhar[0]:
+            raise ValueError('CAR inválido')
+        return ucs.assign(c_sigef=1)
+
+    registro.registrar(Camada('ucs_car', com_car, dependencias=['ucs'], alternativa=lambda ucs: ucs))
+    return registro
+
+def test_falha_com_alternativa_vira_aviso_do_registro(caplog):
+    falhar = [True]
+    registro = _registro_com_falha(falhar)
+
+    with caplog.at_level(logging.WARNING, logger=registro_dados.__name__):
+        dados = registro.obter('ucs_car')
+
+    assert dados is registro.obter('ucs')
+    assert registro.avisos == {'ucs_car': 'CAR inválido'}
+    assert 'ucs_car' in caplog.text
+    # Outra sessão lendo a mesma camada encontra o aviso, sem nova materialização
+    assert registro.obter('ucs_car') is dados and 'ucs_car' in registro.avisos
+
+    falhar[0] = False
+    registro.invalidar('ucs_car')
+    assert 'c_sigef' in registro.obter('ucs_car').columns
+    assert registro.avisos == {}
+
+def test_sem_alternativa_a_falha_propaga():
+    registro = RegistroDados()
+    registro.registrar(Camada('quebrada', lambda: 1 / 0))
+    with pytest.raises(ZeroDivisionError):
+        registro.obter('quebrada')
+    assert registro.avisos == {}
@@ -2,3 +2,6 @@ from .formatacao import *
 from .estilos import *
 from .shapefile import *
 from .dados_auxiliares import *
+from .cache_geoparquet import *
+from .impressao_digital import *
+from .carga_paralela import *
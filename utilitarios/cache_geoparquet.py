@@ -0,0 +1,157 @@
+import os
+import glob
+import json
+import hashlib
+import threading
+import geopandas as gpd
+import pyarrow.parquet as pq
+from typing import Callable, Dict, List, Optional
+from configuracoes.config import DIRETORIO_CACHE_GEOPARQUET, VERSAO_CACHE_GEOPARQUET
+from utilitarios.impressao_digital import definir_versao_dados
+
+_EXTENSOES_SHAPEFILE = ['.shp', '.shx', '.dbf', '.prj', '.cpg']
+_ARQUIVO_MANIFESTO = 'manifesto.json'
+_trava_manifesto = threading.Lock()
+
+def _arquivos_fonte(caminho: str) -> List[str]:
+    base, _ = os.path.splitext(caminho)
+    return [base + ext for ext in _EXTENSOES_SHAPEFILE if os.path.exists(base + ext)]
+
+def _hash_arquivo(caminho: str) -> str:
+    hash_arquivo = hashlib.blake2b(digest_size=16)
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+            hash_arquivo.update(bloco)
+    return hash_arquivo.hexdigest()
+
+def _ler_manifesto() -> Dict[str, dict]:
+    try:
+        with open(os.path.join(DIRETORIO_CACHE_GEOPARQUET, _ARQUIVO_MANIFESTO), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+def _gravar_manifesto(manifesto: Dict[str, dict]) -> None:
+    os.makedirs(DIRETORIO_CACHE_GEOPARQUET, exist_ok=True)
+    caminho = os.path.join(DIRETORIO_CACHE_GEOPARQUET, _ARQUIVO_MANIFESTO)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=1, sort_keys=True)
+    os.replace(temporario, caminho)
+
+def calcular_impressao_digital(caminho: str, parametros: tuple = ()) -> Optional[str]:
+    arquivos = _arquivos_fonte(caminho)
+    if not arquivos:
+        return None
+
+    # O hash do conteúdo só é recalculado quando tamanho ou mtime mudam
+    with _trava_manifesto:
+        manifesto = _ler_manifesto()
+        alterado = False
+        partes = [str(VERSAO_CACHE_GEOPARQUET), repr(parametros)]
+
+        for arquivo in arquivos:
+            estado = os.stat(arquivo)
+            chave = os.path.abspath(arquivo)
+            registro = manifesto.get(chave)
+            if not registro or registro['tamanho'] != estado.st_size or registro['mtime_ns'] != estado.st_mtime_ns:
+                registro = {
+                    'tamanho': estado.st_size,
+                    'mtime_ns': estado.st_mtime_ns,
+                    'hash': _hash_arquivo(arquivo)
+                }
+                manifesto[chave] = registro
+                alterado = True
+            partes.append(f"{os.path.basename(arquivo)}:{registro['tamanho']}:{registro['hash']}")
+
+        if alterado:
+            try:
+                _gravar_manifesto(manifesto)
+            except OSError:
+                pass
+
+    return hashlib.blake2b('|'.join(partes).encode('utf-8'), digest_size=12).hexdigest()
+
+def _nome_camada(caminho: str, carregador: str) -> str:
+    base = os.path.splitext(caminho)[0].replace('\\', '/').strip('/').replace('/', '__')
+    return f"{carregador}__{base}"
+
+def _ler_geoparquet(destino: str) -> gpd.GeoDataFrame:
+    gdf = gpd.read_parquet(destino)
+
+    # Colunas categóricas sem nenhum valor viram tipo nulo no Arrow; restaura a partir dos metadados do pandas
+    metadados = pq.read_schema(destino).pandas_metadata or {}
+    for coluna in metadados.get('columns', []):
+        nome = coluna.get('name')
+        if coluna.get('pandas_type') == 'categorical' and nome in gdf.columns and gdf[nome].dtype != 'category':
+            gdf[nome] = gdf[nome].astype('category')
+    return gdf
+
+def carregar_com_cache(caminho: str, carregador: str, construir: Callable[[], gpd.GeoDataFrame],
+                       parametros: tuple = ()) -> gpd.GeoDataFrame:
+    try:
+        impressao = calcular_impressao_digital(caminho, parametros)
+    except OSError:
+        impressao = None
+
+    if impressao is None:
+        return construir()
+
+    nome = _nome_camada(caminho, carregador)
+    destino = os.path.join(DIRETORIO_CACHE_GEOPARQUET, f"{nome}-{impressao}.parquet")
+
+    if os.path.exists(destino):
+        try:
+            return definir_versao_dados(_ler_geoparquet(destino), impressao)
+        except Exception:
+            pass
+
+    gdf = construir()
+    if gdf is None or gdf.empty or not isinstance(gdf, gpd.GeoDataFrame):
+        return gdf
+
+    # Parquet não aceita colunas repetidas; mantém a primeira, como carregar_todos_alertas já faz
+    if gdf.columns.duplicated().any():
+        gdf = gdf.loc[:, ~gdf.columns.duplicated()]
+
+    try:
+        os.makedirs(DIRETORIO_CACHE_GEOPARQUET, exist_ok=True)
+        temporario = destino + '.tmp'
+        gdf.to_parquet(temporario, compression='zstd')
+        os.replace(temporario, destino)
+
+        for antigo in glob.glob(os.path.join(DIRETORIO_CACHE_GEOPARQUET, f"{nome}-*.parquet")):
+            if antigo != destino:
+                os.remove(antigo)
+    except Exception:
+        pass
+
+    return definir_versao_dados(gdf, impressao)
+
+def carregadores_camadas() -> Dict[str, Callable[[], gpd.GeoDataFrame]]:
+    """Carga de cada camada que passa pelo cache, com os mesmos parâmetros usados pelo registro de camadas"""
+    from utilitarios.shapefile import carregar_shapefile, carregar_shapefile_cloud_seguro, carregar_car_postgres
+    from processadores.processador_alertas import carregar_alerta_shapefile
+    from configuracoes.config import COLUNAS_CNUC, COLUNAS_SIGEF
+
+    return {
+        'cnuc': lambda: carregar_shapefile_cloud_seguro("cnuc.shp", colunas=COLUNAS_CNUC),
+        'sigef': lambda: carregar_shapefile("sigef.shp", calcular_percentuais=False, colunas=COLUNAS_SIGEF),
+        'UCs_filtradas': lambda: carregar_shapefile("Filtrado/UCs_filtradas.shp", calcular_percentuais=False),
+        'TerraIn_filtrado': lambda: carregar_shapefile("Filtrado/TerraIn_filtrado.shp", calcular_percentuais=False),
+        'CAR': carregar_car_postgres,
+        'alertas_para': lambda: carregar_alerta_shapefile("alertas.shp", "Pará"),
+        'alertas_estados': lambda: carregar_alerta_shapefile("Filtrado/Alertas_Estados_Restantes.shp", "Estados"),
+        'alertas_ti': lambda: carregar_alerta_shapefile("Filtrado/Alertas_Outros.shp", "TI")
+    }
+
+def construir_cache_geoparquet() -> Dict[str, int]:
+    resultado = {}
+    for nome, carregar in carregadores_camadas().items():
+        gdf = carregar()
+        resultado[nome] = 0 if gdf is None else len(gdf)
+    return resultado
+
+if __name__ == "__main__":
+    for nome_camada, total in construir_cache_geoparquet().items():
+        print(f"{nome_camada}: {total} registros")
@@ -0,0 +1,155 @@
+"""
+Camadas de polígonos para os mapas Plotly
+Todos os anéis de uma camada viram um único traço, com as coordenadas tiradas em lote
+de shapely.get_coordinates e separadas por NaN (serializado como null); o número de
+traços não cresce com o número de polígonos.
+A pirâmide guarda versões simplificadas de cada camada, escolhidas pelo zoom do mapa;
+as análises continuam usando as geometrias exatas. As coordenadas enviadas ao navegador
+são arredondadas a CASAS_DECIMAIS_MAPA
+"""
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import plotly.graph_objects as go
+import shapely
+from typing import Dict, List, Optional, Tuple
+from configuracoes.config import CRS_GEOGRAFICO, NIVEIS_PIRAMIDE, FOLGA_ZOOM_PIRAMIDE, CASAS_DECIMAIS_MAPA
+from utilitarios.geometria_dupla import somente_geografica
+
+def quantizar_coordenadas(valores, casas: int = CASAS_DECIMAIS_MAPA) -> np.ndarray:
+    # Valores arredondados serializam com menos dígitos; a precisão além de ~1 m não aparece no mapa
+    return np.round(np.asarray(valores, dtype=float), casas)
+
+def quantizar_geometrias(geometrias: np.ndarray, casas: int = CASAS_DECIMAIS_MAPA) -> np.ndarray:
+    # Só arredonda: remover os vértices repetidos poderia deixar anéis pequenos com menos de 3 pontos
+    return shapely.transform(np.asarray(geometrias), lambda coordenadas: np.round(coordenadas, casas))
+
+def tolerancia_para_zoom(zoom: float) -> float:
+    # Graus de longitude por pixel de um tile de 256 px, com folga para aproximar o mapa no navegador
+    return 360 / (256 * 2 ** (zoom + FOLGA_ZOOM_PIRAMIDE))
+
+class PiramideGeometrias:
+    
+    # Geometrias de uma camada simplificadas uma vez por nível (preservando a topologia de cada
+    # feição), indexadas pelos rótulos da camada completa; recortes da camada usam as mesmas posições
+    def __init__(self, gdf: gpd.GeoDataFrame, niveis: Tuple[float, ...] = NIVEIS_PIRAMIDE):
+        self.rotulos = pd.Index(gdf.index)
+        self.exatas = np.asarray(gdf.geometry.values) if not gdf.empty else np.empty(0, dtype=object)
+        self.niveis: Dict[float, np.ndarray] = {
+            tolerancia: shapely.simplify(self.exatas, tolerancia, preserve_topology=True)
+            for tolerancia in sorted(niveis)
+        }
+    
+    def tolerancia(self, zoom: float) -> Optional[float]:
+        """Nível mais simplificado que ainda fica abaixo de um pixel no zoom; None usa as exatas"""
+        limite = tolerancia_para_zoom(zoom)
+        candidatos = [tolerancia for tolerancia in self.niveis if tolerancia <= limite]
+        return max(candidatos) if candidatos else None
+    
+    def vertices(self) -> pd.DataFrame:
+        contagem = {'exata': int(shapely.get_num_coordinates(self.exatas).sum())}
+        for tolerancia, geometrias in self.niveis.items():
+            contagem[str(tolerancia)] = int(shapely.get_num_coordinates(geometrias).sum())
+        return pd.DataFrame({'nivel': list(contagem), 'vertices': list(contagem.values())})
+    
+    def _posicoes(self, gdf: gpd.GeoDataFrame) -> Optional[np.ndarray]:
+        if not self.rotulos.is_unique or not gdf.index.is_unique:
+            return None
+        posicoes = self.rotulos.get_indexer(gdf.index)
+        if (posicoes < 0).any():
+            return None
+        # Mesmos rótulos não bastam: o recorte precisa trazer os mesmos objetos de geometria da camada
+        geometrias = np.asarray(gdf.geometry.values)
+        if not all(exata is geometria for exata, geometria in zip(self.exatas[posicoes], geometrias)):
+            return None
+        return posicoes
+    
+    def para_zoom(self, gdf: gpd.GeoDataFrame, zoom: float) -> gpd.GeoDataFrame:
+        """
+        Cópia de gdf (só com a geometria geográfica) com as geometrias do nível adequado ao zoom.
+        Recortes de outra origem são simplificados na hora, sem cache
+        """
+        gdf = somente_geografica(gdf)
+        tolerancia = self.tolerancia(zoom)
+        if gdf.empty or tolerancia is None:
+            return gdf
+        
+        posicoes = self._posicoes(gdf)
+        if posicoes is not None:
+            simplificadas = self.niveis[tolerancia][posicoes]
+        else:
+            simplificadas = shapely.simplify(np.asarray(gdf.geometry.values), tolerancia, preserve_topology=True)
+        return gdf.assign(**{gdf.geometry.name: gpd.GeoSeries(simplificadas, index=gdf.index, crs=gdf.crs)})
+
+def geometrias_para_zoom(gdf: gpd.GeoDataFrame, zoom: float,
+                         piramide: Optional[PiramideGeometrias] = None) -> gpd.GeoDataFrame:
+    # Sem pirâmide o mapa recebe as geometrias exatas, como antes
+    if piramide is None:
+        return somente_geografica(gdf)
+    return piramide.para_zoom(gdf, zoom)
+
+def coordenadas_contornos(geometrias: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Longitudes e latitudes dos anéis externos de cada polígono, com NaN depois de cada anel"""
+    # get_parts devolve o próprio Polygon e as partes de cada MultiPolygon, na ordem das feições
+    partes = shapely.get_parts(np.asarray(geometrias))
+    aneis = shapely.get_exterior_ring(partes[(shapely.get_type_id(partes) == 3) & ~shapely.is_empty(partes)])
+    if len(aneis) == 0:
+        return np.empty(0), np.empty(0)
+
+    coordenadas, anel = shapely.get_coordinates(aneis, return_index=True)
+    # Cada anel anterior acrescenta um separador: a coordenada i do anel r vai para i + r
+    lon = np.full(len(coordenadas) + len(aneis), np.nan)
+    lat = np.full(len(coordenadas) + len(aneis), np.nan)
+    destino = np.arange(len(coordenadas)) + anel
+    lon[destino] = quantizar_coordenadas(coordenadas[:, 0])
+    lat[destino] = quantizar_coordenadas(coordenadas[:, 1])
+    return lon, lat
+
+def tracos_contornos(gdf: gpd.GeoDataFrame, coluna_nome: str = 'nome_uc', rotulo_padrao: str = 'UC',
+                     cor_linha: str = 'rgba(34,139,34,0.8)', cor_preenchimento: str = 'rgba(34,139,34,0.2)',
+                     nome: str = 'Unidades de Conservação') -> List[go.Scattermapbox]:
+    """
+    Contornos preenchidos de uma camada num único traço, mais um traço de pontos invisíveis
+    (um por feição, em point_on_surface) que carrega o nome no hover; o texto não se repete
+    a cada vértice do contorno
+    """
+    if gdf is None or gdf.empty:
+        return []
+    if gdf.crs is not None and gdf.crs != CRS_GEOGRAFICO:
+        gdf = gdf.to_crs(CRS_GEOGRAFICO)
+
+    geometrias = np.asarray(gdf.geometry.values)
+    validas = ~shapely.is_missing(geometrias) & ~shapely.is_empty(geometrias)
+    geometrias = geometrias[validas]
+    lon, lat = coordenadas_contornos(geometrias)
+    if len(lon) == 0:
+        return []
+
+    nomes = (gdf[coluna_nome].to_numpy()[validas] if coluna_nome in gdf.columns
+             else np.full(len(geometrias), rotulo_padrao, dtype=object))
+    ancoras = shapely.point_on_surface(geometrias)
+
+    return [
+        go.Scattermapbox(
+            lon=lon,
+            lat=lat,
+            mode='lines',
+            fill='toself',
+            fillcolor=cor_preenchimento,
+            line=dict(color=cor_linha, width=1),
+            name=nome,
+            showlegend=False,
+            hoverinfo='skip'
+        ),
+        go.Scattermapbox(
+            lon=quantizar_coordenadas(shapely.get_x(ancoras)),
+            lat=quantizar_coordenadas(shapely.get_y(ancoras)),
+            mode='markers',
+            marker=dict(size=12, color=cor_linha, opacity=0),
+            name=nome,
+            showlegend=False,
+            text=nomes,
+            hovertemplate="<b>%{text}</b><extra></extra>"
+        )
+    ]
@@ -0,0 +1,43 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from configuracoes.config import TRABALHADORES_CARGA
+
+def trabalhadores_disponiveis() -> int:
+    # Mais threads que núcleos só acrescenta troca de contexto a leituras que já usam a CPU toda
+    return max(1, min(TRABALHADORES_CARGA, os.cpu_count() or 1))
+
+def criar_executor(max_trabalhadores: Optional[int] = None) -> ThreadPoolExecutor:
+    # As threads herdam o contexto da sessão para que st.cache_*, st.warning e spinners funcionem nelas
+    contexto = get_script_run_ctx(suppress_warning=True)
+
+    def anexar_contexto():
+        if contexto is not None:
+            add_script_run_ctx(threading.current_thread(), contexto)
+
+    return ThreadPoolExecutor(max_workers=max_trabalhadores or trabalhadores_disponiveis(), thread_name_prefix='carga',
+                              initializer=anexar_contexto)
+
+def executar_em_paralelo(tarefas: Dict[str, Callable[[], Any]],
+                         tempos: Optional[Dict[str, float]] = None,
+                         max_trabalhadores: Optional[int] = None) -> Dict[str, Any]:
+    # pyogrio e shapely 2 liberam o GIL na leitura e no reparo das geometrias, então threads bastam
+    def cronometrar(nome, tarefa):
+        inicio = time.perf_counter()
+        try:
+            return tarefa()
+        finally:
+            if tempos is not None:
+                tempos[nome] = time.perf_counter() - inicio
+
+    # Consultas remotas passam o tempo esperando o servidor: quem chama pode pedir mais threads que núcleos
+    trabalhadores = min(max_trabalhadores or trabalhadores_disponiveis(), len(tarefas))
+    if trabalhadores <= 1:
+        return {nome: cronometrar(nome, tarefa) for nome, tarefa in tarefas.items()}
+
+    with criar_executor(trabalhadores) as executor:
+        futuros = {nome: executor.submit(cronometrar, nome, tarefa) for nome, tarefa in tarefas.items()}
+        return {nome: futuro.result() for nome, futuro in futuros.items()}
@@ -3,7 +3,8 @@ import pandas as pd
 from typing import List, Tuple, Optional
 from sqlalchemy import text
 from processadores.processador_dados import ProcessadorDados
-from processadores.gerenciador_bd import GerenciadorBancoDados
+from processadores.processador_ranking import ProcessadorRanking
+from processadores.consultas_inpe import montar_filtros_inpe, tabela_inpe
 from configuracoes.config import CONFIGURACAO_BD
 
 @st.cache_data(ttl=3600, show_spinner=False, max_entries=1)
@@ -11,45 +12,61 @@ def obter_anos_disponiveis() -> List[int]:
     processador = ProcessadorDados()
     return processador.obter_anos_disponiveis()
 
+def _consulta_estatisticas_resumo(tabela: str, estilo: str = 'sqlalchemy') -> Tuple[str, dict]:
+    # Mesmos filtros do carregamento (faixas válidas e caixa LIMITES_INPE), como parâmetros
+    clausula_where, parametros = montar_filtros_inpe(estilo=estilo)
+    return f"""
+        SELECT 
+            COUNT(*) as total_registros,
+            COUNT(DISTINCT municipio) as total_municipios,
+            AVG(riscofogo) as risco_medio,
+            AVG(precipitacao) as precip_media,
+            MIN(datahora) as data_inicio,
+            MAX(datahora) as data_fim
+        FROM {tabela}
+        WHERE {clausula_where}
+    """, parametros
+
+def _montar_estatisticas_resumo(resultado) -> dict:
+    if not resultado:
+        return {}
+    return {
+        'total_registros': resultado[0] or 0,
+        'total_municipios': resultado[1] or 0,
+        'risco_medio': resultado[2] or 0,
+        'precip_media': resultado[3] or 0,
+        'data_inicio': resultado[4],
+        'data_fim': resultado[5]
+    }
+
 @st.cache_data(ttl=7200, show_spinner=False, max_entries=1)
 def obter_estatisticas_resumo() -> dict:
     try:
         processador = ProcessadorDados()
+        espelho = processador._obter_espelho_queimadas()
+        if espelho is not None:
+            try:
+                df_stats = espelho.consultar(*_consulta_estatisticas_resumo('queimadas', 'duckdb'))
+                return _montar_estatisticas_resumo(tuple(df_stats.iloc[0]) if not df_stats.empty else None)
+            except Exception:
+                pass
+        
         engine = processador.gerenciador_bd.obter_engine()
         if not engine:
             return {}
-        consulta_stats = text(f"""
-            SELECT 
-                COUNT(*) as total_registros,
-                COUNT(DISTINCT municipio) as total_municipios,
-                AVG(riscofogo) as risco_medio,
-                AVG(precipitacao) as precip_media,
-                MIN(datahora) as data_inicio,
-                MAX(datahora) as data_fim
-            FROM "{CONFIGURACAO_BD['schema']}"."{CONFIGURACAO_BD['table']}"
-            WHERE riscofogo BETWEEN 0 AND 1
-            AND precipitacao >= 0
-            AND diasemchuva >= 0
-            AND latitude BETWEEN -15 AND 5
-            AND longitude BETWEEN -60 AND -45
-        """)
+        consulta_stats, parametros = _consulta_estatisticas_resumo(tabela_inpe())
         
         with engine.connect() as conn:
-            resultado = conn.execute(consulta_stats).fetchone()
-            
-            if resultado:
-                return {
-                    'total_registros': resultado[0] or 0,
-                    'total_municipios': resultado[1] or 0,
-                    'risco_medio': resultado[2] or 0,
-                    'precip_media': resultado[3] or 0,
-                    'data_inicio': resultado[4],
-                    'data_fim': resultado[5]
-                }
-        return {}
+            resultado = conn.execute(text(consulta_stats), parametros).fetchone()
+            return _montar_estatisticas_resumo(resultado)
     except Exception:
         return {}
 
+@st.cache_data(ttl=3600, show_spinner=False, max_entries=48)
+def obter_ranking_municipios(tema: str, periodo: str, ano: Optional[int] = None) -> Tuple[pd.DataFrame, str]:
+    processador = ProcessadorRanking()
+    return processador.processar_ranking_sql(tema, periodo, ano)
+
 def obter_dados_cache_otimizado(ano: Optional[int] = None) -> Optional[pd.DataFrame]:
     processador = ProcessadorDados()
     consulta_original = processador._construir_consulta_base
@@ -0,0 +1,57 @@
+"""
+GeoJSON compacto para os mapas Plotly
+As coordenadas saem arredondadas a CASAS_DECIMAIS_MAPA e as features levam só as propriedades
+pedidas (nenhuma por padrão: o hover dos mapas vem do próprio data frame). O GeoJSON
+codificado fica num cache LRU por camada, recorte e resolução, então reruns com o mesmo
+filtro não simplificam, arredondam, codificam nem decodificam a camada de novo
+"""
+
+import json
+import numpy as np
+import geopandas as gpd
+import shapely
+import streamlit as st
+from typing import List, Optional
+from configuracoes.config import CRS_GEOGRAFICO, CASAS_DECIMAIS_MAPA, MAX_ENTRADAS_GEOJSON
+from utilitarios.camadas_mapa import PiramideGeometrias, geometrias_para_zoom, quantizar_geometrias
+from utilitarios.impressao_digital import impressao_digital_gdf
+
+def codificar_geojson(gdf: gpd.GeoDataFrame, propriedades: Optional[List[str]] = None,
+                      casas: int = CASAS_DECIMAIS_MAPA) -> str:
+    """FeatureCollection em texto compacto; o id de cada feature é o rótulo da linha, como em __geo_interface__"""
+    if gdf.crs is not None and gdf.crs != CRS_GEOGRAFICO:
+        gdf = gdf.to_crs(CRS_GEOGRAFICO)
+
+    geometrias = shapely.to_geojson(quantizar_geometrias(np.asarray(gdf.geometry.values), casas))
+    colunas = [col for col in (propriedades or []) if col in gdf.columns]
+    registros = gdf[colunas].to_dict('records') if colunas else [{}] * len(gdf)
+
+    features = [
+        '{"type":"Feature","id":%s,"properties":%s,"geometry":%s}' % (
+            json.dumps(str(rotulo)),
+            json.dumps(registro, ensure_ascii=False, separators=(',', ':'), default=str),
+            geometria or 'null'
+        )
+        for rotulo, registro, geometria in zip(gdf.index, registros, geometrias)
+    ]
+    return '{"type":"FeatureCollection","features":[' + ','.join(features) + ']}'
+
+@st.cache_resource(show_spinner=False, max_entries=MAX_ENTRADAS_GEOJSON)
+def _geojson_cache(camada: str, impressao: str, tolerancia: Optional[float], casas: int, propriedades: tuple,
+                   _gdf: gpd.GeoDataFrame, _zoom: float, _piramide: Optional[PiramideGeometrias]) -> dict:
+    # A resolução entra na chave pela tolerância do nível: zooms que caem no mesmo nível dividem a entrada
+    return json.loads(codificar_geojson(geometrias_para_zoom(_gdf, _zoom, _piramide), list(propriedades), casas))
+
+def geojson_compacto(gdf: gpd.GeoDataFrame, camada: str, zoom: float,
+                     piramide: Optional[PiramideGeometrias] = None,
+                     propriedades: Optional[List[str]] = None,
+                     casas: int = CASAS_DECIMAIS_MAPA) -> dict:
+    """
+    GeoJSON do gdf no nível da pirâmide adequado ao zoom, para o argumento geojson do Plotly
+    (que aceita objeto ou URL, não texto). O objeto é compartilhado entre sessões e só pode ser
+    lido: o Plotly copia os dados de cada traço ao montar a figura
+    """
+    propriedades = tuple(propriedades or ())
+    tolerancia = piramide.tolerancia(zoom) if piramide is not None else None
+    impressao = impressao_digital_gdf(gdf, colunas=list(propriedades) or None, geometria=True)
+    return _geojson_cache(camada, impressao, tolerancia, casas, propriedades, gdf, zoom, piramide)
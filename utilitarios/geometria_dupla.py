@@ -0,0 +1,67 @@
+"""
+Geometria dupla das camadas espaciais
+A geometria ativa continua geográfica (usada pelos mapas) e a projetada em CRS_PROJETADO
+(usada em áreas e intersecções) fica numa segunda coluna, calculada uma única vez quando
+a camada é materializada. Filtros, merges e concatenações levam as duas colunas juntas,
+então qualquer subconjunto já traz a projeção alinhada às próprias linhas
+"""
+
+import pandas as pd
+import geopandas as gpd
+from typing import List, Optional
+from configuracoes.config import CRS_PROJETADO, COLUNA_GEOMETRIA_PROJETADA
+
+def _tem_projecao(gdf: pd.DataFrame) -> bool:
+    return (isinstance(gdf, gpd.GeoDataFrame)
+            and COLUNA_GEOMETRIA_PROJETADA in gdf.columns
+            and gdf[COLUNA_GEOMETRIA_PROJETADA].dtype == 'geometry'
+            and gdf[COLUNA_GEOMETRIA_PROJETADA].crs == CRS_PROJETADO)
+
+def _colunas_geometricas(df: pd.DataFrame) -> List[str]:
+    return [col for col in df.columns if df[col].dtype == 'geometry']
+
+def _linhas_sem_projecao(gdf: gpd.GeoDataFrame) -> pd.Series:
+    # Linhas vindas de uma camada sem a coluna (concat) ficam com a projeção ausente
+    return gdf[COLUNA_GEOMETRIA_PROJETADA].isna() & gdf.geometry.notna()
+
+def adicionar_geometria_projetada(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """Etapa de normalização do registro: projeta só as linhas que ainda não têm a geometria projetada"""
+    if not isinstance(gdf, gpd.GeoDataFrame) or gdf.empty or gdf.crs is None:
+        return gdf
+
+    if not _tem_projecao(gdf):
+        return gdf.assign(**{COLUNA_GEOMETRIA_PROJETADA: gdf.geometry.to_crs(CRS_PROJETADO)})
+
+    faltando = _linhas_sem_projecao(gdf)
+    if not faltando.any():
+        return gdf
+    projetada = gdf[COLUNA_GEOMETRIA_PROJETADA].copy()
+    projetada[faltando] = gdf.geometry[faltando].to_crs(CRS_PROJETADO)
+    return gdf.assign(**{COLUNA_GEOMETRIA_PROJETADA: projetada})
+
+def geometria_projetada(gdf: gpd.GeoDataFrame) -> gpd.GeoSeries:
+    """Geometria em CRS_PROJETADO alinhada às linhas do gdf; só reprojeta se a camada não a trouxer"""
+    if _tem_projecao(gdf) and not _linhas_sem_projecao(gdf).any():
+        return gdf[COLUNA_GEOMETRIA_PROJETADA]
+    return gdf.geometry.to_crs(CRS_PROJETADO)
+
+def projetar(gdf: gpd.GeoDataFrame, colunas: Optional[List[str]] = None) -> gpd.GeoDataFrame:
+    """
+    Equivalente a gdf.to_crs(CRS_PROJETADO) para sjoin e overlay: as colunas pedidas (todas
+    as não geométricas por padrão) com a geometria projetada como única geometria
+    """
+    if colunas is None:
+        geometricas = _colunas_geometricas(gdf)
+        colunas = [col for col in gdf.columns if col not in geometricas]
+    return gpd.GeoDataFrame(gdf[colunas], geometry=geometria_projetada(gdf).rename('geometry'))
+
+def somente_geografica(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    """O gdf sem a coluna projetada, para serializações que só aceitam uma geometria (GeoJSON, overlay)"""
+    if COLUNA_GEOMETRIA_PROJETADA in gdf.columns:
+        return gdf.drop(columns=[COLUNA_GEOMETRIA_PROJETADA])
+    return gdf
+
+def sem_geometria(df: pd.DataFrame) -> pd.DataFrame:
+    """Só as colunas tabulares, para exibição em tabelas"""
+    geometrias = _colunas_geometricas(df)
+    return pd.DataFrame(df.drop(columns=geometrias)) if geometrias else df
@@ -0,0 +1,43 @@
+import hashlib
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+CHAVE_VERSAO_DADOS = 'versao_dados'
+
+COLUNAS_CHAVE_PADRAO = ['ESTADO', 'ANODETEC', 'AREAHA', 'MUNICIPIO', 'nome_uc', 'tipo_area', 'origem']
+
+def definir_versao_dados(df: pd.DataFrame, versao: str) -> pd.DataFrame:
+    # attrs acompanha cópias e filtros do pandas, levando a versão do carregador até os processadores
+    df.attrs[CHAVE_VERSAO_DADOS] = versao
+    return df
+
+def impressao_digital_gdf(df: pd.DataFrame, colunas: list = None, geometria: bool = False) -> str:
+    hash_df = hashlib.blake2b(digest_size=16)
+    hash_df.update(str(df.attrs.get(CHAVE_VERSAO_DADOS, '')).encode())
+    hash_df.update(str(len(df)).encode())
+    hash_df.update('|'.join(map(str, df.columns)).encode())
+
+    if len(df):
+        hash_df.update(pd.util.hash_pandas_object(df.index, index=False).values.tobytes())
+
+        colunas_chave = [col for col in (colunas or COLUNAS_CHAVE_PADRAO) if col in df.columns]
+        for col in colunas_chave:
+            hash_df.update(col.encode())
+            hash_df.update(pd.util.hash_pandas_object(df[col], index=False).values.tobytes())
+
+        if isinstance(df, gpd.GeoDataFrame) and df.geometry.name in df.columns:
+            hash_df.update(str(df.crs).encode())
+            # A versão do carregador acompanha filtros e cópias: com ela o índice já identifica as
+            # geometrias, e a serialização WKB (O(vértices) a cada rerun) fica para dados sem versão
+            if geometria and not df.attrs.get(CHAVE_VERSAO_DADOS):
+                for wkb in shapely.to_wkb(np.asarray(df.geometry.values)):
+                    hash_df.update(wkb or b'')
+
+    return hash_df.hexdigest()
+
+HASH_FUNCS_DADOS = {
+    gpd.GeoDataFrame: impressao_digital_gdf,
+    pd.DataFrame: impressao_digital_gdf
+}
@@ -3,9 +3,17 @@ import numpy as np
 import pandas as pd
 import geopandas as gpd
 import streamlit as st
+from utilitarios.cache_geoparquet import carregar_com_cache
 
 @st.cache_data
 def carregar_shapefile_cloud_seguro(caminho: str, calcular_percentuais: bool = True, colunas: list[str] = None) -> gpd.GeoDataFrame:
+    return carregar_com_cache(
+        caminho, 'cloud_seguro',
+        lambda: _normalizar_shapefile_cloud_seguro(caminho, calcular_percentuais, colunas),
+        (calcular_percentuais, tuple(colunas or ()))
+    )
+
+def _normalizar_shapefile_cloud_seguro(caminho: str, calcular_percentuais: bool = True, colunas: list[str] = None) -> gpd.GeoDataFrame:
     try:
         if not os.path.exists(caminho):
             st.error(f"❌ Arquivo não encontrado: {caminho}")
@@ -72,6 +80,13 @@ def carregar_shapefile_cloud_seguro(caminho: str, calcular_percentuais: bool = T
 
 @st.cache_data
 def carregar_shapefile(caminho: str, calcular_percentuais: bool = True, colunas: list[str] = None) -> gpd.GeoDataFrame:
+    return carregar_com_cache(
+        caminho, 'shapefile',
+        lambda: _normalizar_shapefile(caminho, calcular_percentuais, colunas),
+        (calcular_percentuais, tuple(colunas or ()))
+    )
+
+def _normalizar_shapefile(caminho: str, calcular_percentuais: bool = True, colunas: list[str] = None) -> gpd.GeoDataFrame:
     gdf = gpd.read_file(caminho)
     
     # Definir CRS se ausente (naive geometries)
@@ -156,10 +171,12 @@ def preparar_hectares(gdf: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
 def carregar_car_postgres() -> gpd.GeoDataFrame:
     """
     Carrega dados do CAR otimizado para Streamlit Cloud.
-    Simplifica geometrias e reduz uso de memória.
+    Mantém as geometrias exatas; os mapas usam versões simplificadas da pirâmide.
     """
     caminho = "Filtrado/Resultado_CAR_Final.shp"
-    
+    return carregar_com_cache(caminho, 'car', lambda: _normalizar_car(caminho))
+
+def _normalizar_car(caminho: str) -> gpd.GeoDataFrame:
     if not os.path.exists(caminho):
         st.error(f"❌ Arquivo CAR não encontrado: {caminho}")
         return gpd.GeoDataFrame()
@@ -172,8 +189,7 @@ def carregar_car_postgres() -> gpd.GeoDataFrame:
             st.error(f"❌ Arquivo CAR vazio: {caminho}")
             return gpd.GeoDataFrame()
         
-        # Simplificar geometrias para reduzir memória (~100m tolerância)
-        gdf['geometry'] = gdf['geometry'].simplify(tolerance=0.001, preserve_topology=True)
+        # Geometrias exatas: as áreas e intersecções dependem delas; os mapas usam a PiramideGeometrias
         
         if gdf.crs is None:
             gdf.set_crs("EPSG:4674", inplace=True)